@@ -1,22 +1,109 @@
 from src.excel_writer import ExcelTool
+from src.column_generation import PatternSolver
+from src.ledger import FairnessLedger
+from src.legacy import LegacySolver, read_legacy_availability
 from src.lp_solver import LPSolver
+from src.preview import PreviewSolver
+from src.racing import SolverRace
+from src.readers import read_schedule
+from src.solution import Solution
+from src.tuning import PROFILE_FILE, describe_profile
+from util.bonus_rules import BonusRuleSet
 
 ### CONFIGURATION ###
 make_library = True
+availability_file = "Beschikbaarheid_Mock_Full.xlsx"  # Also .csv, .jsonl or .parquet exports
+bonus_rules_file = None  # JSON bonus table (see README), None keeps the default Saturday/Sunday/evening rates
 max_hours = 100
 sunday_quota = 20
+num_alternatives = 1  # >1 also writes distinct alternative rosters from the same solve
+min_distance = 4  # Minimum number of differing assignments between alternatives
+alternatives_gap = None  # e.g. 0.05 keeps only alternatives within 5% of the best objective
+lazy_constraints = False  # Add rest, Sunday and max-hours rows only when violated
+race_workers = 1  # >1 races differently seeded solver processes and keeps the best roster
+use_patterns = False  # Solve with per-person work patterns (column generation) instead of the compact model
+pricing_workers = 1  # Processes used to price patterns in parallel
+window_limits = []  # util.rules.WindowLimit list, e.g. [WindowLimit(7, max_shifts=4), WindowLimit(7, max_hours=30, soft=True)]
+min_free_weekends = 0  # Weekends every person has fully off
+spread_weight = 10  # Weight of the shift spread penalty, can be lowered or 0 when window limits are set
+fairness = "quadratic"  # Fairness term: quadratic, pwl, l1, minimax or hybrid (see testing/bench_fairness.py)
+ledger_file = None  # e.g. "fairness_ledger.sqlite", carries fairness deficits over to the next period
+period = "2024-03"  # Period of this workbook in the ledger, periods must sort chronologically
+preview_mode = False  # Quick rough roster from the LP relaxation, reported next to a lower bound
+legacy_mode = False  # Reproduce roostertool.py: its objective, 30 s time limit and roster layout
+coverage_bound = True  # Bound the unfilled positions with a max-flow before solving (src/flow_bound.py)
+tuning_profile = PROFILE_FILE  # Gurobi parameters stored by `python -m src.tuning tune`, None for the defaults
+solution_file = "solution.npz"  # Stored roster, re-render with `python -m src.solution render`
 
-# Read schedule from Excel
-schedule = ExcelTool.read_availability("Beschikbaarheid_Mock_Full.xlsx")
-schedule.calculate_availability()
-schedule.calculate_non_sunday_hours()
+# Racing starts worker processes that import this file, so only run from the main process
+if __name__ == "__main__":
+    # Read schedule from Excel or a CSV/JSON lines/Parquet export
+    if legacy_mode:
+        schedule = read_legacy_availability(availability_file)
+    else:
+        schedule = read_schedule(availability_file)
+    bonus_rules = BonusRuleSet.from_json(bonus_rules_file) if bonus_rules_file else None
+    if bonus_rules is not None:
+        bonus_rules.apply(schedule)
+    schedule.calculate_availability()
+    schedule.calculate_non_sunday_hours()
+    ledger = FairnessLedger(ledger_file) if ledger_file else None
+    carry_over = ledger.carry_over(schedule.people, period) if ledger else None
 
-solver = LPSolver(schedule, max_hours, sunday_quota)
-solver.setup_variables()
-solver.set_objective()
-solver.apply_constraints()
-solver.solve()
+    if legacy_mode:
+        # The legacy objective has no expected hours to carry a deficit into and none of the newer rules
+        if ledger or window_limits or min_free_weekends or fairness != "quadratic":
+            raise ValueError("legacy_mode ignores ledger_file, window_limits, min_free_weekends and fairness, "
+                             "turn them off or turn off legacy_mode")
+        solver = LegacySolver(schedule, max_hours, sunday_quota)
+        solver.setup_variables()
+        solver.set_objective()
+        solver.apply_constraints()
+        solver.solve()
+        ExcelTool.write_legacy_schedule(schedule, solver, "Rooster_van_Poule Library.xls")
+    elif preview_mode:
+        solver = PreviewSolver(schedule, max_hours, sunday_quota, window_limits=window_limits,
+                               min_free_weekends=min_free_weekends, spread_weight=spread_weight, carry_over=carry_over)
+        solver.setup_variables()
+        solver.set_objective()
+        solver.apply_constraints()
+        solver.solve()
+    elif race_workers > 1:
+        solver = SolverRace(schedule, max_hours, sunday_quota, num_workers=race_workers,
+                            solver_options={'lazy_constraints': lazy_constraints, 'bonus_rules': bonus_rules,
+                                            'window_limits': window_limits, 'min_free_weekends': min_free_weekends,
+                                            'spread_weight': spread_weight, 'carry_over': carry_over,
+                                            'fairness': fairness, 'use_coverage_bound': coverage_bound}).run()
+    elif use_patterns:
+        # Patterns only encode the rules of the compact model without window limits
+        if window_limits or min_free_weekends or fairness != "quadratic":
+            raise ValueError("use_patterns does not support window_limits, min_free_weekends or another fairness "
+                             "than quadratic, turn them off or turn off use_patterns")
+        solver = PatternSolver(schedule, max_hours, sunday_quota, workers=pricing_workers, spread_weight=spread_weight,
+                               carry_over=carry_over)
+        solver.solve()
+    else:
+        solver = LPSolver(schedule, max_hours, sunday_quota, lazy_constraints=lazy_constraints,
+                          window_limits=window_limits, min_free_weekends=min_free_weekends, spread_weight=spread_weight,
+                          carry_over=carry_over, fairness=fairness, use_coverage_bound=coverage_bound,
+                          tuning_profile=tuning_profile)
+        if solver.profile:
+            print(describe_profile(solver.profile))
+        solver.setup_variables()
+        solver.set_objective()
+        solver.apply_constraints()
+        if num_alternatives > 1:
+            solver.solve_alternatives(k=num_alternatives, min_distance=min_distance, gap=alternatives_gap)
+            ExcelTool.write_alternatives(schedule, solver, "Alternative_Schedules.xlsx")
+        else:
+            solver.solve()
 
-# Save schedule to file
-ExcelTool.write_schedule(schedule, solver, "Final_Schedule.xlsx")
-ExcelTool.write_metrics(schedule, solver, "Metrics_generated_schedule.xlsx")
+    # Store the roster and render the outputs from it
+    solution = Solution.from_solver(schedule, solver)
+    solution.save(solution_file)
+    ExcelTool.write_schedule(schedule, solution, "Final_Schedule.xlsx")
+    ExcelTool.write_metrics(schedule, solution, "Metrics_generated_schedule.xlsx")
+
+    if ledger:
+        ledger.record(period, schedule, solution.assignment)
+        ledger.close()
@@ -1,2 +1,22 @@
-from .excel_writer import ExcelTool
-from .lp_solver import LPSolver
\ No newline at end of file
+import importlib
+
+# Heavy dependencies (gurobipy, pandas) are only imported when a class is first used,
+# so tools like the validator start without them.
+_LAZY = {
+    'ExcelTool': '.excel_writer',
+    'LPSolver': '.lp_solver',
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
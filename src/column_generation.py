@@ -0,0 +1,306 @@
+import multiprocessing as mp
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import gurobipy as gp
+import numpy as np
+from util.objective import (BONUS_WEIGHT, SLACK_PENALTY, SPREAD_WEIGHT, availability_matrix, expected_hours,
+                            spread_matrix)
+from util.rules import SUNDAY, rest_conflict_pairs
+
+EPS = 1e-6
+
+
+class PatternSolver:
+    """Set-partitioning alternative to LPSolver in which every column is a work pattern of one person.
+
+    A pattern is the set of shifts one person works over the whole schedule. It already satisfies
+    availability, the rest rules, the Sunday rules and max hours, and carries its exact spread
+    penalty as column cost, so the master problem has no bilinear terms left. Columns are generated
+    by a DP over the shifts per person (price-and-branch): once no pattern with negative reduced
+    cost remains, the master is solved once more with binary pattern variables.
+    """
+
+    def __init__(self, schedule, max_hours, sunday_quota, workers=1, max_iterations=200, time_limit=100,
+                 exact_pricing=True, lookback=6, verbose=False, spread_weight=SPREAD_WEIGHT, carry_over=None):
+        self.schedule = schedule
+        self.max_hours = max_hours
+        self.sunday_quota = sunday_quota
+        self.workers = workers
+        self.max_iterations = max_iterations
+        self.time_limit = time_limit
+        self.exact_pricing = exact_pricing
+        self.verbose = verbose  # Print the master objective of every iteration
+
+        shifts = schedule.shifts
+        self.people = list(schedule.people)
+        self.hours = np.array([s.hours for s in shifts], dtype=float)
+        self.bonus = np.array([s.bonus_hours for s in shifts], dtype=float)
+        self.required = np.array([s.persons_required for s in shifts], dtype=float)
+        self.is_sunday = np.array([s.day == SUNDAY for s in shifts], dtype=bool)
+        self.availability = availability_matrix(schedule).astype(bool)
+        self.spread_weight = spread_weight
+        self.spread = spread_weight * spread_matrix(schedule)
+        # Regular and bonus hours owed per person from earlier periods shift the targets of the deviation rows
+        self.carry_over = carry_over or {}
+        self.exp_reg, self.exp_bonus = expected_hours(schedule)
+        owed = np.array([self.carry_over.get(name, (0, 0)) for name in self.people], dtype=float).reshape(-1, 2)
+        self.exp_reg, self.exp_bonus = self.exp_reg + owed[:, 0], self.exp_bonus + owed[:, 1]
+        non_sunday_hours = self.availability[:, ~self.is_sunday] @ self.hours[~self.is_sunday]
+        self.sunday_allowed = non_sunday_hours >= sunday_quota
+
+        # Spread penalty between each shift and the lookback shifts before it, charged inside the DP
+        self.near_spread = np.zeros((len(shifts), lookback))
+        for k in range(1, lookback + 1):
+            self.near_spread[k:, k - 1] = np.diagonal(self.spread, offset=k)
+
+        # Rest rules only link a shift to the one or two shifts before it
+        self.conflict_prev = np.zeros(len(shifts), dtype=bool)
+        self.conflict_prev2 = np.zeros(len(shifts), dtype=bool)
+        for first, second, _ in rest_conflict_pairs(shifts):
+            if second - first == 1:
+                self.conflict_prev[second] = True
+            else:
+                self.conflict_prev2[second] = True
+
+        self.env = gp.Env(params={'OutputFlag': 0})
+        self.model = gp.Model(env=self.env)
+        self.patterns = {p: [] for p in range(len(self.people))}  # Tuples of shift indices
+        self.columns = {p: [] for p in range(len(self.people))}  # Matching master variables
+        # Lower bound on the master LP and so on the roster objective: the restricted master value plus
+        # the lower bound on every person's most negative reduced cost (Lagrangian bound)
+        self.lp_bound = None
+        self.proved = False  # True once pricing proved that no pattern has a negative reduced cost
+        self.iterations = 0
+
+    def solve(self):
+        start = time.time()
+        self._build_master()
+
+        executor = None
+        if self.workers > 1:
+            executor = ProcessPoolExecutor(self.workers, mp_context=mp.get_context("spawn"))
+        try:
+            for self.iterations in range(1, self.max_iterations + 1):
+                self.model.optimize()
+                added, reduced_cost_bounds = self._price(executor)
+                bound = self.model.ObjVal + sum(min(0.0, value) for value in reduced_cost_bounds)
+                self.lp_bound = bound if self.lp_bound is None else max(self.lp_bound, bound)
+                self.proved = all(value >= -EPS for value in reduced_cost_bounds)
+                if self.verbose:
+                    print(f"Iteration {self.iterations}: master {self.model.ObjVal:.4f}, bound {bound:.4f}, "
+                          f"{added} pattern(s) added")
+                if added == 0:
+                    break
+                if time.time() - start > self.time_limit / 2:
+                    break
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        # Price-and-branch: integer master over all generated patterns
+        for p in self.columns:
+            for var in self.columns[p]:
+                var.VType = gp.GRB.BINARY
+        for var in self.slack.values():
+            var.VType = gp.GRB.INTEGER
+        self.model.setParam('TimeLimit', max(1, self.time_limit - (time.time() - start)))
+        self.model.optimize()
+
+        columns = sum(len(patterns) for patterns in self.patterns.values())
+        print(f"Pattern solver: {columns} patterns, objective {self.model.ObjVal:.4f}, "
+              f"LP bound {self.lp_bound:.4f} ({'proved' if self.proved else 'Lagrangian'})")
+
+    def get_assignment(self):
+        """Returns the (people x shifts) assignment matrix and the slack per shift."""
+        assignment = np.zeros((len(self.people), len(self.schedule.shifts)), dtype=np.int8)
+        for p in self.columns:
+            for pattern, var in zip(self.patterns[p], self.columns[p]):
+                if var.X > 0.5:
+                    assignment[p, list(pattern)] = 1
+        slack = np.rint([self.slack[s].X for s in range(len(self.schedule.shifts))]).astype(int)
+        return assignment, slack
+
+    def _build_master(self):
+        m = self.model
+        num_people, num_shifts = len(self.people), len(self.schedule.shifts)
+        self.slack = m.addVars(num_shifts, lb=0, name="Slack")
+        err_reg = m.addVars(num_people, lb=-gp.GRB.INFINITY, name="ErrReg")
+        err_bonus = m.addVars(num_people, lb=-gp.GRB.INFINITY, name="ErrBonus")
+
+        self.cover = [m.addConstr(self.slack[s] == self.required[s], name=f"Cover_{s}") for s in range(num_shifts)]
+        self.def_reg = [m.addConstr(err_reg[p] == self.exp_reg[p], name=f"ErrReg_{p}") for p in range(num_people)]
+        self.def_bonus = [m.addConstr(err_bonus[p] == self.exp_bonus[p], name=f"ErrBonus_{p}")
+                          for p in range(num_people)]
+        self.convex = [m.addConstr(gp.LinExpr() == 1, name=f"Pattern_{p}") for p in range(num_people)]
+
+        m.setObjective(
+            gp.quicksum(err_reg[p] * err_reg[p] + BONUS_WEIGHT * err_bonus[p] * err_bonus[p]
+                        for p in range(num_people))
+            + SLACK_PENALTY * self.slack.sum(),
+            gp.GRB.MINIMIZE,
+        )
+
+        # The empty pattern keeps the master feasible from the start
+        for p in range(num_people):
+            self._add_pattern(p, ())
+
+    def _add_pattern(self, p, pattern):
+        shifts = list(pattern)
+        column = gp.Column([1.0] * len(shifts) + [self.hours[shifts].sum(), self.bonus[shifts].sum(), 1.0],
+                           [self.cover[s] for s in shifts] + [self.def_reg[p], self.def_bonus[p], self.convex[p]])
+        # No upper bound: the convexity row already keeps it at most 1, and a bound would hide reduced costs
+        var = self.model.addVar(lb=0, obj=self._pattern_cost(pattern), column=column,
+                                name=f"Pattern_{self.people[p]}_{len(self.patterns[p])}")
+        self.patterns[p].append(pattern)
+        self.columns[p].append(var)
+
+    def _pattern_cost(self, pattern):
+        shifts = list(pattern)
+        return float(self.spread[np.ix_(shifts, shifts)].sum())
+
+    def _price(self, executor):
+        # Reduced cost of a pattern x for person p: cost(x) - sum_s weight_s x_s - convexity dual
+        cover_dual = np.array([c.Pi for c in self.cover])
+        jobs = []
+        for p in range(len(self.people)):
+            weights = cover_dual + self.def_reg[p].Pi * self.hours + self.def_bonus[p].Pi * self.bonus
+            jobs.append((weights, self.near_spread, self.availability[p], self.hours, self.is_sunday, self.sunday_allowed[p],
+                         self.conflict_prev, self.conflict_prev2, self.max_hours))
+
+        if executor is None:
+            results = [_price_pattern(*job) for job in jobs]
+        else:
+            results = list(executor.map(_price_pattern, *zip(*jobs)))
+
+        # Returns the number of patterns added and a lower bound on the reduced cost of every person's patterns
+        added = 0
+        bounds = []
+        for p, (value, pattern) in enumerate(results):
+            convex_dual = self.convex[p].Pi
+            # The DP leaves out part of the non-negative spread cost, so it bounds every reduced cost of p
+            bound = -value - convex_dual
+            bounds.append(bound)
+            if bound >= -EPS:
+                continue
+
+            weights = jobs[p][0]
+            pattern = self._drop_improve(pattern, weights)
+            reduced_cost = self._pattern_cost(pattern) - weights[list(pattern)].sum() - convex_dual
+            if reduced_cost >= -EPS and self.exact_pricing:
+                pattern, exact_bound = self._price_exact(p, weights, convex_dual)
+                bounds[p] = max(bound, exact_bound - convex_dual)
+                reduced_cost = self._pattern_cost(pattern) - weights[list(pattern)].sum() - convex_dual
+
+            if reduced_cost < -EPS and pattern not in self.patterns[p]:
+                self._add_pattern(p, pattern)
+                added += 1
+        return added, bounds
+
+    def _drop_improve(self, pattern, weights):
+        # Removing shifts keeps a pattern feasible, drop those whose spread cost exceeds their weight
+        x = np.zeros(len(weights))
+        x[list(pattern)] = 1
+        symmetric = self.spread + self.spread.T
+        while True:
+            gain = symmetric @ x - weights
+            gain[x == 0] = -np.inf
+            best = int(np.argmax(gain))
+            if gain[best] <= EPS:
+                return tuple(np.flatnonzero(x))
+            x[best] = 0
+
+    def _price_exact(self, p, weights, convex_dual):
+        """Solves the pricing problem of person p exactly as a small binary quadratic program.
+
+        The search stops as soon as a pattern with negative reduced cost is found, or the bound
+        proves that none exists. Returns the best pattern found and the lower bound of the search on
+        cost - weights, which is only exact when the model solved to optimality.
+        """
+        shifts = self.schedule.shifts
+        model = gp.Model(env=self.env)
+        model.setParam('TimeLimit', 10)
+        # A relative gap on objectives of the slack penalty's size would leave the bound short of a proof
+        model.setParam('MIPGap', 0)
+        model.setParam('BestObjStop', convex_dual - EPS)
+        model.setParam('BestBdStop', convex_dual - EPS)
+        x = model.addVars(len(shifts), vtype=gp.GRB.BINARY)
+        for s in range(len(shifts)):
+            if not self.availability[p, s] or (self.is_sunday[s] and not self.sunday_allowed[p]):
+                x[s].UB = 0
+        for first, second, _ in rest_conflict_pairs(shifts):
+            model.addConstr(x[first] + x[second] <= 1)
+        model.addConstr(gp.quicksum(x[s] for s in np.flatnonzero(self.is_sunday)) <= 1)
+        model.addConstr(gp.quicksum(x[s] * self.hours[s] for s in range(len(shifts))) <= self.max_hours)
+
+        rows, cols = np.nonzero(self.spread)
+        model.setObjective(
+            gp.quicksum(self.spread[i, j] * x[i] * x[j] for i, j in zip(rows, cols))
+            - gp.quicksum(weights[s] * x[s] for s in range(len(shifts))),
+            gp.GRB.MINIMIZE,
+        )
+        model.optimize()
+        bound = model.ObjBound if model.Status in (gp.GRB.OPTIMAL, gp.GRB.TIME_LIMIT, gp.GRB.USER_OBJ_LIMIT) \
+            else -np.inf
+        if model.SolCount == 0:
+            return (), bound
+        return tuple(s for s in range(len(shifts)) if x[s].X > 0.5), bound
+
+
+def _price_pattern(weights, near_spread, available, hours, is_sunday, sunday_allowed, conflict_prev, conflict_prev2,
+                   max_hours):
+    """Best pattern for one person by a DP over the shifts.
+
+    The state is (which of the last few shifts were worked, Sunday used, hours used), which is enough
+    to enforce the rest rules, the one-Sunday rule and max hours exactly. Only the spread penalty
+    between shifts inside that window is charged, so the DP value never exceeds the true value of
+    a pattern. Returns the DP value and the pattern.
+    """
+    lookback = near_spread.shape[1]
+    window = (1 << lookback) - 1
+    states = {(0, False, 0.0): (0.0, None)}
+    for s in range(len(weights)):
+        new_states = {}
+        takeable = available[s] and weights[s] > EPS and not (is_sunday[s] and not sunday_allowed)
+        for (recent, sunday, used), (value, path) in states.items():
+            _keep_state(new_states, ((recent << 1) & window, sunday, used), value, path)
+
+            if not takeable or (recent & 1 and conflict_prev[s]) or (recent & 2 and conflict_prev2[s]):
+                continue
+            if is_sunday[s] and sunday:
+                continue
+            new_used = round(used + hours[s], 6)
+            if new_used > max_hours + EPS:
+                continue
+            spread = sum(near_spread[s, k] for k in range(lookback) if recent >> k & 1)
+            _keep_state(new_states, (((recent << 1) | 1) & window, sunday or bool(is_sunday[s]), new_used),
+                        value + weights[s] - spread, (s, path))
+        states = _prune_dominated(new_states)
+
+    value, path = max(states.values(), key=lambda state: state[0])
+    pattern = []
+    while path is not None:
+        pattern.append(path[0])
+        path = path[1]
+    return value, tuple(sorted(pattern))
+
+
+def _keep_state(states, key, value, path):
+    if key not in states or value > states[key][0]:
+        states[key] = (value, path)
+
+
+def _prune_dominated(states):
+    # With equal flags, a state with fewer hours used and at least the same value dominates
+    groups = {}
+    for (recent, sunday, used), state in states.items():
+        groups.setdefault((recent, sunday), []).append((used, state))
+
+    pruned = {}
+    for flags, group in groups.items():
+        best_value = -np.inf
+        for used, (value, path) in sorted(group, key=lambda item: item[0]):
+            if value > best_value + EPS:
+                pruned[flags + (used,)] = (value, path)
+                best_value = value
+    return pruned
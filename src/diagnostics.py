@@ -0,0 +1,106 @@
+import numpy as np
+from util.rules import SUNDAY, RosterLimits, rest_conflicts_by_shift, sunday_blocked
+
+NOBODY_AVAILABLE = "Niemand beschikbaar"
+SUNDAY_RULE = "Zondagregel"
+REST_RULE = "Rustregel"
+MAX_HOURS = "Max uren"
+WINDOW_RULE = "Werklastregel"
+INFEASIBLE = "Onhaalbaar"
+
+
+class ShiftDiagnostics:
+    """Explains unfilled positions from the availability matrix and the final assignment.
+
+    Every available person that was not assigned to an unfilled shift is checked against the
+    rules of LPSolver.apply_constraints, so no IIS computation is needed. Only hard window limits
+    and free weekends can block a shift, a soft one costs less than an unfilled position.
+    """
+
+    def __init__(self, schedule, max_hours, sunday_quota, window_limits=None, min_free_weekends=0,
+                 soft_free_weekends=False):
+        self.schedule = schedule
+        self.max_hours = max_hours
+        self.sunday_quota = sunday_quota
+        self.conflicts = rest_conflicts_by_shift(schedule.shifts)
+        self.limits = RosterLimits(schedule, [limit for limit in window_limits or [] if not limit.soft],
+                                   0 if soft_free_weekends else min_free_weekends)
+
+    def diagnose(self, assignment, slack=None):
+        """Returns one entry per shift with unfilled positions, keyed by shift index."""
+        shifts = self.schedule.shifts
+        people = list(self.schedule.people.values())
+        assignment = np.asarray(assignment)
+        hours = np.array([s.hours for s in shifts], dtype=float)
+        is_sunday = np.array([s.day == SUNDAY for s in shifts])
+
+        assigned_hours = assignment @ hours
+        sunday_shifts = assignment[:, is_sunday].sum(axis=1)
+        if slack is None:
+            required = np.array([s.persons_required for s in shifts])
+            slack = np.maximum(required - assignment.sum(axis=0), 0)
+
+        diagnostics = {}
+        for shift_idx, shift in enumerate(shifts):
+            if slack[shift_idx] <= 0:
+                continue
+
+            blocked = {}
+            window_reasons = self.limits.blocking(assignment, shift_idx)
+            for p, person in enumerate(people):
+                if not person.availability[shift_idx] or assignment[p, shift_idx]:
+                    continue
+                blocked[person.name] = self._blocking_reason(
+                    p, person, shift_idx, shift, assignment, assigned_hours, sunday_shifts, window_reasons[p]
+                )
+
+            category, label = self._classify(blocked)
+            diagnostics[shift_idx] = {
+                'unfilled': int(slack[shift_idx]),
+                'category': category,
+                'label': label,
+                'blocked': blocked,
+            }
+
+        return diagnostics
+
+    def _blocking_reason(self, p, person, shift_idx, shift, assignment, assigned_hours, sunday_shifts,
+                         window_reason):
+        # First rule of LPSolver that keeps this person off the shift
+        if shift.day == SUNDAY:
+            if sunday_blocked(person, self.sunday_quota):
+                return (SUNDAY_RULE, f"minder dan {self.sunday_quota} uur buiten zondag")
+            if sunday_shifts[p] >= 1:
+                return (SUNDAY_RULE, "heeft al een zondagdienst")
+
+        for other_idx, rule in self.conflicts[shift_idx]:
+            if assignment[p, other_idx]:
+                other = self.schedule.shifts[other_idx]
+                return (REST_RULE, f"werkt {other.day} {other.time} ({other.shift_type}, {rule})")
+
+        if assigned_hours[p] + shift.hours > self.max_hours:
+            return (MAX_HOURS, f"{assigned_hours[p]:g} van {self.max_hours} uur ingeroosterd")
+
+        if window_reason is not None:
+            return (WINDOW_RULE, window_reason)
+
+        return (INFEASIBLE, "niet geblokkeerd door een regel")
+
+    @staticmethod
+    def _classify(blocked):
+        if not blocked:
+            return NOBODY_AVAILABLE, NOBODY_AVAILABLE
+
+        categories = {category for category, _ in blocked.values()}
+        if len(categories) == 1 and INFEASIBLE not in categories:
+            category = categories.pop()
+            if category == REST_RULE:
+                details = ", ".join(f"{name} {detail}" for name, (_, detail) in blocked.items())
+                return category, f"{REST_RULE}: {details}"
+            return category, category
+
+        # Mixed reasons, the per-person details end up on the Unfilled sheet
+        categories.discard(INFEASIBLE)
+        if not categories:
+            return INFEASIBLE, INFEASIBLE
+        return INFEASIBLE, f"{INFEASIBLE} ({', '.join(sorted(c.lower() for c in categories))})"
@@ -1,6 +1,7 @@
+import numpy as np
 import pandas as pd
-import xlwt
 from util import Schedule, Shift, Person
+from .diagnostics import ShiftDiagnostics
 
 class ExcelTool:
     @staticmethod
@@ -32,23 +33,51 @@ class ExcelTool:
 
         return schedule
 
+    @staticmethod
+    def read_assignment(schedule, filename, sheet_name="Shifts"):
+        """Reads a (possibly hand-edited) roster written by write_schedule back into an assignment matrix."""
+        df_shifts = pd.read_excel(filename, sheet_name=sheet_name)
+        if len(df_shifts) != len(schedule.shifts):
+            raise ValueError(f"{filename} has {len(df_shifts)} shifts, the schedule has {len(schedule.shifts)}")
+
+        people = list(schedule.people)
+        person_columns = [column for column in df_shifts.columns if str(column).startswith("Person")]
+        assignment = np.zeros((len(people), len(schedule.shifts)), dtype=np.int8)
+        for shift_idx, row in enumerate(df_shifts[person_columns].itertuples(index=False)):
+            for person_name in row:
+                # Cells holding unfilled-position labels are not people
+                if person_name in schedule.people:
+                    assignment[people.index(person_name), shift_idx] = 1
+        return assignment
+
     @staticmethod
     def write_schedule(schedule, solver, filename):
-        """Writes the optimized schedule to an Excel file with shifts and a summary."""
+        """Writes the optimized schedule to an Excel file with shifts and a summary.
+
+        Unfilled positions are labelled with the reason from ShiftDiagnostics.
+        """
         data = []
+        assignment, slack = solver.get_assignment()
+        # Solvers without window limits or free weekends (LegacySolver, PatternSolver) leave them out
+        diagnostics = ShiftDiagnostics(schedule, solver.max_hours, solver.sunday_quota,
+                                       getattr(solver, 'window_limits', None), getattr(solver, 'min_free_weekends', 0),
+                                       getattr(solver, 'soft_free_weekends', False)).diagnose(assignment, slack)
+
         # Reset previous assignments and bonuses
         for person in schedule.people.values():
             person.assigned_shifts = []
             person.bonus_hours = 0.0
 
         for shift_idx, shift in enumerate(schedule.shifts):
-            assigned_people = [person_name for person_name in schedule.people.keys() if solver.A[(person_name, shift_idx)].X > 0.5]
+            assigned_people = [person_name for p, person_name in enumerate(schedule.people) if assignment[p, shift_idx]]
 
             # Use the bonus_hours attribute of the Shift class
             bonus = shift.bonus_hours
 
             # Append shift data with bonus hours
             data.append([shift.day, shift.date, shift.shift_type, shift.hours, bonus] + assigned_people)
+            if shift_idx in diagnostics:
+                data[-1] += [diagnostics[shift_idx]['label']] * diagnostics[shift_idx]['unfilled']
 
             # Update assigned shifts and calculate bonus hours for each person
             for person_name in assigned_people:
@@ -68,10 +97,116 @@ class ExcelTool:
             summary_data.append([person_name, total_hours, person.bonus_hours])
         df_summary = pd.DataFrame(summary_data, columns=["Name", "Total Hours", "Bonus Hours"])
 
+        # Prepare unfilled positions DataFrame, one row per person that was available but blocked
+        unfilled_data = []
+        for shift_idx, diagnosis in diagnostics.items():
+            shift = schedule.shifts[shift_idx]
+            blocked = diagnosis['blocked'] or {"": ("", "")}
+            for person_name, (category, detail) in blocked.items():
+                unfilled_data.append([shift.day, shift.date, shift.time, diagnosis['unfilled'],
+                                      diagnosis['category'], person_name, category, detail])
+        df_unfilled = pd.DataFrame(unfilled_data, columns=["Day", "Date", "Time", "Unfilled", "Reason",
+                                                           "Available Person", "Blocked By", "Detail"])
+
         # Write to Excel with multiple sheets
         with pd.ExcelWriter(filename) as writer:
             df_shifts.to_excel(writer, sheet_name="Shifts", index=False)
             df_summary.to_excel(writer, sheet_name="Summary", index=False)
+            df_unfilled.to_excel(writer, sheet_name="Unfilled", index=False)
+
+    @staticmethod
+    def write_legacy_schedule(schedule, solver, filename):
+        """Writes the roster in the roostertool.py layout: one row per day, the time of every shift
+        followed by the assigned names, and coloured cells for positions nobody could fill."""
+        import xlwt
+
+        assignment, slack = solver.get_assignment()
+        people = list(schedule.people)
+        total_available = np.array([person.availability for person in schedule.people.values()]).sum(axis=0)
+
+        workbook = xlwt.Workbook()
+        sheet = workbook.add_sheet('Sheet 1')
+        for col, width in [(2, 15), (3, 15), (4, 20), (6, 15), (7, 20), (9, 15), (10, 20)]:
+            sheet.col(col).width = 256 * width
+
+        prev_day = None
+        row, column = 0, 1
+        for shift_idx, shift in enumerate(schedule.shifts):
+            if shift.day != prev_day:
+                column = 1
+                row += 1
+                # Empty row between weeks
+                if prev_day == "Zondag" and shift.day == "Maandag":
+                    row += 1
+                date = f"{shift.date.day}/{shift.date.month}" if pd.notna(shift.date) else ""
+                sheet.write(row, column, date)
+                column += 1
+                sheet.write(row, column, shift.day)
+            column += 1
+            sheet.write(row, column, shift.time)
+            column += 1
+
+            names = [people[p] for p in np.flatnonzero(assignment[:, shift_idx])]
+            for position in range(int(slack[shift_idx])):
+                # NoOne_1 is "Niemand beschikbaar" if nobody is available, NoOne_2 if at most one person is
+                style = xlwt.easyxf('pattern: pattern solid;')
+                if total_available[shift_idx] == position:
+                    style.pattern.pattern_fore_colour = 45
+                    names.append(("Niemand beschikbaar", style))
+                else:
+                    style.pattern.pattern_fore_colour = 43
+                    names.append(("Onhaalbaar", style))
+
+            for name in names:
+                if isinstance(name, tuple):
+                    sheet.write(row, column, *name)
+                else:
+                    sheet.write(row, column, name)
+                column += 1
+            # The next shift starts in the same column after a one- or two-person shift
+            if shift.persons_required == 2:
+                column -= 1
+            prev_day = shift.day
+
+        workbook.save(filename)
+
+    @staticmethod
+    def write_alternatives(schedule, solver, filename):
+        """Writes every roster from solver.alternatives to one workbook, with an overview sheet."""
+        overview = []
+        rosters = []
+        for alt_idx, alternative in enumerate(solver.alternatives, start=1):
+            overview.append({'Alternative': alt_idx,
+                             'Objective': alternative['objective'],
+                             'Distance To Best': alternative['distance_to_best'],
+                             **alternative['breakdown']})
+            rosters.append(ExcelTool._roster_frame(schedule, alternative['assignment']))
+
+        with pd.ExcelWriter(filename) as writer:
+            pd.DataFrame(overview).to_excel(writer, sheet_name="Overview", index=False)
+            for alt_idx, df_roster in enumerate(rosters, start=1):
+                df_roster.to_excel(writer, sheet_name=f"Alternative {alt_idx}", index=False)
+
+    @staticmethod
+    def _roster_frame(schedule, assignment):
+        """Builds the shifts table of write_schedule from a (people x shifts) assignment matrix."""
+        people = list(schedule.people)
+        data = []
+        for shift_idx, shift in enumerate(schedule.shifts):
+            assigned_people = [people[p] for p in range(len(people)) if assignment[p][shift_idx] > 0.5]
+            data.append([shift.day, shift.date, shift.shift_type, shift.hours, shift.bonus_hours] + assigned_people)
+
+        max_people = max((len(row) - 5 for row in data), default=0)
+        columns = ["Day", "Date", "Shift Type", "Hours", "Bonus Hours"] + [f"Person {i+1}" for i in range(max_people)]
+        return pd.DataFrame(data, columns=columns)
+
+    @staticmethod
+    def write_csv(schedule, solver, filename):
+        """Writes the shifts table of write_schedule as CSV, with the number of unfilled positions per shift."""
+        assignment, slack = solver.get_assignment()
+        df_roster = ExcelTool._roster_frame(schedule, assignment)
+        df_roster.insert(5, "Unfilled", slack)
+        df_roster.to_csv(filename, index=False)
 
     @staticmethod
     def write_metrics(schedule, solver, filename):
@@ -86,7 +221,8 @@ class ExcelTool:
         total_distribution_penalty = 0
         
         # Existing metrics
-        total_slack = sum(slack.X for slack in solver.slack.values())
+        assignment, slack = solver.get_assignment()
+        total_slack = slack.sum()
         total_required_persons = sum(shift.persons_required for shift in schedule.shifts)
         filled_positions = total_required_persons - total_slack
 
@@ -104,10 +240,10 @@ class ExcelTool:
             day = str(shift.day).strip().title()
             day_indexes[shift] = days_order.index(day)
 
-        for name, person in schedule.people.items():
+        for p, (name, person) in enumerate(schedule.people.items()):
             # Existing calculations
-            regular_hours = sum(solver.A[(name, i)].X * shift.hours for i, shift in enumerate(schedule.shifts))
-            bonus_hours = sum(solver.A[(name, i)].X * shift.bonus_hours for i, shift in enumerate(schedule.shifts))
+            regular_hours = sum(assignment[p, i] * shift.hours for i, shift in enumerate(schedule.shifts))
+            bonus_hours = sum(assignment[p, i] * shift.bonus_hours for i, shift in enumerate(schedule.shifts))
             
             expected_regular = (person.available_regular_hours / schedule.get_total_available_regular()) * sum(shift.hours * shift.persons_required for shift in schedule.shifts)
             expected_bonus = (person.available_regular_hours / schedule.get_total_available_regular()) * sum(shift.bonus_hours * shift.persons_required for shift in schedule.shifts)
@@ -117,7 +253,7 @@ class ExcelTool:
 
             # Distribution penalty calculation
             person_penalty = 0
-            assigned_shifts = person.assigned_shifts
+            assigned_shifts = [shift for i, shift in enumerate(schedule.shifts) if assignment[p, i]]
             
             # Compare all pairs of shifts
             for i in range(len(assigned_shifts)):
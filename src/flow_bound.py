@@ -0,0 +1,157 @@
+import itertools
+import time
+from collections import deque
+
+import numpy as np
+from util.objective import availability_matrix
+from util.rules import SUNDAY, day_indices, rest_conflict_pairs, sunday_blocked
+
+
+class MaxFlow:
+    """Dinic's algorithm on an adjacency list, edges are [to, capacity, index of the reverse edge]."""
+
+    def __init__(self, num_nodes):
+        self.graph = [[] for _ in range(num_nodes)]
+
+    def add_edge(self, u, v, capacity):
+        """Adds u -> v and returns (u, position) so its flow can be read after max_flow."""
+        self.graph[u].append([v, capacity, len(self.graph[v])])
+        self.graph[v].append([u, 0, len(self.graph[u]) - 1])
+        return u, len(self.graph[u]) - 1
+
+    def flow(self, edge, capacity):
+        u, position = edge
+        return capacity - self.graph[u][position][1]
+
+    def max_flow(self, source, sink):
+        total = 0
+        while self._levels(source, sink):
+            self.next_edge = [0] * len(self.graph)
+            pushed = self._push(source, sink, float('inf'))
+            while pushed:
+                total += pushed
+                pushed = self._push(source, sink, float('inf'))
+        return total
+
+    def _levels(self, source, sink):
+        self.level = [-1] * len(self.graph)
+        self.level[source] = 0
+        queue = deque([source])
+        while queue:
+            u = queue.popleft()
+            for v, capacity, _ in self.graph[u]:
+                if capacity > 0 and self.level[v] < 0:
+                    self.level[v] = self.level[u] + 1
+                    queue.append(v)
+        return self.level[sink] >= 0
+
+    def _push(self, u, sink, limit):
+        if u == sink:
+            return limit
+        while self.next_edge[u] < len(self.graph[u]):
+            edge = self.graph[u][self.next_edge[u]]
+            v, capacity, reverse = edge
+            if capacity > 0 and self.level[v] == self.level[u] + 1:
+                pushed = self._push(v, sink, min(limit, capacity))
+                if pushed:
+                    edge[1] -= pushed
+                    self.graph[v][reverse][1] += pushed
+                    return pushed
+            self.next_edge[u] += 1
+        return 0
+
+
+class CoverageBound:
+    """Upper bound on the positions a roster can fill, from coverage_bound."""
+
+    def __init__(self, required, max_filled, shortfall, slack_lower_bounds, runtime):
+        self.required = required  # Positions over all shifts
+        self.max_filled = max_filled
+        self.shortfall = shortfall  # Unfilled positions per shift in one maximum flow
+        self.slack_lower_bounds = slack_lower_bounds  # Per shift, from the people who can take it at all
+        self.runtime = runtime
+
+    @property
+    def min_unfilled(self):
+        return self.required - self.max_filled
+
+    @property
+    def bottlenecks(self):
+        """Shifts left unfilled by the maximum flow, most unfilled positions first."""
+        shifts = np.flatnonzero(self.shortfall)
+        return shifts[np.argsort(-self.shortfall[shifts], kind="stable")].tolist()
+
+    def __str__(self):
+        return (f"At most {self.max_filled} of {self.required} positions can be filled "
+                f"({self.min_unfilled} unfilled), bottleneck shifts {self.bottlenecks}")
+
+
+def _max_independent(shifts, conflicts):
+    """Size of the largest subset of shifts without a conflicting pair (a day has only a few shifts)."""
+    for size in range(len(shifts), 0, -1):
+        for subset in itertools.combinations(shifts, size):
+            if not any((a, b) in conflicts for a, b in itertools.combinations(subset, 2)):
+                return size
+    return 0
+
+
+def coverage_bound(schedule, max_hours, sunday_quota):
+    """Maximum flow source -> person -> person-day -> shift -> sink over the schedule.
+
+    A person carries at most as many shifts as their shortest eligible shifts fit in max_hours, a
+    day at most the largest set of that day's shifts without a rest-rule conflict, and all Sunday
+    days of a person share one unit (C7). People below the Sunday quota get no Sunday edges (C6)
+    and every shift takes its required number of people. Rest rules across days and window
+    limits are left out, so the flow is an upper bound on the positions any roster fills.
+    """
+    start = time.perf_counter()
+    shifts = schedule.shifts
+    people = list(schedule.people)
+    availability = availability_matrix(schedule).astype(bool)
+    hours = np.array([s.hours for s in shifts], dtype=float)
+    required = np.rint([s.persons_required for s in shifts]).astype(int)
+    is_sunday = np.array([s.day == SUNDAY for s in shifts], dtype=bool)
+    blocked = np.array([sunday_blocked(schedule.people[name], sunday_quota) for name in people], dtype=bool)
+    eligible = availability & ~(blocked[:, None] & is_sunday[None, :]) & (required > 0)[None, :]
+
+    days = day_indices(shifts)
+    conflicts = {(first, second) for first, second, _ in rest_conflict_pairs(shifts)}
+    conflicts |= {(second, first) for first, second in conflicts}
+
+    # Nodes: source, sink, shifts, then per person a person node, a Sunday node and person-day nodes
+    source, sink = 0, 1
+    shift_node = 2 + np.arange(len(shifts))
+    edges = []  # (u, v, capacity)
+    next_node = 2 + len(shifts)
+    for p in range(len(people)):
+        eligible_shifts = np.flatnonzero(eligible[p])
+        if len(eligible_shifts) == 0:
+            continue
+        cumulative = np.cumsum(np.sort(hours[eligible_shifts]))
+        max_shifts = int(np.searchsorted(cumulative, max_hours + 1e-9, side="right"))
+        if max_shifts == 0:
+            continue
+        person_node, sunday_node = next_node, next_node + 1
+        next_node += 2
+        edges.append((source, person_node, max_shifts))
+        edges.append((person_node, sunday_node, 1))
+
+        for day in sorted({days[s] for s in eligible_shifts}):
+            day_shifts = [int(s) for s in eligible_shifts if days[s] == day]
+            day_node = next_node
+            next_node += 1
+            parent = sunday_node if is_sunday[day_shifts[0]] else person_node
+            edges.append((parent, day_node, _max_independent(day_shifts, conflicts)))
+            edges += [(day_node, shift_node[s], 1) for s in day_shifts]
+
+    network = MaxFlow(next_node)
+    for u, v, capacity in edges:
+        network.add_edge(u, v, capacity)
+    sink_edges = [network.add_edge(shift_node[s], sink, int(required[s])) for s in range(len(shifts))]
+    max_filled = network.max_flow(source, sink)
+
+    filled = np.array([network.flow(edge, required[s]) for s, edge in enumerate(sink_edges)], dtype=int)
+    # A shift can at best be taken by everybody who is eligible for it
+    slack_lower_bounds = np.maximum(required - eligible.sum(axis=0), 0)
+    return CoverageBound(int(required.sum()), int(max_filled), required - filled, slack_lower_bounds,
+                         time.perf_counter() - start)
@@ -0,0 +1,74 @@
+import datetime
+import sqlite3
+
+import numpy as np
+from util.objective import expected_hours
+
+LEDGER_FILE = "fairness_ledger.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ledger (
+    person TEXT NOT NULL,
+    period TEXT NOT NULL,
+    expected_regular REAL NOT NULL,
+    received_regular REAL NOT NULL,
+    expected_bonus REAL NOT NULL,
+    received_bonus REAL NOT NULL,
+    recorded TEXT NOT NULL,
+    PRIMARY KEY (person, period)
+);
+CREATE INDEX IF NOT EXISTS ledger_period ON ledger (period, person);
+"""
+
+
+class FairnessLedger:
+    """Expected versus received regular and bonus hours per person and period, kept in SQLite.
+
+    Periods are strings that sort chronologically, e.g. "2024-03". The deficit of a person is the
+    sum of expected minus received hours over the earlier periods, LPSolver adds it to the
+    expected hours of the next period (see carry_over) so every period can be solved on its own.
+    Recording a period again replaces its rows.
+    """
+
+    def __init__(self, path=LEDGER_FILE):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(_SCHEMA)
+
+    def record(self, period, schedule, assignment):
+        """Stores the expected and received hours of a solved (people x shifts) assignment."""
+        assignment = np.asarray(assignment, dtype=float)
+        hours = np.array([s.hours for s in schedule.shifts], dtype=float)
+        bonus = np.array([s.bonus_hours for s in schedule.shifts], dtype=float)
+        exp_reg, exp_bonus = expected_hours(schedule)
+        received_reg, received_bonus = assignment @ hours, assignment @ bonus
+
+        recorded = datetime.datetime.now().isoformat(timespec="seconds")
+        rows = [(person_name, str(period), float(exp_reg[p]), float(received_reg[p]), float(exp_bonus[p]),
+                 float(received_bonus[p]), recorded)
+                for p, person_name in enumerate(schedule.people)]
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO ledger VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def carry_over(self, people, period):
+        """Regular and bonus deficit per person over all periods before period, as {name: (regular, bonus)}."""
+        carry_over = {}
+        for person_name in people:
+            regular, bonus = self.connection.execute(
+                "SELECT COALESCE(SUM(expected_regular - received_regular), 0), "
+                "COALESCE(SUM(expected_bonus - received_bonus), 0) "
+                "FROM ledger WHERE person = ? AND period < ?", (person_name, str(period))).fetchone()
+            carry_over[person_name] = (regular, bonus)
+        return carry_over
+
+    def history(self, person_name):
+        """All periods of a person as (period, expected_regular, received_regular, expected_bonus, received_bonus)."""
+        return self.connection.execute(
+            "SELECT period, expected_regular, received_regular, expected_bonus, received_bonus "
+            "FROM ledger WHERE person = ? ORDER BY period", (person_name,)).fetchall()
+
+    def periods(self):
+        return [row[0] for row in self.connection.execute("SELECT DISTINCT period FROM ledger ORDER BY period")]
+
+    def close(self):
+        self.connection.close()
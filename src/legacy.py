@@ -0,0 +1,130 @@
+import math
+import numpy as np
+import gurobipy as gp
+import pandas as pd
+from util import Schedule, Shift, Person
+from util.objective import availability_matrix
+from .lp_solver import LPSolver
+
+# Objective weights of the NoOne_1 / NoOne_2 dummies in roostertool.py
+NO_ONE_PENALTIES = (1000, 2000)
+LEGACY_TIME_LIMIT = 30
+
+
+def legacy_hours(time_str):
+    """Shift length as roostertool.calc_hour counts it, without counting minute by minute.
+
+    An end time before the start time wraps past midnight and equal times are a full 24 hours.
+    "24:00" is read as midnight, roostertool.py itself never terminates on it.
+    """
+    if not isinstance(time_str, str) or time_str.strip() in ("-", ""):
+        return 0
+    start = int(time_str[0:2]) * 60 + int(time_str[3:5])
+    end = (int(time_str[6:8]) % 24) * 60 + int(time_str[9:11])
+    return ((end - start - 1) % (24 * 60) + 1) / 60
+
+
+def read_legacy_availability(file_path, poule="Poule Library", required_column="Benodigd (lib)"):
+    """Reads the "Hele Team" sheet the way roostertool.py does.
+
+    Rows without a shift type are skipped, empty day cells repeat the previous day and date, shifts
+    without hours need nobody and people are the names from the first person of the poule onwards.
+    Poules without a required column need one person per shift.
+    """
+    header = pd.read_excel(file_path, sheet_name="Hele Team", nrows=1).iloc[0]
+    first_person = header[poule]
+    names = list(header)
+    people = names[names.index(first_person):]
+
+    availability = pd.read_excel(file_path, header=1, sheet_name="Hele Team")
+    schedule = Schedule()
+    for person_name in people:
+        schedule.people[person_name] = Person(person_name)
+
+    day, date = None, None
+    for _, row in availability.iterrows():
+        if not isinstance(row["Type"], str):
+            continue
+        if isinstance(row["Dag"], str):
+            day, date = row["Dag"], row["Datum"]
+        hours = legacy_hours(row[poule])
+        if math.isclose(hours, 0):
+            persons_required = 0
+        else:
+            persons_required = int(row[required_column]) if required_column else 1
+        schedule.shifts.append(Shift(row[poule], hours, persons_required, row["Type"], day, date))
+
+        for person_name, person in schedule.people.items():
+            person.availability.append(1 if row[person_name] in ["j", "J", "x", "X"] else 0)
+
+    schedule.calculate_availability()
+    schedule.calculate_non_sunday_hours()
+    return schedule
+
+
+def no_one_capacity(schedule):
+    """Positions NoOne_1 and NoOne_2 can take per shift, each a 0/1 array."""
+    required = np.array([s.persons_required for s in schedule.shifts])
+    return (required >= 1).astype(int), (required == 2).astype(int)
+
+
+def legacy_shares(schedule):
+    """Share of the available hours per person, the total includes the hours of the NoOne dummies."""
+    hours = np.array([s.hours for s in schedule.shifts], dtype=float)
+    available = availability_matrix(schedule) @ hours
+    no_one_1, no_one_2 = no_one_capacity(schedule)
+    total = available.sum() + (no_one_1 + no_one_2) @ hours
+    return available / total if total > 0 else np.zeros_like(available)
+
+
+def legacy_objective(schedule, assignment, slack):
+    """Evaluates the roostertool.py objective for a (people x shifts) assignment and slack per shift."""
+    hours = np.array([s.hours for s in schedule.shifts], dtype=float)
+    slack = np.asarray(slack)
+    received = np.asarray(assignment, dtype=float) @ hours / hours.sum()
+    no_one_1 = np.minimum(slack, 1)
+    no_one_2 = slack - no_one_1
+    return float(np.sum((legacy_shares(schedule) - received) ** 2)
+                 + NO_ONE_PENALTIES[0] * no_one_1.sum() + NO_ONE_PENALTIES[1] * no_one_2.sum())
+
+
+class LegacySolver(LPSolver):
+    """LPSolver with the roostertool.py model, for teams that still compare against it.
+
+    The objective is the squared difference between the share of available and received hours,
+    without bonus hours or spread, and the NoOne_1 / NoOne_2 dummies become two binary slack
+    positions per shift. Constraints C3-C8 are the ones of LPSolver.
+    """
+
+    def __init__(self, schedule, max_hours, sunday_quota, time_limit=LEGACY_TIME_LIMIT):
+        super().__init__(schedule, max_hours, sunday_quota, spread_weight=0, tuning_profile=None,
+                         use_coverage_bound=False)
+        self.model.setParam('TimeLimit', time_limit)
+        self.no_one = {}
+
+    def setup_variables(self):
+        super().setup_variables()
+        for k, capacity in enumerate(no_one_capacity(self.schedule), start=1):
+            for shift_idx, ub in enumerate(capacity):
+                self.no_one[(k, shift_idx)] = self.model.addVar(vtype=gp.GRB.BINARY, ub=ub,
+                                                                name=f"NoOne_{k}_{shift_idx}")
+
+    def set_objective(self):
+        shares = legacy_shares(self.schedule)
+        total_hours = sum(s.hours for s in self.schedule.shifts)
+        objective = 0
+        for p, person_name in enumerate(self.schedule.people):
+            received = gp.quicksum(self.A[(person_name, shift_idx)] * shift.hours
+                                   for shift_idx, shift in enumerate(self.schedule.shifts)) / total_hours
+            error = self.model.addVar(lb=-gp.GRB.INFINITY, name=f"Error_{person_name}")
+            self.model.addConstr(error == shares[p] - received, name=f"C1_Error_{person_name}")
+            objective += error * error
+
+        objective += gp.quicksum(NO_ONE_PENALTIES[k - 1] * var for (k, _), var in self.no_one.items())
+        self.model.setObjective(objective, gp.GRB.MINIMIZE)
+
+    def apply_constraints(self):
+        super().apply_constraints()
+        for shift_idx in range(len(self.schedule.shifts)):
+            self.model.addConstr(self.slack[shift_idx] == self.no_one[(1, shift_idx)] + self.no_one[(2, shift_idx)],
+                                 name=f"C2_NoOne_{shift_idx}")
@@ -1,16 +1,60 @@
 import gurobipy as gp
 import numpy as np
 import pandas as pd
+from util.objective import BONUS_WEIGHT, FAIRNESS_FORMULATIONS, HYBRID_MINIMAX_WEIGHT, SLACK_PENALTY, SPREAD_WEIGHT, \
+    WINDOW_PENALTY, availability_matrix, objective_breakdown, pwl_breakpoints
+from util.rules import SUNDAY, day_indices, weekends, window_starts
+from .flow_bound import coverage_bound
+from .tuning import load_profile
+from .validator import RosterValidator
 
 class LPSolver:
-    def __init__(self, schedule, max_hours, sunday_quota):
+    def __init__(self, schedule, max_hours, sunday_quota, lazy_constraints=False, bonus_rules=None,
+                 window_limits=None, min_free_weekends=0, soft_free_weekends=False, spread_weight=SPREAD_WEIGHT,
+                 tuning_profile=None, carry_over=None, fairness="quadratic",
+                 use_coverage_bound=False):
+        if fairness not in FAIRNESS_FORMULATIONS:
+            raise ValueError(f"Unknown fairness formulation {fairness!r}, expected one of {FAIRNESS_FORMULATIONS}")
         self.schedule = schedule
+        # How the regular and bonus deviations enter the objective, quadratic is the exact MIQP term
+        self.fairness = fairness
+        self.expected = {}  # Expected regular and bonus hours per person, carry-over included
+        # Bound the slack with a max-flow over people, days and shifts (src.flow_bound) before solving
+        self.use_coverage_bound = use_coverage_bound
+        self.coverage = None
+        self.pwl_terms = []  # (variable, x, y) set with setPWLObj after setObjective
+        # Regular and bonus hours owed per person from earlier periods, see src.ledger.FairnessLedger
+        self.carry_over = carry_over or {}
+        # Recompute bonus hours from a util.bonus_rules.BonusRuleSet instead of the default rates
+        self.bonus_rules = bonus_rules
+        if bonus_rules is not None:
+            bonus_rules.apply(schedule)
         self.max_hours = max_hours
         self.sunday_quota = sunday_quota
+        # Add rest, one-Sunday and max-hours rows only when a new incumbent violates them
+        self.lazy_constraints = lazy_constraints
+        self.lazy_added = {'rest': 0, 'sunday': 0, 'max_hours': 0}
         self.model = gp.Model()
         self.model.setParam('TimeLimit', 100)
+        # Parameters stored by `python -m src.tuning tune` (e.g. PROFILE_FILE), None keeps the Gurobi defaults
+        self.profile = load_profile(tuning_profile)
+        if self.profile:
+            for name, value in self.profile['params'].items():
+                self.model.setParam(name, value)
+        self.model._solver = self
         self.A = {}  # Decision variables
         self.slack = {}  # Slack variables for unfilled shifts
+        self.alternatives = []  # Distinct rosters collected by solve_alternatives
+        # Sliding-window workload limits (util.rules.WindowLimit) and free weekends
+        self.window_limits = window_limits or []
+        self.min_free_weekends = min_free_weekends
+        self.soft_free_weekends = soft_free_weekends
+        # The window limits can replace the spread penalty, 0 leaves it out of the model
+        self.spread_weight = spread_weight
+        self.works = {}  # Per-person per-day work indicators
+        self.prefix = {}  # Per-person prefix sums of the daily workload
+        self.free_weekend = {}
+        self.window_excess = {}  # Excess variables of soft limits
 
     def setup_variables(self):
         for shift_idx, shift in enumerate(self.schedule.shifts):
@@ -20,6 +64,39 @@ class LPSolver:
             # Add slack variable to represent unfilled shifts (if available people are fewer than required)
             self.slack[shift_idx] = self.model.addVar(vtype=gp.GRB.INTEGER, lb=0, name=f"Slack_{shift_idx}")
 
+        if self.window_limits or self.min_free_weekends:
+            self._setup_window_variables()
+
+    def _setup_window_variables(self):
+        self.day_of = day_indices(self.schedule.shifts)
+        num_days = self.day_of[-1] + 1 if self.day_of else 0
+        metrics = {metric for limit in self.window_limits for metric, _ in limit.limits()}
+
+        for person_name in self.schedule.people:
+            if 'days' in metrics or self.min_free_weekends:
+                for day in range(num_days):
+                    self.works[(person_name, day)] = self.model.addVar(vtype=gp.GRB.BINARY,
+                                                                       name=f"Works_{person_name}_{day}")
+            # prefix[metric, person][d] is the workload of days 0..d-1, so a window is a difference of two entries
+            for metric in metrics:
+                self.prefix[(metric, person_name)] = [0] + [
+                    self.model.addVar(name=f"Prefix_{metric}_{person_name}_{day}") for day in range(num_days)]
+            if self.min_free_weekends:
+                for weekend_idx in range(len(weekends(self.schedule.shifts))):
+                    self.free_weekend[(person_name, weekend_idx)] = self.model.addVar(
+                        vtype=gp.GRB.BINARY, name=f"FreeWeekend_{person_name}_{weekend_idx}")
+                if self.soft_free_weekends:
+                    self.window_excess[('weekend', person_name)] = self.model.addVar(
+                        name=f"FreeWeekendShortfall_{person_name}")
+
+            for limit_idx, limit in enumerate(self.window_limits):
+                if not limit.soft:
+                    continue
+                for metric, _ in limit.limits():
+                    for start, _ in window_starts(num_days, limit.days):
+                        self.window_excess[(limit_idx, metric, person_name, start)] = self.model.addVar(
+                            name=f"WindowExcess_{limit_idx}_{metric}_{person_name}_{start}")
+
     def set_objective(self):
         # Main objective composition
         objective = 0
@@ -28,17 +105,25 @@ class LPSolver:
         objective +=  self._build_hour_distribution_terms()
         
         # Add spread penalty for shift clustering
-        objective +=  10 * self._build_shift_spread_penalty()
+        if self.spread_weight:
+            objective += self.spread_weight * self._build_shift_spread_penalty()
         
         # Add slack penalty for unfilled shifts
         objective += self._build_slack_penalty()
+
+        # Add penalty for exceeding soft window limits
+        objective += self._build_window_penalty()
         
         self.model.setObjective(objective, gp.GRB.MINIMIZE)
 
+        # setObjective resets the objective of every variable, so the PWL terms come last
+        for var, x, y in self.pwl_terms:
+            self.model.setPWLObj(var, x, y)
+
     def _build_hour_distribution_terms(self):
         # Calculate hour distribution error terms
         total_available, total_regular, total_bonus = self._precompute_totals()
-        error_terms = 0
+        errors = []
 
         for person_name, person in self.schedule.people.items():
             assigned_regular, assigned_bonus = self._get_assigned_hours(person_name)
@@ -46,9 +131,60 @@ class LPSolver:
                 person, assigned_regular, assigned_bonus, 
                 total_available, total_regular, total_bonus
             )
-            error_terms += err_reg**2 + 0.3*err_bonus**2
+            errors.append((person, err_reg, err_bonus))
+
+        if self.fairness == "quadratic":
+            return gp.quicksum(err_reg**2 + BONUS_WEIGHT*err_bonus**2 for _, err_reg, err_bonus in errors)
+        if self.fairness == "pwl":
+            return self._build_pwl_fairness(errors)
+
+        # The linear formulations split every error into its positive and negative part
+        deviations = []
+        for person, err_reg, err_bonus in errors:
+            deviations.append((self._absolute(err_reg, f"AbsErrReg_{person.name}"),
+                               self._absolute(err_bonus, f"AbsErrBonus_{person.name}")))
+        l1 = gp.quicksum(dev_reg + BONUS_WEIGHT*dev_bonus for dev_reg, dev_bonus in deviations)
+        if self.fairness == "l1":
+            return l1
 
-        return error_terms
+        max_reg = self.model.addVar(name="MaxErrReg")
+        max_bonus = self.model.addVar(name="MaxErrBonus")
+        for (dev_reg, dev_bonus), (person, _, _) in zip(deviations, errors):
+            self.model.addConstr(dev_reg <= max_reg, name=f"C1_MaxErrReg_{person.name}")
+            self.model.addConstr(dev_bonus <= max_bonus, name=f"C1_MaxErrBonus_{person.name}")
+        minimax = max_reg + BONUS_WEIGHT*max_bonus
+        if self.fairness == "minimax":
+            return minimax
+        return l1 + HYBRID_MINIMAX_WEIGHT*minimax
+
+    def _absolute(self, expr, name):
+        # |expr| as pos + neg with expr == pos - neg, exact because the objective pushes both down
+        pos = self.model.addVar(name=f"{name}_Pos")
+        neg = self.model.addVar(name=f"{name}_Neg")
+        self.model.addConstr(expr == pos - neg, name=f"C1_{name}")
+        return pos + neg
+
+    def _build_pwl_fairness(self, errors):
+        # err^2 through PWL_SEGMENTS chords over the range the error can take, plus a breakpoint at 0.
+        # The range is taken from the availability itself, calculate_availability() may not have run.
+        availability = availability_matrix(self.schedule)
+        hours = np.array([s.hours for s in self.schedule.shifts], dtype=float)
+        bonus = np.array([s.bonus_hours for s in self.schedule.shifts], dtype=float)
+        max_hours = self.max_hours if self.max_hours is not None else float('inf')
+        constant = 0
+        for (person, err_reg, err_bonus), available in zip(errors, availability):
+            exp_reg, exp_bonus = self.expected[person.name]
+            most_reg = min(float(available @ hours), max_hours)
+            for var, expected, most, weight in [(err_reg, exp_reg, most_reg, 1.0),
+                                                (err_bonus, exp_bonus, float(available @ bonus), BONUS_WEIGHT)]:
+                var.LB, var.UB = expected - most, expected
+                if most <= 0:
+                    # Nothing to assign, the error is fixed at the expected hours
+                    constant += weight * expected**2
+                    continue
+                x = pwl_breakpoints(expected, most)
+                self.pwl_terms.append((var, x.tolist(), (weight * x**2).tolist()))
+        return constant
 
     def _build_shift_spread_penalty(self):
         # Calculate shift spread penalty with decaying weights
@@ -86,7 +222,11 @@ class LPSolver:
 
     def _build_slack_penalty(self):
         # Penalty for unfilled shifts
-        return 100000 * gp.quicksum(self.slack.values())
+        return SLACK_PENALTY * gp.quicksum(self.slack.values())
+
+    def _build_window_penalty(self):
+        # Zero unless soft window limits or soft free weekends are set
+        return WINDOW_PENALTY * gp.quicksum(self.window_excess.values())
 
     def _precompute_totals(self):
         # Helper for total hour calculations
@@ -116,6 +256,10 @@ class LPSolver:
             exp_bonus = (person.available_regular_hours/total_available) * total_bonus
         else:
             exp_reg = exp_bonus = 0
+        carry_reg, carry_bonus = self.carry_over.get(person.name, (0, 0))
+        exp_reg += carry_reg
+        exp_bonus += carry_bonus
+        self.expected[person.name] = (exp_reg, exp_bonus)
 
         err_reg = self.model.addVar(lb=-gp.GRB.INFINITY)
         err_bonus = self.model.addVar(lb=-gp.GRB.INFINITY)
@@ -148,19 +292,41 @@ class LPSolver:
     def apply_constraints(self):
         self._apply_shift_assignment_constraints()
         self._apply_availability_constraints()
-        self._apply_no_night_to_morning_constraints()
-        self._apply_no_evening_to_morning_constraints()
         self._apply_no_sunday_if_quota_not_met_constraints()
-        self._apply_max_one_sunday_shift_constraints()
-        self._apply_max_hours_constraints()
+        if not self.lazy_constraints:
+            self._apply_no_night_to_morning_constraints()
+            self._apply_no_evening_to_morning_constraints()
+            self._apply_max_one_sunday_shift_constraints()
+            self._apply_max_hours_constraints()
+        if self.works:
+            self._apply_work_indicator_constraints()
+        if self.window_limits:
+            self._apply_window_constraints()
+        if self.min_free_weekends:
+            self._apply_free_weekend_constraints()
+        if self.use_coverage_bound:
+            self._apply_coverage_bound()
+
+    def _apply_coverage_bound(self):
+        # No roster fills more positions than the max-flow, so the slack has a known minimum
+        self.coverage = coverage_bound(self.schedule, self.max_hours, self.sunday_quota)
+        for shift_idx, lower_bound in enumerate(self.coverage.slack_lower_bounds):
+            self.slack[shift_idx].LB = lower_bound
+        if self.coverage.min_unfilled > 0:
+            self.model.addConstr(gp.quicksum(self.slack.values()) >= self.coverage.min_unfilled,
+                                 name="C11_CoverageBound")
+            shifts = self.schedule.shifts
+            bottlenecks = ", ".join(f"{shift_idx} ({str(shifts[shift_idx].day).strip()} {shifts[shift_idx].time})"
+                                    for shift_idx in self.coverage.bottlenecks[:10])
+            print(f"Warning: at most {self.coverage.max_filled} of {self.coverage.required} positions can be filled, "
+                  f"at least {self.coverage.min_unfilled} will stay unfilled. Bottleneck shifts: {bottlenecks}")
 
     def _apply_shift_assignment_constraints(self):
         for shift_idx, shift in enumerate(self.schedule.shifts):
             # Total assignments for each shift must equal the number of persons required for that shift, plus slack for unfilled shifts
             self.model.addConstr(
-                sum(self.A[(person_name, shift_idx)] for person_name in self.schedule.people) + self.slack[shift_idx],
-                gp.GRB.EQUAL, 
-                shift.persons_required, 
+                sum(self.A[(person_name, shift_idx)] for person_name in self.schedule.people) + self.slack[shift_idx]
+                == shift.persons_required,
                 name=f"C2_ShiftAssignment_{shift_idx}"
             )
 
@@ -213,5 +379,169 @@ class LPSolver:
             self.model.addConstr(sum(self.A[(person_name, shift_idx)] * shift.hours for shift_idx, shift in enumerate(self.schedule.shifts)) <= self.max_hours,
                                  name=f"C8_MaxHours_{person_name}")
 
+    def _apply_work_indicator_constraints(self):
+        # Works is 1 on every day with an assigned shift. It is not forced to 0 on free days,
+        # every limit on it is an upper bound so the solver has no reason to set it.
+        for person_name, person in self.schedule.people.items():
+            for shift_idx, day in enumerate(self.day_of):
+                if person.availability[shift_idx]:
+                    self.model.addConstr(self.A[(person_name, shift_idx)] <= self.works[(person_name, day)],
+                                         name=f"C9_WorkIndicator_{person_name}_{shift_idx}")
+
+    def _daily_load(self, metric, person_name):
+        load = [0] * len(self.prefix[(metric, person_name)][1:])
+        if metric == 'days':
+            return [self.works[(person_name, day)] for day in range(len(load))]
+        for shift_idx, (shift, day) in enumerate(zip(self.schedule.shifts, self.day_of)):
+            load[day] += self.A[(person_name, shift_idx)] * (shift.hours if metric == 'hours' else 1)
+        return load
+
+    def _apply_window_constraints(self):
+        # One row per day defines the prefix sums, then one row with two entries per window start
+        for (metric, person_name), prefix in self.prefix.items():
+            for day, load in enumerate(self._daily_load(metric, person_name)):
+                self.model.addConstr(prefix[day + 1] == prefix[day] + load,
+                                     name=f"C9_Prefix_{metric}_{person_name}_{day}")
+
+        for limit_idx, limit in enumerate(self.window_limits):
+            for metric, bound in limit.limits():
+                for person_name in self.schedule.people:
+                    prefix = self.prefix[(metric, person_name)]
+                    for start, end in window_starts(len(prefix) - 1, limit.days):
+                        excess = self.window_excess.get((limit_idx, metric, person_name, start), 0)
+                        self.model.addConstr(prefix[end] - prefix[start] <= bound + excess,
+                                             name=f"C9_Window_{limit_idx}_{metric}_{person_name}_{start}")
+
+    def _apply_free_weekend_constraints(self):
+        # A horizon with fewer weekends than min_free_weekends only requires all of them free
+        weekend_days = weekends(self.schedule.shifts)
+        for person_name in self.schedule.people:
+            for weekend_idx, days in enumerate(weekend_days):
+                free = self.free_weekend[(person_name, weekend_idx)]
+                for day in days:
+                    self.model.addConstr(free <= 1 - self.works[(person_name, day)],
+                                         name=f"C10_FreeWeekend_{person_name}_{weekend_idx}_{day}")
+            shortfall = self.window_excess.get(('weekend', person_name), 0)
+            self.model.addConstr(gp.quicksum(self.free_weekend[(person_name, weekend_idx)]
+                                             for weekend_idx in range(len(weekend_days)))
+                                 + shortfall >= min(self.min_free_weekends, len(weekend_days)),
+                                 name=f"C10_MinFreeWeekends_{person_name}")
+
     def solve(self):
-        self.model.optimize()
+        self._optimize()
+
+    def save_instance(self, filename):
+        """Writes the model (e.g. .mps) so it can be used as a tuning instance."""
+        self.model.update()
+        self.model.write(filename)
+
+    def solve_alternatives(self, k=5, min_distance=4, pool_factor=4, gap=None):
+        """Solves once and keeps up to k rosters that differ in at least min_distance assignments.
+
+        gap limits the alternatives to a relative gap from the best roster, None keeps any the pool finds.
+        """
+        self.model.setParam('PoolSearchMode', 2)
+        self.model.setParam('PoolSolutions', k * pool_factor)
+        if gap is not None:
+            self.model.setParam('PoolGap', gap)
+        self._optimize()
+
+        # Pool solutions are sorted from best to worst objective
+        self.alternatives = []
+        for solution_idx in range(self.model.SolCount):
+            self.model.setParam('SolutionNumber', solution_idx)
+            assignment, slack = self.get_assignment(attr='Xn')
+            distances = [int(np.sum(assignment != alt['assignment'])) for alt in self.alternatives]
+            if distances and min(distances) < min_distance:
+                continue
+
+            self.alternatives.append({
+                'assignment': assignment,
+                'slack': slack,
+                'objective': self.model.PoolObjVal,
+                'breakdown': self.breakdown(assignment, slack),
+                'distance_to_best': distances[0] if distances else 0,
+            })
+            if len(self.alternatives) == k:
+                break
+
+        return self.alternatives
+
+    def breakdown(self, assignment, slack):
+        """objective_breakdown of a roster in the objective of this model."""
+        return objective_breakdown(self.schedule, assignment, slack, self.spread_weight, self.carry_over,
+                                   self.fairness, self.window_limits, self.min_free_weekends, self.soft_free_weekends,
+                                   self.max_hours)
+
+    def get_assignment(self, attr='X'):
+        """Returns the (people x shifts) assignment matrix and the slack per shift."""
+        people = list(self.schedule.people)
+        num_shifts = len(self.schedule.shifts)
+        values = self.model.getAttr(attr, [self.A[(person_name, shift_idx)]
+                                           for person_name in people for shift_idx in range(num_shifts)])
+        assignment = (np.array(values).reshape(len(people), num_shifts) > 0.5).astype(np.int8)
+        slack = np.rint(self.model.getAttr(attr, [self.slack[shift_idx] for shift_idx in range(num_shifts)]))
+        return assignment, slack.astype(int)
+
+    def _optimize(self):
+        if not self.lazy_constraints:
+            self.model.optimize()
+            return
+
+        self.prepare_lazy()
+        self.model.optimize(LPSolver._lazy_callback)
+
+        upfront = self._count_lazy_candidates()
+        print(f"Lazy constraints added: {sum(self.lazy_added.values())} of {upfront} "
+              f"(rest: {self.lazy_added['rest']}, sunday: {self.lazy_added['sunday']}, "
+              f"max hours: {self.lazy_added['max_hours']})")
+
+    def prepare_lazy(self):
+        """Sets up the model for add_lazy_rows, for callers that run model.optimize themselves."""
+        self._lazy_vars = [self.A[(person_name, shift_idx)]
+                           for person_name in self.schedule.people for shift_idx in range(len(self.schedule.shifts))]
+        self._lazy_validator = RosterValidator(self.schedule, self.max_hours, self.sunday_quota)
+        self._lazy_keys = set()
+        self.model.setParam('LazyConstraints', 1)
+
+    @staticmethod
+    def _lazy_callback(model, where):
+        if where == gp.GRB.Callback.MIPSOL:
+            model._solver.add_lazy_rows(model)
+
+    def add_lazy_rows(self, model):
+        """Cuts off the MIPSOL incumbent where it breaks a lazy rule, returns the number of violated rows."""
+        values = model.cbGetSolution(self._lazy_vars)
+        assignment = np.array(values).reshape(len(self.schedule.people), len(self.schedule.shifts))
+
+        # Every violated row is cut off, also when it was added before: Gurobi may still present
+        # incumbents that break an added lazy constraint. Each distinct row is counted once.
+        violated = 0
+        for violation in self._lazy_validator.validate(assignment):
+            person_name = violation.person
+            if violation.rule.startswith(("C4", "C5")):
+                first, second = violation.shifts
+                key, kind = (violation.rule, person_name, first, second), 'rest'
+                model.cbLazy(self.A[(person_name, first)] + self.A[(person_name, second)] <= 1)
+            elif violation.rule == "C7_OneSundayShift":
+                key, kind = (violation.rule, person_name), 'sunday'
+                model.cbLazy(gp.quicksum(self.A[(person_name, shift_idx)]
+                                         for shift_idx, shift in enumerate(self.schedule.shifts)
+                                         if shift.day == SUNDAY) <= 1)
+            elif violation.rule == "C8_MaxHours":
+                key, kind = (violation.rule, person_name), 'max_hours'
+                model.cbLazy(gp.quicksum(self.A[(person_name, shift_idx)] * shift.hours
+                                         for shift_idx, shift in enumerate(self.schedule.shifts)) <= self.max_hours)
+            else:
+                continue
+            violated += 1
+            if key not in self._lazy_keys:
+                self._lazy_keys.add(key)
+                self.lazy_added[kind] += 1
+        return violated
+
+    def _count_lazy_candidates(self):
+        # Number of rows the eager formulation would have added
+        num_people = len(self.schedule.people)
+        num_pairs = len(self._lazy_validator.pair_first)
+        return num_people * (num_pairs + 2)
@@ -0,0 +1,199 @@
+import time
+
+import gurobipy as gp
+import numpy as np
+from util.objective import BONUS_WEIGHT, SPREAD_WEIGHT, availability_matrix, expected_hours, objective_breakdown, \
+    spread_matrix
+from util.rules import SUNDAY, RosterLimits, rest_conflicts_by_shift, sunday_blocked
+from .lp_solver import LPSolver
+from .validator import RosterValidator
+
+PREVIEW_SAMPLES = 20
+MAX_PASSES = 50
+# Weight of people at 0 in the relaxation, so they are only picked when nobody else can take the shift
+FILL_WEIGHT = 1e-3
+
+
+def round_relaxation(schedule, fractional, max_hours, sunday_quota, rng, fill_weight=FILL_WEIGHT, limits=None):
+    """Rounds a fractional (people x shifts) assignment to a roster that satisfies C2-C8.
+
+    Shifts are visited from the fewest to the most eligible people. Every shift draws up to its
+    required number of people without replacement, with probabilities proportional to their
+    fractional values, from the people it can still take: available, allowed on Sunday, without
+    a rest-rule conflict or a second Sunday shift and within max_hours, and within the window
+    limits and free weekends of limits (a RosterLimits) if given. What cannot be filled becomes
+    slack.
+    """
+    people = list(schedule.people)
+    shifts = schedule.shifts
+    availability = availability_matrix(schedule).astype(bool)
+    hours = np.array([s.hours for s in shifts], dtype=float)
+    required = np.array([s.persons_required for s in shifts], dtype=float)
+    is_sunday = np.array([s.day == SUNDAY for s in shifts], dtype=bool)
+    blocked = np.array([sunday_blocked(schedule.people[name], sunday_quota) for name in people], dtype=bool)
+    conflicts = rest_conflicts_by_shift(shifts)
+    eligible = availability & ~(blocked[:, None] & is_sunday[None, :])
+
+    assignment = np.zeros((len(people), len(shifts)), dtype=np.int8)
+    worked_hours = np.zeros(len(people))
+    worked_sunday = np.zeros(len(people), dtype=bool)
+    order = rng.permutation(len(shifts))
+    order = order[np.argsort(eligible[:, order].sum(axis=0), kind="stable")]
+
+    for s in order:
+        allowed = eligible[:, s] & (worked_hours + hours[s] <= max_hours + 1e-9)
+        if is_sunday[s]:
+            allowed &= ~worked_sunday
+        for other, _ in conflicts[s]:
+            allowed &= assignment[:, other] == 0
+        if limits is not None:
+            allowed &= limits.allowed(assignment, s)
+        candidates = np.flatnonzero(allowed)
+        need = min(int(round(required[s])), len(candidates))
+        if need == 0:
+            continue
+        weights = np.clip(fractional[candidates, s], 0, None) + fill_weight
+        chosen = rng.choice(candidates, size=need, replace=False, p=weights / weights.sum())
+        assignment[chosen, s] = 1
+        worked_hours[chosen] += hours[s]
+        worked_sunday[chosen] |= is_sunday[s]
+
+    slack = np.rint(required).astype(int) - assignment.sum(axis=0)
+    return assignment, slack
+
+
+def improve_roster(schedule, assignment, max_hours, sunday_quota, spread_weight=SPREAD_WEIGHT, carry_over=None,
+                   max_passes=MAX_PASSES, limits=None):
+    """Moves single shifts from one person to another while that lowers the objective.
+
+    Every move keeps C2-C8 satisfied, and the limits of a RosterLimits if given. Its change in
+    fairness and spread is computed for all candidates of a shift at once. Stops after a pass
+    without improving moves.
+    """
+    assignment = assignment.copy()
+    shifts = schedule.shifts
+    people = list(schedule.people)
+    availability = availability_matrix(schedule).astype(bool)
+    hours = np.array([s.hours for s in shifts], dtype=float)
+    bonus = np.array([s.bonus_hours for s in shifts], dtype=float)
+    is_sunday = np.array([s.day == SUNDAY for s in shifts], dtype=bool)
+    blocked = np.array([sunday_blocked(schedule.people[name], sunday_quota) for name in people], dtype=bool)
+    eligible = availability & ~(blocked[:, None] & is_sunday[None, :])
+    conflict = np.zeros((len(shifts), len(shifts)), dtype=bool)
+    for s, others in rest_conflicts_by_shift(shifts).items():
+        conflict[s, [other for other, _ in others]] = True
+    spread = spread_matrix(schedule)
+    spread = spread_weight * (spread + spread.T)
+
+    exp_reg, exp_bonus = expected_hours(schedule)
+    if carry_over:
+        owed = np.array([carry_over.get(name, (0, 0)) for name in people], dtype=float)
+        exp_reg, exp_bonus = exp_reg + owed[:, 0], exp_bonus + owed[:, 1]
+    err_reg = exp_reg - assignment @ hours
+    err_bonus = exp_bonus - assignment @ bonus
+
+    for _ in range(max_passes):
+        improved = False
+        for s in range(len(shifts)):
+            # Change of each person's objective terms when gaining or losing shift s
+            pairwise = assignment @ spread[:, s]
+            gain = ((err_reg - hours[s]) ** 2 - err_reg ** 2
+                    + BONUS_WEIGHT * ((err_bonus - bonus[s]) ** 2 - err_bonus ** 2) + pairwise)
+            loss = ((err_reg + hours[s]) ** 2 - err_reg ** 2
+                    + BONUS_WEIGHT * ((err_bonus + bonus[s]) ** 2 - err_bonus ** 2) - pairwise)
+
+            allowed = eligible[:, s] & (assignment[:, s] == 0) & ~(assignment[:, conflict[s]].any(axis=1))
+            allowed &= assignment @ hours + hours[s] <= max_hours + 1e-9
+            if is_sunday[s]:
+                allowed &= assignment[:, is_sunday].sum(axis=1) == 0
+            if limits is not None:
+                allowed &= limits.allowed(assignment, s)
+            if not allowed.any():
+                continue
+            taker = int(np.argmin(np.where(allowed, gain, np.inf)))
+            givers = np.flatnonzero(assignment[:, s])
+            if len(givers) == 0:
+                continue
+            giver = int(givers[np.argmin(loss[givers])])
+            if gain[taker] + loss[giver] < -1e-9:
+                assignment[giver, s], assignment[taker, s] = 0, 1
+                err_reg[[giver, taker]] += [hours[s], -hours[s]]
+                err_bonus[[giver, taker]] += [bonus[s], -bonus[s]]
+                improved = True
+        if not improved:
+            break
+    return assignment
+
+
+class PreviewSolver(LPSolver):
+    """Quick rough roster with a lower bound on what the full solve can reach.
+
+    The continuous relaxation of LPSolver's model without the spread term is solved, its
+    objective is a lower bound on the full objective because the spread penalty is never
+    negative. The fractional assignment is rounded `samples` times with round_relaxation, every
+    rounding is repaired with improve_roster and the roster with the lowest full objective
+    (objective_breakdown, spread included) is kept.
+    The bound and the scoring both use the quadratic fairness of LPSolver, whatever fairness is
+    passed. Window limits and free weekends are in the bound and, as hard limits, in the rounding.
+    """
+
+    def __init__(self, schedule, max_hours, sunday_quota, samples=PREVIEW_SAMPLES, seed=0,
+                 spread_weight=SPREAD_WEIGHT, **kwargs):
+        kwargs['lazy_constraints'] = False
+        kwargs['fairness'] = "quadratic"  # objective_breakdown scores in this formulation
+        super().__init__(schedule, max_hours, sunday_quota, spread_weight=0, tuning_profile=None, **kwargs)
+        self.samples = samples
+        self.seed = seed
+        self.evaluation_weight = spread_weight  # Spread weight of the full model the preview stands in for
+        self.bound = None
+        self.objective = None
+        self.breakdown = None
+        self.violations = []
+        self.assignment = None
+        self.rounded_slack = None
+        self.runtime = None
+
+    def solve(self):
+        start = time.time()
+        self.model.update()
+        relaxed = self.model.relax()
+        relaxed.optimize()
+        if relaxed.Status != gp.GRB.OPTIMAL:
+            raise RuntimeError(f"The relaxation did not solve to optimality (status {relaxed.Status})")
+        self.bound = relaxed.ObjVal
+
+        values = relaxed.getAttr('X', relaxed.getVars())
+        people = list(self.schedule.people)
+        fractional = np.array([[values[self.A[(person_name, shift_idx)].index]
+                                for shift_idx in range(len(self.schedule.shifts))] for person_name in people])
+        relaxed.dispose()
+
+        rng = np.random.default_rng(self.seed)
+        limits = RosterLimits(self.schedule, self.window_limits, self.min_free_weekends)
+        for _ in range(self.samples):
+            assignment, slack = round_relaxation(self.schedule, fractional, self.max_hours, self.sunday_quota, rng,
+                                                 limits=limits)
+            assignment = improve_roster(self.schedule, assignment, self.max_hours, self.sunday_quota,
+                                        self.evaluation_weight, self.carry_over, limits=limits)
+            breakdown = objective_breakdown(self.schedule, assignment, slack, self.evaluation_weight, self.carry_over)
+            if self.breakdown is None or breakdown['Total'] < self.breakdown['Total']:
+                self.assignment, self.rounded_slack, self.breakdown = assignment, slack, breakdown
+        self.objective = self.breakdown['Total']
+        self.violations = RosterValidator(self.schedule, self.max_hours, self.sunday_quota, self.window_limits,
+                                          self.min_free_weekends).validate(self.assignment, self.rounded_slack)
+        self.runtime = time.time() - start
+        self.report()
+
+    def get_assignment(self, attr='X'):
+        return self.assignment, self.rounded_slack
+
+    @property
+    def gap(self):
+        """Relative gap between the rounded roster and the lower bound."""
+        return (self.objective - self.bound) / abs(self.objective) if self.objective else 0.0
+
+    def report(self):
+        print(f"Preview in {self.runtime:.2f}s: rounded roster {self.objective:.4f}, lower bound {self.bound:.4f} "
+              f"(gap {100 * self.gap:.1f}%), {self.breakdown['Unfilled Positions']} unfilled position(s)")
+        for violation in self.violations:
+            print(f"  {violation}")
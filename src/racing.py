@@ -0,0 +1,263 @@
+import csv
+import datetime
+import math
+import multiprocessing as mp
+import os
+import queue
+import time
+import traceback
+
+import gurobipy as gp
+import numpy as np
+from .lp_solver import LPSolver
+from .shared_schedule import SharedSchedule, attached_schedule
+from util.objective import SPREAD_WEIGHT
+
+# Settings raced by default, the first one is the plain Gurobi default
+DEFAULT_CONFIGS = [
+    {'Seed': 0},
+    {'Seed': 1, 'MIPFocus': 1},
+    {'Seed': 2, 'MIPFocus': 2},
+    {'Seed': 3, 'MIPFocus': 1, 'Heuristics': 0.3},
+    {'Seed': 4, 'MIPFocus': 3},
+    {'Seed': 5, 'NoRelHeurTime': 10},
+    {'Seed': 6, 'Heuristics': 0.5},
+    {'Seed': 7, 'Cuts': 2},
+]
+
+# Seconds past the time limit to wait for a worker's result before giving up on it
+RESULT_GRACE = 60
+
+
+class RaceResult:
+    """Best roster of a race, usable wherever ExcelTool expects a solved LPSolver."""
+
+    def __init__(self, assignment, slack, objective, bound, config, max_hours, sunday_quota, runs,
+                 solver_options=None):
+        self.assignment = assignment
+        self.slack = slack
+        self.objective = objective
+        self.bound = bound
+        self.config = config
+        self.max_hours = max_hours
+        self.sunday_quota = sunday_quota
+        self.runs = runs  # Per-worker statistics
+        # The LPSolver options the workers solved with, under the same names and defaults as on LPSolver
+        options = solver_options or {}
+        self.lazy_constraints = options.get('lazy_constraints', False)
+        self.bonus_rules = options.get('bonus_rules')
+        self.window_limits = options.get('window_limits') or []
+        self.min_free_weekends = options.get('min_free_weekends', 0)
+        self.soft_free_weekends = options.get('soft_free_weekends', False)
+        self.spread_weight = options.get('spread_weight', SPREAD_WEIGHT)
+        self.carry_over = options.get('carry_over') or {}
+        self.fairness = options.get('fairness', "quadratic")
+
+    def get_assignment(self):
+        return self.assignment, self.slack
+
+    def __repr__(self):
+        return f"RaceResult(objective={self.objective}, bound={self.bound}, config={self.config})"
+
+
+class SolverRace:
+    """Races copies of the LPSolver model with different Gurobi settings across processes.
+
+    Workers publish every new incumbent to shared memory and inject better incumbents of the
+    other workers into their own search. All workers stop as soon as one of them proves the
+    gap target, either alone or against the shared incumbent.
+    """
+
+    def __init__(self, schedule, max_hours, sunday_quota, configs=None, num_workers=4, total_threads=None,
+                 time_limit=100, gap_target=1e-4, log_file="race_log.csv", solver_options=None):
+        self.schedule = schedule
+        self.max_hours = max_hours
+        self.sunday_quota = sunday_quota
+        self.configs = (configs or DEFAULT_CONFIGS)[:num_workers]
+        self.total_threads = total_threads or os.cpu_count() or 1
+        self.time_limit = time_limit
+        self.gap_target = gap_target
+        self.log_file = log_file
+        # LPSolver keyword arguments every worker builds its model with, e.g. lazy_constraints or fairness
+        self.solver_options = solver_options or {}
+
+    def run(self):
+        ctx = mp.get_context("spawn")
+        num_people, num_shifts = len(self.schedule.people), len(self.schedule.shifts)
+        shared = {
+            'lock': ctx.Lock(),
+            'stop': ctx.Event(),
+            'objective': ctx.Value('d', math.inf, lock=False),
+            'owner': ctx.Value('i', -1, lock=False),
+            'solution': ctx.Array('d', num_people * num_shifts + num_shifts, lock=False),
+        }
+        results = ctx.Queue()
+        threads = max(1, self.total_threads // len(self.configs))
+
+        # Workers attach to the schedule by name instead of unpickling it
+        with SharedSchedule.create(self.schedule) as shared_schedule:
+            workers = [ctx.Process(target=_race_worker,
+                                   args=(worker_idx, shared_schedule.name, self.max_hours, self.sunday_quota, config,
+                                         self.solver_options, threads, self.time_limit, self.gap_target, shared,
+                                         results))
+                       for worker_idx, config in enumerate(self.configs)]
+            for worker in workers:
+                worker.start()
+            runs = self._collect(workers, results)
+
+        for run in runs:
+            if run.get('error'):
+                print(f"Race worker {run['worker']} {run['config']} failed: {run['error']}")
+        solved = [run for run in runs if run['objective'] is not None]
+        owner = shared['owner'].value
+        if not solved or owner < 0:
+            raise RuntimeError("No worker found a feasible roster within the time limit")
+        # The roster returned is the shared incumbent, so its publisher is the winner
+        winner = runs[owner]
+
+        solution = np.array(shared['solution'][:])
+        assignment = (solution[:num_people * num_shifts].reshape(num_people, num_shifts) > 0.5).astype(np.int8)
+        slack = np.rint(solution[num_people * num_shifts:]).astype(int)
+        bound = max((run['bound'] for run in runs if run['bound'] is not None), default=-math.inf)
+
+        self._log(winner, runs, shared['objective'].value, bound)
+        return RaceResult(assignment, slack, shared['objective'].value, bound, winner['config'],
+                          self.max_hours, self.sunday_quota, runs, self.solver_options)
+
+    def _collect(self, workers, results):
+        """One run per worker, workers that report nothing in time are stopped and recorded as failed."""
+        deadline = time.time() + self.time_limit + RESULT_GRACE
+        runs = {}
+        while len(runs) < len(workers):
+            try:
+                run = results.get(timeout=max(0.0, deadline - time.time()))
+            except queue.Empty:
+                break
+            runs[run['worker']] = run
+        for worker in workers:
+            worker.join(timeout=max(0.0, deadline - time.time()))
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+        for worker_idx, config in enumerate(self.configs):
+            if worker_idx not in runs:
+                runs[worker_idx] = _failed_run(worker_idx, config, "no result before the time limit", 0.0)
+        return [runs[worker_idx] for worker_idx in range(len(workers))]
+
+    def _log(self, winner, runs, objective, bound):
+        print(f"Race won by worker {winner['worker']} {winner['config']} "
+              f"in {winner['runtime']:.1f}s, objective {objective:.4f}, bound {bound:.4f}")
+
+        new_file = not os.path.exists(self.log_file)
+        with open(self.log_file, "a", newline="") as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(["Timestamp", "Shifts", "People", "Worker", "Config", "Winner",
+                                 "Status", "Proved", "Objective", "Bound", "Runtime", "Incumbents Shared"])
+            timestamp = datetime.datetime.now().isoformat(timespec="seconds")
+            for run in runs:
+                writer.writerow([timestamp, len(self.schedule.shifts), len(self.schedule.people), run['worker'],
+                                 run['config'], run['worker'] == winner['worker'], run['status'], run['proved'],
+                                 run['objective'], run['bound'], round(run['runtime'], 3), run['published']])
+
+
+def _failed_run(worker_idx, config, error, runtime):
+    return {'worker': worker_idx, 'config': config, 'status': None, 'objective': None, 'bound': None,
+            'runtime': runtime, 'published': 0, 'proved': False, 'error': error}
+
+
+def _race_worker(worker_idx, schedule_name, max_hours, sunday_quota, config, solver_options, threads, time_limit,
+                 gap_target, shared, results):
+    # Every path puts one run on the queue, the parent waits for it
+    start = time.time()
+    try:
+        results.put(_race(worker_idx, schedule_name, max_hours, sunday_quota, config, solver_options, threads,
+                          time_limit, gap_target, shared))
+    except Exception:
+        results.put(_failed_run(worker_idx, config, traceback.format_exc(limit=3), time.time() - start))
+
+
+def _race(worker_idx, schedule_name, max_hours, sunday_quota, config, solver_options, threads, time_limit,
+          gap_target, shared):
+    schedule = attached_schedule(schedule_name)
+    solver = LPSolver(schedule, max_hours, sunday_quota, **solver_options)
+    solver.setup_variables()
+    solver.set_objective()
+    solver.apply_constraints()
+
+    model = solver.model
+    model.setParam('OutputFlag', 0)
+    model.setParam('TimeLimit', time_limit)
+    model.setParam('Threads', threads)
+    model.setParam('MIPGap', gap_target)
+    for name, value in config.items():
+        model.setParam(name, value)
+    if solver.lazy_constraints:
+        solver.prepare_lazy()
+
+    model._worker = worker_idx
+    model._shared = shared
+    model._gap_target = gap_target
+    model._published = 0
+    model._proved = False
+    model._vars = [solver.A[(person_name, shift_idx)]
+                   for person_name in schedule.people for shift_idx in range(len(schedule.shifts))]
+    model._vars += [solver.slack[shift_idx] for shift_idx in range(len(schedule.shifts))]
+
+    start = time.time()
+    model.optimize(_race_callback)
+    runtime = time.time() - start
+
+    if model.Status == gp.GRB.OPTIMAL:
+        model._proved = True
+        shared['stop'].set()
+    has_solution = model.SolCount > 0
+    return {
+        'worker': worker_idx,
+        'config': config,
+        'status': model.Status,
+        'objective': model.ObjVal if has_solution else None,
+        'bound': model.ObjBound if has_solution else None,
+        'runtime': runtime,
+        'published': model._published,
+        'proved': model._proved,
+        'error': None,
+    }
+
+
+def _race_callback(model, where):
+    shared = model._shared
+    if shared['stop'].is_set():
+        model.terminate()
+        return
+
+    if where == gp.GRB.Callback.MIPSOL:
+        # Incumbents cut off by a lazy row are not shared
+        if model._solver.lazy_constraints and model._solver.add_lazy_rows(model):
+            return
+        objective = model.cbGet(gp.GRB.Callback.MIPSOL_OBJ)
+        with shared['lock']:
+            if objective < shared['objective'].value:
+                shared['solution'][:] = model.cbGetSolution(model._vars)
+                shared['objective'].value = objective
+                shared['owner'].value = model._worker
+                model._published += 1
+
+    elif where == gp.GRB.Callback.MIP:
+        # Another worker's incumbent may close this worker's gap
+        bound = model.cbGet(gp.GRB.Callback.MIP_OBJBND)
+        best = shared['objective'].value
+        if best < math.inf and best - bound <= model._gap_target * abs(best):
+            model._proved = True
+            shared['stop'].set()
+            model.terminate()
+
+    elif where == gp.GRB.Callback.MIPNODE:
+        if model.cbGet(gp.GRB.Callback.MIPNODE_STATUS) != gp.GRB.OPTIMAL:
+            return
+        best = shared['objective'].value
+        if shared['owner'].value != model._worker and best < model.cbGet(gp.GRB.Callback.MIPNODE_OBJBST) - 1e-6:
+            with shared['lock']:
+                values = shared['solution'][:]
+            model.cbSetSolution(model._vars, values)
+            model.cbUseSolution()
@@ -0,0 +1,206 @@
+import csv
+import datetime
+import json
+import os
+import re
+
+import numpy as np
+from util import Schedule, Shift, Person
+from util.objective import DAYS_ORDER
+
+TIME_PATTERN = re.compile(r"^(\d{2}):(\d{2})-(\d{2}):(\d{2})$")
+SHIFT_TYPES = ["Ochtend", "Middag", "Avond"]
+AVAILABLE = {"j", "J", "x", "X"}
+UNAVAILABLE = {"", "n", "N", "-"}
+
+
+class AvailabilityReader:
+    """Builds a Schedule from a row-oriented availability export without going through Excel.
+
+    Every row is one shift with the same columns as the "Hele Team" sheet: Datum, Dag, Type, the
+    shift time of the poule (e.g. "Poule Library"), the number of people required (e.g.
+    "Benodigd (lib)") and one column per person holding j/J/x/X when available. Rows are streamed
+    and validated one at a time, and the availability matrix is filled in chunks of chunk_size
+    rows, so memory does not depend on the size of the export.
+
+    Subclasses implement _rows(path), yielding (line_number, row_dict).
+    """
+
+    def __init__(self, time_column="Poule Library", required_column="Benodigd (lib)", people=None,
+                 chunk_size=1024):
+        self.time_column = time_column
+        self.required_column = required_column
+        self.people = people
+        self.chunk_size = chunk_size
+
+    def read(self, path):
+        schedule = Schedule()
+        people = None
+        chunks = []
+        chunk = None
+        filled = 0
+
+        for line_number, row in self._rows(path):
+            if people is None:
+                people = self._check_schema(path, row)
+                chunk = np.zeros((self.chunk_size, len(people)), dtype=np.int8)
+            self._check_row(path, line_number, row, people)
+
+            schedule.shifts.append(self._parse_shift(path, line_number, row))
+            for p, person_name in enumerate(people):
+                chunk[filled, p] = self._parse_availability(path, line_number, person_name, row[person_name])
+            filled += 1
+            if filled == self.chunk_size:
+                chunks.append(chunk)
+                chunk = np.zeros_like(chunk)
+                filled = 0
+
+        if people is None:
+            raise ValueError(f"{path}: no shifts found")
+        chunks.append(chunk[:filled])
+        availability = np.concatenate(chunks)
+
+        for p, person_name in enumerate(people):
+            person = Person(person_name)
+            person.availability = availability[:, p].tolist()
+            schedule.people[person_name] = person
+        return schedule
+
+    def _rows(self, path):
+        raise NotImplementedError
+
+    def _check_schema(self, path, row):
+        required = ["Dag", "Type", self.time_column, self.required_column]
+        missing = [column for column in required if column not in row]
+        if missing:
+            raise ValueError(f"{path}: missing column(s) {missing}")
+
+        if self.people is not None:
+            missing = [person_name for person_name in self.people if person_name not in row]
+            if missing:
+                raise ValueError(f"{path}: missing person column(s) {missing}")
+            return list(self.people)
+
+        # Everything that is not shift metadata of some poule is a person
+        return [column for column in row
+                if column not in ("Week", "Datum", "Dag", "Type")
+                and not column.startswith(("Poule ", "Benodigd"))]
+
+    def _check_row(self, path, line_number, row, people):
+        # The schema comes from the first row, a later JSON record or Parquet row can still lack a key
+        columns = ["Dag", "Type", self.time_column, self.required_column] + people
+        missing = [column for column in columns if column not in row]
+        if missing:
+            raise ValueError(f"{path}:{line_number}: missing column(s) {missing}")
+
+    def _parse_shift(self, path, line_number, row):
+        time_str = str(row[self.time_column]).strip()
+        match = TIME_PATTERN.match(time_str)
+        if not match:
+            raise ValueError(f"{path}:{line_number}: invalid shift time {time_str!r}, expected HH:MM-HH:MM")
+        h_start, m_start, h_end, m_end = map(int, match.groups())
+        if h_start > 24 or h_end > 24 or m_start > 59 or m_end > 59:
+            raise ValueError(f"{path}:{line_number}: invalid shift time {time_str!r}")
+        hours = ((h_end * 60 + m_end) - (h_start * 60 + m_start)) / 60
+
+        day = str(row["Dag"]).strip()
+        if day not in DAYS_ORDER:
+            raise ValueError(f"{path}:{line_number}: invalid day {day!r}, expected one of {DAYS_ORDER}")
+        shift_type = str(row["Type"]).strip()
+        if shift_type not in SHIFT_TYPES:
+            raise ValueError(f"{path}:{line_number}: invalid shift type {shift_type!r}, expected one of {SHIFT_TYPES}")
+        try:
+            persons_required = float(row[self.required_column])
+        except (TypeError, ValueError):
+            raise ValueError(f"{path}:{line_number}: invalid number of people {row[self.required_column]!r}")
+
+        return Shift(time_str, hours, persons_required, shift_type, day,
+                     self._parse_date(path, line_number, row.get("Datum")))
+
+    @staticmethod
+    def _parse_date(path, line_number, value):
+        if value is None or value == "":
+            return None
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            return value
+        try:
+            return datetime.datetime.fromisoformat(str(value).strip())
+        except ValueError:
+            raise ValueError(f"{path}:{line_number}: invalid date {value!r}, expected an ISO date")
+
+    @staticmethod
+    def _parse_availability(path, line_number, person_name, value):
+        value = "" if value is None else str(value).strip()
+        if value in AVAILABLE:
+            return 1
+        if value in UNAVAILABLE:
+            return 0
+        raise ValueError(f"{path}:{line_number}: invalid availability {value!r} for {person_name}")
+
+
+class CsvReader(AvailabilityReader):
+    def __init__(self, delimiter=",", **kwargs):
+        super().__init__(**kwargs)
+        self.delimiter = delimiter
+
+    def _rows(self, path):
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            # Line 1 is the header
+            for line_number, row in enumerate(csv.DictReader(f, delimiter=self.delimiter), start=2):
+                # DictReader puts extra values under None and fills a short row with None values
+                if None in row:
+                    raise ValueError(f"{path}:{line_number}: {len(row[None])} value(s) more than the header has")
+                short = [column for column, value in row.items() if value is None]
+                if short:
+                    raise ValueError(f"{path}:{line_number}: no value for column(s) {short}")
+                yield line_number, row
+
+
+class JsonLinesReader(AvailabilityReader):
+    def _rows(self, path):
+        with open(path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                if line_number == 1 and line.lstrip().startswith("["):
+                    raise ValueError(f"{path}: a JSON array, expected JSON lines with one object per shift")
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{path}:{line_number}: invalid JSON ({e.msg})")
+                if not isinstance(row, dict):
+                    raise ValueError(f"{path}:{line_number}: expected a JSON object per line")
+                yield line_number, row
+
+
+class ParquetReader(AvailabilityReader):
+    def _rows(self, path):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Reading Parquet files requires pyarrow, install it with `pip install pyarrow`")
+
+        line_number = 0
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=self.chunk_size):
+            for row in batch.to_pylist():
+                line_number += 1
+                yield line_number, row
+
+
+READERS = {
+    ".csv": CsvReader,
+    ".jsonl": JsonLinesReader,
+    ".ndjson": JsonLinesReader,
+    ".parquet": ParquetReader,
+}
+
+
+def read_schedule(path, **kwargs):
+    """Reads a schedule from CSV, JSON lines, Parquet or the Excel availability workbook."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".xlsx", ".xls"):
+        from .excel_writer import ExcelTool
+        return ExcelTool.read_availability(path)
+    if extension not in READERS:
+        raise ValueError(f"Unsupported availability file {path!r}, expected one of {sorted(READERS)} or .xlsx")
+    return READERS[extension](**kwargs).read(path)
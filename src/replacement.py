@@ -0,0 +1,197 @@
+import numpy as np
+from util.objective import BONUS_WEIGHT, expected_hours
+from util.rules import SUNDAY, RosterLimits, day_indices, rest_conflict_pairs
+
+
+class Replacement:
+    """A list of (person, shift_idx, gained) moves that covers a dropout and keeps every rule satisfied."""
+
+    def __init__(self, moves, fairness_delta):
+        self.moves = moves
+        self.fairness_delta = fairness_delta
+
+    @property
+    def substitute(self):
+        return self.moves[0][0]
+
+    def __repr__(self):
+        return f"Replacement(moves={self.moves}, fairness_delta={self.fairness_delta:.3f})"
+
+    def __str__(self):
+        steps = ", ".join(f"{person} {'takes' if gained else 'gives up'} shift {shift_idx}"
+                          for person, shift_idx, gained in self.moves)
+        return f"{steps} (fairness {self.fairness_delta:+.3f})"
+
+
+class ReplacementFinder:
+    """Finds substitutes for a last-minute dropout in a stored roster without solving again.
+
+    Availability, assignments and rest-rule conflicts are kept as per-person / per-shift integer
+    bitsets, and assignments are also indexed per day, so a query only touches the people and
+    the shifts around the dropout. Suggestions are ranked by the change in the fairness term
+    (err_reg^2 + BONUS_WEIGHT * err_bonus^2) of LPSolver. Window limits and free weekends are
+    checked as hard rules, like in the preview, so a suggestion adds no window penalty.
+    """
+
+    def __init__(self, schedule, assignment, max_hours, sunday_quota, window_limits=None, min_free_weekends=0):
+        self.schedule = schedule
+        self.max_hours = max_hours
+        self.sunday_quota = sunday_quota
+        self.limits = RosterLimits(schedule, window_limits, min_free_weekends)
+        self.people = list(schedule.people)
+        shifts = schedule.shifts
+
+        self.hours = [s.hours for s in shifts]
+        self.bonus = [s.bonus_hours for s in shifts]
+        self.day_of_shift = day_indices(shifts)
+        self.is_sunday = [s.day == SUNDAY for s in shifts]
+        self.sunday_bits = _to_bits(i for i, sunday in enumerate(self.is_sunday) if sunday)
+
+        self.conflict_bits = [0] * len(shifts)
+        for first, second, _ in rest_conflict_pairs(shifts):
+            self.conflict_bits[first] |= 1 << second
+            self.conflict_bits[second] |= 1 << first
+
+        # Sunday shifts are dropped from the availability of people below the Sunday quota
+        self.available_bits = {}
+        for name, person in schedule.people.items():
+            non_sunday_hours = sum(h for h, a, sunday in zip(self.hours, person.availability, self.is_sunday)
+                                   if a and not sunday)
+            bits = _to_bits(i for i, a in enumerate(person.availability) if a)
+            if non_sunday_hours < sunday_quota:
+                bits &= ~self.sunday_bits
+            self.available_bits[name] = bits
+
+        exp_reg, exp_bonus = expected_hours(schedule)
+        self.expected = {name: (exp_reg[p], exp_bonus[p]) for p, name in enumerate(self.people)}
+
+        self.assigned_bits = {name: 0 for name in self.people}
+        self.assigned_hours = {name: 0.0 for name in self.people}
+        self.assigned_bonus = {name: 0.0 for name in self.people}
+        self.by_day = {}  # day -> person -> assigned shift indices
+        self.by_shift = [set() for _ in shifts]
+        for p, s in np.argwhere(np.asarray(assignment) > 0.5):
+            self._assign(self.people[p], int(s))
+
+    def find(self, person_name, shift_idx, limit=10, chains=True):
+        """Ranked replacements for person_name dropping out of shift_idx, best fairness first."""
+        if person_name not in self.by_shift[shift_idx]:
+            raise ValueError(f"{person_name} is not assigned to shift {shift_idx}")
+
+        dropout_delta = self._fairness_delta(person_name, -self.hours[shift_idx], -self.bonus[shift_idx])
+        replacements = []
+        for candidate in self.people:
+            if candidate == person_name or candidate in self.by_shift[shift_idx]:
+                continue
+            if not self.available_bits[candidate] >> shift_idx & 1:
+                continue
+
+            if self._eligible(candidate, shift_idx):
+                delta = dropout_delta + self._fairness_delta(candidate, self.hours[shift_idx], self.bonus[shift_idx])
+                replacements.append(Replacement([(candidate, shift_idx, True)], delta))
+            elif chains:
+                replacements += self._swap_chains(person_name, candidate, shift_idx, dropout_delta)
+
+        replacements.sort(key=lambda r: (r.fairness_delta, len(r.moves)))
+        return replacements[:limit]
+
+    def apply(self, person_name, shift_idx, replacement):
+        """Updates the stored roster with a dropout and its chosen replacement."""
+        self._unassign(person_name, shift_idx)
+        for person, moved_shift, gained in replacement.moves:
+            if gained:
+                self._assign(person, moved_shift)
+            else:
+                self._unassign(person, moved_shift)
+
+    def get_assignment(self):
+        assignment = np.zeros((len(self.people), len(self.schedule.shifts)), dtype=np.int8)
+        for shift_idx, names in enumerate(self.by_shift):
+            for name in names:
+                assignment[self.people.index(name), shift_idx] = 1
+        return assignment
+
+    def _eligible(self, name, shift_idx, released=0):
+        # released is a bitset of shifts the person gives up in the same move
+        assigned = self.assigned_bits[name] & ~released
+        if assigned & self.conflict_bits[shift_idx]:
+            return False
+        if self.is_sunday[shift_idx] and assigned & self.sunday_bits:
+            return False
+        released_hours = sum(self.hours[s] for s in _bit_indices(released))
+        if self.assigned_hours[name] - released_hours + self.hours[shift_idx] > self.max_hours:
+            return False
+        if self.limits.active:
+            row = np.zeros((1, len(self.hours)), dtype=np.int8)
+            row[0, list(_bit_indices(assigned))] = 1
+            return bool(self.limits.allowed(row, shift_idx)[0])
+        return True
+
+    def _swap_chains(self, dropout, candidate, shift_idx, dropout_delta):
+        # The candidate takes the shift and hands one of their own shifts to a third person
+        day = self.day_of_shift[shift_idx]
+        nearby = [s for d in (day - 1, day, day + 1) for s in self.by_day.get(d, {}).get(candidate, [])]
+        blocking = [s for s in nearby if self.conflict_bits[shift_idx] >> s & 1]
+        if len(blocking) > 1:
+            return []
+        if blocking:
+            options = blocking
+        elif self.is_sunday[shift_idx] and self.assigned_bits[candidate] & self.sunday_bits:
+            options = list(_bit_indices(self.assigned_bits[candidate] & self.sunday_bits))
+        else:
+            options = list(_bit_indices(self.assigned_bits[candidate]))  # Over max hours or a window limit
+
+        chains = []
+        for given_up in options:
+            if not self._eligible(candidate, shift_idx, released=1 << given_up):
+                continue
+            candidate_delta = self._fairness_delta(
+                candidate, self.hours[shift_idx] - self.hours[given_up], self.bonus[shift_idx] - self.bonus[given_up]
+            )
+            for other in self.people:
+                if other in (dropout, candidate) or other in self.by_shift[given_up]:
+                    continue
+                if not self.available_bits[other] >> given_up & 1 or not self._eligible(other, given_up):
+                    continue
+                delta = dropout_delta + candidate_delta + \
+                    self._fairness_delta(other, self.hours[given_up], self.bonus[given_up])
+                chains.append(Replacement([(candidate, shift_idx, True), (candidate, given_up, False),
+                                           (other, given_up, True)], delta))
+        return chains
+
+    def _fairness_delta(self, name, hours_change, bonus_change):
+        exp_reg, exp_bonus = self.expected[name]
+        err_reg = exp_reg - self.assigned_hours[name]
+        err_bonus = exp_bonus - self.assigned_bonus[name]
+        return ((err_reg - hours_change) ** 2 - err_reg ** 2) + \
+            BONUS_WEIGHT * ((err_bonus - bonus_change) ** 2 - err_bonus ** 2)
+
+    def _assign(self, name, shift_idx):
+        self.assigned_bits[name] |= 1 << shift_idx
+        self.assigned_hours[name] += self.hours[shift_idx]
+        self.assigned_bonus[name] += self.bonus[shift_idx]
+        self.by_day.setdefault(self.day_of_shift[shift_idx], {}).setdefault(name, []).append(shift_idx)
+        self.by_shift[shift_idx].add(name)
+
+    def _unassign(self, name, shift_idx):
+        self.assigned_bits[name] &= ~(1 << shift_idx)
+        self.assigned_hours[name] -= self.hours[shift_idx]
+        self.assigned_bonus[name] -= self.bonus[shift_idx]
+        self.by_day[self.day_of_shift[shift_idx]][name].remove(shift_idx)
+        self.by_shift[shift_idx].discard(name)
+
+
+def _to_bits(indices):
+    bits = 0
+    for i in indices:
+        bits |= 1 << i
+    return bits
+
+
+def _bit_indices(bits):
+    i = 0
+    while bits:
+        if bits & 1:
+            yield i
+        bits >>= 1
+        i += 1
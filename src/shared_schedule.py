@@ -0,0 +1,190 @@
+import datetime
+import json
+import multiprocessing as mp
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from util import Schedule, Shift, Person
+
+# Arrays of a shared schedule, the availability matrix is (people x shifts)
+ARRAYS = {
+    'availability': np.int8,
+    'hours': np.float64,
+    'bonus_hours': np.float64,
+    'persons_required': np.float64,
+}
+_HEADER_SIZE = np.dtype(np.uint64).itemsize
+_ALIGN = 64
+
+# Schedules rebuilt by this worker process, per shared-memory name
+_ATTACHED = {}
+
+
+def _aligned(offset):
+    return -(-offset // _ALIGN) * _ALIGN
+
+
+def _encode_date(value):
+    """[ISO string, type name] of a shift date, so _decode_date gives back the same type."""
+    if value is None or value != value:  # value != value catches NaN and NaT
+        return None
+    if isinstance(value, str):
+        return [value, "str"]
+    return [value.isoformat(), type(value).__name__]
+
+
+def _decode_date(encoded):
+    if encoded is None:
+        return None
+    value, kind = encoded
+    if kind == "Timestamp":
+        # Excel workbooks read through pandas, pandas is already loaded by whoever wrote these
+        import pandas as pd
+        return pd.Timestamp(value)
+    if kind == "datetime":
+        return datetime.datetime.fromisoformat(value)
+    if kind == "date":
+        return datetime.date.fromisoformat(value)
+    return value
+
+
+class SharedSchedule:
+    """A Schedule in one shared-memory block, so worker processes attach by name instead of unpickling it.
+
+    The block starts with the length of a JSON header, followed by the header and the arrays. The
+    header holds the shape, dtype and offset of every array plus the names of the people and the
+    time, type, day and date of every shift. The arrays are read-only numpy views on the block,
+    code that works on arrays can use them without a copy. to_schedule builds the Shift and
+    Person objects LPSolver needs, which is a copy, made once per process by attached_schedule.
+    """
+
+    def __init__(self, shm, header, owner):
+        self.shm = shm
+        self.header = header
+        self.owner = owner  # Only the creating process unlinks the block
+        self.arrays = {}
+        for name, (shape, dtype, offset) in header['arrays'].items():
+            array = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+            array.flags.writeable = False
+            self.arrays[name] = array
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @classmethod
+    def create(cls, schedule):
+        num_shifts = len(schedule.shifts)
+        values = {
+            'availability': [person.availability for person in schedule.people.values()],
+            'hours': [s.hours for s in schedule.shifts],
+            'bonus_hours': [s.bonus_hours for s in schedule.shifts],
+            'persons_required': [s.persons_required for s in schedule.shifts],
+        }
+        arrays = {name: np.asarray(values[name], dtype=dtype) for name, dtype in ARRAYS.items()}
+        arrays['availability'] = arrays['availability'].reshape(len(schedule.people), num_shifts)
+
+        header = {
+            'people': list(schedule.people),
+            'shifts': [[s.time, s.shift_type, s.day, _encode_date(s.date)] for s in schedule.shifts],
+            'arrays': {},
+        }
+        # The offsets depend on the header length, which depends on the offsets: size it with placeholders first
+        placeholder = len(json.dumps(header)) + 64 * len(arrays) + _HEADER_SIZE
+        offset = _aligned(placeholder)
+        for name, array in arrays.items():
+            header['arrays'][name] = [list(array.shape), array.dtype.str, offset]
+            offset = _aligned(offset + array.nbytes)
+        encoded = json.dumps(header).encode()
+        assert _HEADER_SIZE + len(encoded) <= placeholder
+
+        shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        shm.buf[:_HEADER_SIZE] = np.uint64(len(encoded)).tobytes()
+        shm.buf[_HEADER_SIZE:_HEADER_SIZE + len(encoded)] = encoded
+        for name, array in arrays.items():
+            view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf, offset=header['arrays'][name][2])
+            view[...] = array
+            del view
+        return cls(shm, header, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        shm = shared_memory.SharedMemory(name=name)
+        length = int(np.frombuffer(shm.buf, dtype=np.uint64, count=1)[0])
+        header = json.loads(bytes(shm.buf[_HEADER_SIZE:_HEADER_SIZE + length]))
+        return cls(shm, header, owner=False)
+
+    def to_schedule(self):
+        """Rebuilds a Schedule with the same shifts, bonus hours and availability, dates keep their type."""
+        schedule = Schedule()
+        hours, bonus, required = self.arrays['hours'], self.arrays['bonus_hours'], self.arrays['persons_required']
+        for shift_idx, (time_str, shift_type, day, date) in enumerate(self.header['shifts']):
+            shift = Shift(time_str, float(hours[shift_idx]), float(required[shift_idx]), shift_type, day,
+                          _decode_date(date))
+            shift.bonus_hours = float(bonus[shift_idx])
+            schedule.shifts.append(shift)
+        for p, person_name in enumerate(self.header['people']):
+            person = Person(person_name)
+            person.availability = self.arrays['availability'][p].tolist()
+            schedule.people[person_name] = person
+        schedule.calculate_availability()
+        schedule.calculate_non_sunday_hours()
+        return schedule
+
+    def close(self):
+        self.arrays.clear()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attached_schedule(name):
+    """The schedule in shared-memory block name, rebuilt once per worker process."""
+    if name not in _ATTACHED:
+        shared = SharedSchedule.attach(name)
+        _ATTACHED[name] = shared.to_schedule()
+        shared.close()
+    return _ATTACHED[name]
+
+
+def solve_scenarios(schedule, scenarios, workers=None, time_limit=100):
+    """Solves LPSolver once per scenario in a process pool and returns one result dict per scenario.
+
+    A scenario is a dict of LPSolver keyword arguments and must hold max_hours and sunday_quota.
+    The schedule is put in shared memory once and the workers only receive its name, so the cost of
+    handing out a scenario does not depend on the size of the schedule.
+    """
+    with SharedSchedule.create(schedule) as shared:
+        with ProcessPoolExecutor(workers, mp_context=mp.get_context("spawn")) as executor:
+            return list(executor.map(_solve_worker, [shared.name] * len(scenarios), scenarios,
+                                     [time_limit] * len(scenarios)))
+
+
+def _solve_worker(name, scenario, time_limit):
+    from .lp_solver import LPSolver
+
+    schedule = attached_schedule(name)
+    start = time.time()
+    solver = LPSolver(schedule, **scenario)
+    solver.model.setParam('OutputFlag', 0)
+    solver.model.setParam('TimeLimit', time_limit)
+    solver.setup_variables()
+    solver.set_objective()
+    solver.apply_constraints()
+    solver.solve()
+
+    result = {'scenario': scenario, 'status': solver.model.Status, 'runtime': time.time() - start,
+              'objective': None, 'assignment': None, 'slack': None}
+    if solver.model.SolCount > 0:
+        result['objective'] = solver.model.ObjVal
+        result['assignment'], result['slack'] = solver.get_assignment()
+    solver.model.dispose()
+    return result
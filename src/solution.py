@@ -0,0 +1,202 @@
+import datetime
+import hashlib
+import json
+
+import numpy as np
+from util.objective import SPREAD_WEIGHT, availability_matrix, objective_breakdown
+from util.rules import WindowLimit
+
+SOLUTION_VERSION = 1
+SOLUTION_FILE = "solution.npz"
+
+# Solver attributes stored with a solution when the solver has them
+SOLVER_PARAMS = ['max_hours', 'sunday_quota', 'spread_weight', 'fairness', 'lazy_constraints', 'min_free_weekends',
+                 'soft_free_weekends', 'window_limits', 'carry_over', 'config']
+
+
+def schedule_hash(schedule):
+    """sha1 of the shifts and the availability, bonus hours are stored with the solution instead."""
+    shifts = [[str(s.time), float(s.hours), float(s.persons_required), str(s.shift_type), str(s.day).strip(),
+               str(s.date)] for s in schedule.shifts]
+    digest = hashlib.sha1(json.dumps([list(schedule.people), shifts]).encode())
+    digest.update(np.ascontiguousarray(availability_matrix(schedule)).tobytes())
+    return digest.hexdigest()
+
+
+def _json_value(value):
+    if isinstance(value, dict):
+        return {str(key): _json_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_value(item) for item in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, WindowLimit):
+        return _json_value(vars(value))
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return repr(value)
+
+
+def _window_limits(params):
+    # Solutions stored before the limits were kept as dicts only hold their repr
+    return [WindowLimit(**limit) for limit in params.get('window_limits', []) if isinstance(limit, dict)]
+
+
+class Solution:
+    """A solved roster that can be stored, rendered and compared without the solver or a license.
+
+    Holds the (people x shifts) assignment, the slack per shift, the bonus hours of every shift,
+    the objective breakdown, the solver parameters and the hash of the input schedule. It has
+    get_assignment, max_hours, sunday_quota and the window limits, so the ExcelTool writers take it
+    in place of a solver. Stored as one .npz file with the metadata as a JSON string.
+    """
+
+    def __init__(self, assignment, slack, bonus_hours, metadata):
+        self.assignment = np.asarray(assignment, dtype=np.int8)
+        self.slack = np.asarray(slack, dtype=int)
+        self.bonus_hours = np.asarray(bonus_hours, dtype=float)
+        self.metadata = metadata
+
+    @classmethod
+    def from_assignment(cls, schedule, assignment, slack, params=None, objective=None):
+        params = _json_value(params or {})
+        breakdown = objective_breakdown(schedule, assignment, slack, params.get('spread_weight', SPREAD_WEIGHT),
+                                        params.get('carry_over'), params.get('fairness', "quadratic"),
+                                        _window_limits(params), params.get('min_free_weekends', 0),
+                                        params.get('soft_free_weekends', False), params.get('max_hours'))
+        metadata = {
+            'version': SOLUTION_VERSION,
+            'created': datetime.datetime.now().isoformat(timespec="seconds"),
+            'input_hash': schedule_hash(schedule),
+            'people': list(schedule.people),
+            'objective': objective if objective is not None else breakdown['Total'],
+            'breakdown': breakdown,
+            'params': params,
+        }
+        return cls(assignment, slack, [s.bonus_hours for s in schedule.shifts], metadata)
+
+    @classmethod
+    def from_solver(cls, schedule, solver):
+        """Takes the roster and parameters of a solved LPSolver, LegacySolver, PatternSolver or PreviewSolver,
+        or of the RaceResult of SolverRace.run."""
+        assignment, slack = solver.get_assignment()
+        params = {name: getattr(solver, name) for name in SOLVER_PARAMS if hasattr(solver, name)}
+        params['solver'] = type(solver).__name__
+        # PreviewSolver models without spread but scores its roster with evaluation_weight
+        if hasattr(solver, 'evaluation_weight'):
+            params['spread_weight'] = solver.evaluation_weight
+        objective = getattr(solver, 'objective', None)
+        model = getattr(solver, 'model', None)
+        if objective is None and model is not None and model.SolCount > 0:
+            objective = model.ObjVal
+        return cls.from_assignment(schedule, assignment, slack, params, objective)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            metadata = json.loads(str(data['metadata']))
+            if metadata.get('version') != SOLUTION_VERSION:
+                raise ValueError(f"{path}: solution version {metadata.get('version')}, expected {SOLUTION_VERSION}")
+            return cls(data['assignment'], data['slack'], data['bonus_hours'], metadata)
+
+    def save(self, path=SOLUTION_FILE):
+        with open(path, "wb") as f:
+            np.savez_compressed(f, assignment=self.assignment, slack=self.slack, bonus_hours=self.bonus_hours,
+                                metadata=np.array(json.dumps(self.metadata)))
+
+    @property
+    def max_hours(self):
+        return self.metadata['params'].get('max_hours')
+
+    @property
+    def sunday_quota(self):
+        return self.metadata['params'].get('sunday_quota')
+
+    @property
+    def window_limits(self):
+        return _window_limits(self.metadata['params'])
+
+    @property
+    def min_free_weekends(self):
+        return self.metadata['params'].get('min_free_weekends', 0)
+
+    @property
+    def soft_free_weekends(self):
+        return self.metadata['params'].get('soft_free_weekends', False)
+
+    @property
+    def objective(self):
+        return self.metadata['objective']
+
+    @property
+    def breakdown(self):
+        return self.metadata['breakdown']
+
+    def get_assignment(self):
+        return self.assignment, self.slack
+
+    def attach(self, schedule):
+        """Checks that schedule is the input of this solution and restores its bonus hours."""
+        if schedule_hash(schedule) != self.metadata['input_hash']:
+            raise ValueError("The schedule differs from the one this solution was solved for")
+        for shift, bonus_hours in zip(schedule.shifts, self.bonus_hours):
+            shift.bonus_hours = float(bonus_hours)
+        schedule.calculate_availability()
+        schedule.calculate_non_sunday_hours()
+        return schedule
+
+    def diff(self, other):
+        """Assignments that differ as (person, shift_idx, self, other) and the change in every breakdown term."""
+        if self.metadata['input_hash'] != other.metadata['input_hash']:
+            raise ValueError("The solutions were solved for different schedules")
+        people = self.metadata['people']
+        changed = [(people[p], int(s), int(self.assignment[p, s]), int(other.assignment[p, s]))
+                   for p, s in np.argwhere(self.assignment != other.assignment)]
+        delta = {name: other.breakdown[name] - value for name, value in self.breakdown.items()}
+        return {'changed': changed, 'slack': (other.slack - self.slack).tolist(), 'breakdown': delta}
+
+    def __repr__(self):
+        return (f"Solution(objective={self.objective}, unfilled={int(self.slack.sum())}, "
+                f"solver={self.metadata['params'].get('solver')}, created={self.metadata['created']})")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Render or compare stored rosters without solving. "
+                                                 "Run from the repository root as `python -m src.solution`.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    render = commands.add_parser("render", help="Write the outputs of a stored roster")
+    render.add_argument("solution", help="Stored solution, e.g. solution.npz")
+    render.add_argument("availability", help="Availability workbook or export the roster was solved for")
+    render.add_argument("--excel", help="Roster workbook, as Final_Schedule.xlsx")
+    render.add_argument("--csv", help="Roster as CSV")
+    render.add_argument("--metrics", help="Metrics workbook, as Metrics_generated_schedule.xlsx")
+
+    compare = commands.add_parser("diff", help="Compare two stored rosters of the same schedule")
+    compare.add_argument("first")
+    compare.add_argument("second")
+    args = parser.parse_args()
+
+    if args.command == "render":
+        from src.excel_writer import ExcelTool
+        from src.readers import read_schedule
+
+        solution = Solution.load(args.solution)
+        schedule = solution.attach(read_schedule(args.availability))
+        if args.excel:
+            ExcelTool.write_schedule(schedule, solution, args.excel)
+        if args.csv:
+            ExcelTool.write_csv(schedule, solution, args.csv)
+        if args.metrics:
+            ExcelTool.write_metrics(schedule, solution, args.metrics)
+        print(solution)
+    else:
+        first, second = Solution.load(args.first), Solution.load(args.second)
+        diff = first.diff(second)
+        print(f"{len(diff['changed'])} differing assignments, {sum(diff['slack']):+d} unfilled positions")
+        for person_name, shift_idx, before, after in diff['changed']:
+            print(f"  {person_name} shift {shift_idx}: {before} -> {after}")
+        for name, delta in diff['breakdown'].items():
+            print(f"  {name:<20} {first.breakdown[name]:>14.4f} -> {second.breakdown[name]:>14.4f} ({delta:+.4f})")
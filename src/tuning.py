@@ -0,0 +1,247 @@
+import datetime
+import glob
+import json
+import math
+import os
+import tempfile
+import time
+
+import gurobipy as gp
+import numpy as np
+
+PROFILE_VERSION = 1
+PROFILE_FILE = "gurobi_profile.json"
+
+# Parameters a profile may not change, they belong to the caller
+RESERVED_PARAMS = {'TimeLimit', 'Threads', 'OutputFlag', 'LogFile', 'SolutionNumber', 'PoolSearchMode', 'PoolSolutions',
+                   'LazyConstraints'}
+
+# Candidates of the grid search, the first one is the plain Gurobi default
+TUNING_GRID = [
+    {},
+    {'MIPFocus': 1},
+    {'MIPFocus': 2},
+    {'MIPFocus': 3},
+    {'Heuristics': 0.3},
+    {'Cuts': 2},
+    {'Presolve': 2},
+    {'PreQLinearize': 1},
+    {'PreQLinearize': 2},
+    {'NoRelHeurTime': 10},
+    {'MIPFocus': 1, 'PreQLinearize': 1},
+]
+
+
+def time_to_target(trajectory, target, time_limit):
+    """First time at which an incumbent reached target, twice the time limit if it never did.
+
+    trajectory lists (seconds, objective) for every new incumbent.
+    """
+    for seconds, objective in trajectory:
+        if objective <= target:
+            return seconds
+    return 2 * time_limit
+
+
+def run_instance(path, params, time_limit, seed=0, env=None):
+    """Solves a saved instance with params and records the incumbent trajectory."""
+    model = gp.read(path, env=env) if env else gp.read(path)
+    model.setParam('OutputFlag', 0)
+    model.setParam('TimeLimit', time_limit)
+    model.setParam('Seed', seed)
+    for name, value in params.items():
+        model.setParam(name, value)
+
+    model._trajectory = []
+    model._start = time.perf_counter()
+    model.optimize(_trajectory_callback)
+    result = {'trajectory': model._trajectory, 'runtime': time.perf_counter() - model._start,
+              'objective': model.ObjVal if model.SolCount else math.inf}
+    model.dispose()
+    return result
+
+
+def _trajectory_callback(model, where):
+    if where == gp.GRB.Callback.MIPSOL:
+        model._trajectory.append((time.perf_counter() - model._start, model.cbGet(gp.GRB.Callback.MIPSOL_OBJ)))
+
+
+def tune_candidates(instances, tune_time_limit, env=None):
+    """Parameter sets found by Gurobi's own tuning tool, one tune() per instance."""
+    candidates = []
+    with tempfile.TemporaryDirectory() as directory:
+        for path in instances:
+            model = gp.read(path, env=env) if env else gp.read(path)
+            model.setParam('TuneTimeLimit', tune_time_limit)
+            model.setParam('TuneOutput', 0)
+            model.tune()
+            for result_idx in range(model.TuneResultCount):
+                model.getTuneResult(result_idx)
+                prm = os.path.join(directory, f"tune_{len(candidates)}.prm")
+                model.write(prm)
+                params = read_prm(prm)
+                if params not in candidates:
+                    candidates.append(params)
+            model.dispose()
+    return candidates
+
+
+def read_prm(path):
+    """Reads a Gurobi .prm file into a dict, without the reserved parameters."""
+    params = {}
+    with open(path) as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            name, value = line.split()[:2]
+            if name not in RESERVED_PARAMS:
+                try:
+                    params[name] = int(value)
+                except ValueError:
+                    params[name] = float(value)
+    return params
+
+
+class ParameterTuner:
+    """Picks the Gurobi parameters with the shortest time-to-target over a set of saved instances.
+
+    Every candidate solves every instance `repeats` times with different seeds. The target of an
+    instance is the best objective any run found, relaxed by target_gap, and a run that never
+    reaches it counts as twice the time limit. Candidates are ranked by the geometric mean of
+    their time-to-target, the default parameters are always a candidate.
+    """
+
+    def __init__(self, instances, method="grid", candidates=None, time_limit=60, repeats=2, target_gap=1e-3,
+                 tune_time_limit=300):
+        self.instances = instances
+        self.method = method
+        self.candidates = candidates
+        self.time_limit = time_limit
+        self.repeats = repeats
+        self.target_gap = target_gap
+        self.tune_time_limit = tune_time_limit
+
+    def run(self):
+        env = gp.Env(empty=True)
+        env.setParam('OutputFlag', 0)
+        env.start()
+
+        if self.candidates is not None:
+            candidates = self.candidates
+        elif self.method == "tune":
+            candidates = [params for params in tune_candidates(self.instances, self.tune_time_limit, env) if params]
+        else:
+            candidates = TUNING_GRID
+        if {} not in candidates:
+            candidates = [{}] + list(candidates)
+
+        runs = {}
+        for candidate_idx, params in enumerate(candidates):
+            for path in self.instances:
+                for seed in range(self.repeats):
+                    runs[(candidate_idx, path, seed)] = run_instance(path, params, self.time_limit, seed, env)
+            print(f"Candidate {candidate_idx + 1}/{len(candidates)} {params} done")
+        env.dispose()
+
+        scores = []
+        for candidate_idx, params in enumerate(candidates):
+            times = []
+            for path in self.instances:
+                best = min(run['objective'] for key, run in runs.items() if key[1] == path)
+                target = best + self.target_gap * abs(best)
+                times += [time_to_target(runs[(candidate_idx, path, seed)]['trajectory'], target, self.time_limit)
+                          for seed in range(self.repeats)]
+            scores.append({'params': params, 'time_to_target': float(np.exp(np.mean(np.log(np.maximum(times, 1e-3))))),
+                           'reached': sum(t <= self.time_limit for t in times), 'runs': len(times)})
+
+        default = scores[candidates.index({})]
+        winner = min(scores, key=lambda score: score['time_to_target'])
+        return winner, default, scores
+
+
+def save_profile(path, winner, default, instances, method, time_limit, target_gap):
+    profile = {
+        'version': PROFILE_VERSION,
+        'created': datetime.datetime.now().isoformat(timespec="seconds"),
+        'gurobi': ".".join(map(str, gp.gurobi.version())),
+        'method': method,
+        'instances': [os.path.basename(instance) for instance in instances],
+        'time_limit': time_limit,
+        'target_gap': target_gap,
+        'params': winner['params'],
+        'time_to_target': {'default': default['time_to_target'], 'tuned': winner['time_to_target']},
+    }
+    with open(path, "w") as f:
+        json.dump(profile, f, indent=2)
+    return profile
+
+
+def load_profile(path=PROFILE_FILE):
+    """Returns the stored profile, or None if there is none or it was written by another version."""
+    if not path or not os.path.exists(path):
+        return None
+    with open(path) as f:
+        profile = json.load(f)
+    if profile.get('version') != PROFILE_VERSION:
+        print(f"Ignoring {path}: profile version {profile.get('version')}, expected {PROFILE_VERSION}")
+        return None
+    profile['params'] = {name: value for name, value in profile['params'].items() if name not in RESERVED_PARAMS}
+    return profile
+
+
+def describe_profile(profile):
+    default, tuned = profile['time_to_target']['default'], profile['time_to_target']['tuned']
+    speedup = default / tuned if tuned > 0 else math.inf
+    return (f"Gurobi profile v{profile['version']} ({profile['created']}): {profile['params'] or 'defaults'}, "
+            f"time-to-target {default:.1f}s -> {tuned:.1f}s ({speedup:.1f}x)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Tune Gurobi parameters for the roster model.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    save = commands.add_parser("save", help="Save the model of an availability file as a tuning instance")
+    save.add_argument("availability", help="Availability workbook or export")
+    save.add_argument("instance", help="Output file, e.g. instances/week12.mps")
+    save.add_argument("--max-hours", type=float, default=100)
+    save.add_argument("--sunday-quota", type=float, default=20)
+
+    tune = commands.add_parser("tune", help="Tune over saved instances and store the winning profile")
+    tune.add_argument("instances", nargs="+", help="Saved instances or glob patterns")
+    tune.add_argument("--method", choices=["grid", "tune"], default="grid")
+    tune.add_argument("--time-limit", type=float, default=60, help="Seconds per run")
+    tune.add_argument("--repeats", type=int, default=2, help="Runs with different seeds per instance")
+    tune.add_argument("--target-gap", type=float, default=1e-3)
+    tune.add_argument("--profile", default=PROFILE_FILE)
+    args = parser.parse_args()
+
+    if args.command == "save":
+        from .lp_solver import LPSolver
+        from .readers import read_schedule
+
+        schedule = read_schedule(args.availability)
+        schedule.calculate_availability()
+        schedule.calculate_non_sunday_hours()
+        solver = LPSolver(schedule, args.max_hours, args.sunday_quota, tuning_profile=None)
+        solver.setup_variables()
+        solver.set_objective()
+        solver.apply_constraints()
+        solver.save_instance(args.instance)
+        print(f"Saved {args.instance}")
+    else:
+        instances = sorted({path for pattern in args.instances for path in glob.glob(pattern)})
+        if not instances:
+            raise SystemExit(f"No instances match {args.instances}")
+        tuner = ParameterTuner(instances, method=args.method, time_limit=args.time_limit, repeats=args.repeats,
+                               target_gap=args.target_gap)
+        winner, default, scores = tuner.run()
+
+        print(f"{'Parameters':<45} {'Time-to-target (s)':>20} {'Reached':>8}")
+        for score in sorted(scores, key=lambda score: score['time_to_target']):
+            print(f"{str(score['params'] or 'defaults'):<45} {score['time_to_target']:>20.2f} "
+                  f"{score['reached']:>4}/{score['runs']}")
+        profile = save_profile(args.profile, winner, default, instances, args.method, args.time_limit,
+                               args.target_gap)
+        print(f"Saved {args.profile}: {describe_profile(profile)}")
@@ -0,0 +1,181 @@
+import numpy as np
+from util.objective import availability_matrix
+from util.rules import SUNDAY, day_indices, rest_conflict_pairs, weekends, window_starts
+
+REST_RULE_NAMES = {
+    "C4": "C4_NoNightToMorning",
+    "C5.1": "C5.1_NoAfternoonToEvening",
+    "C5.2": "C5.2_NoMorningToEvening",
+}
+
+
+class Violation:
+    def __init__(self, rule, person, shifts, message):
+        self.rule = rule
+        self.person = person
+        self.shifts = shifts
+        self.message = message
+
+    def __repr__(self):
+        return f"Violation(rule={self.rule}, person={self.person}, shifts={self.shifts})"
+
+    def __str__(self):
+        return f"{self.rule}: {self.message}"
+
+
+class RosterValidator:
+    """Checks an assignment matrix against every rule of LPSolver.apply_constraints.
+
+    The assignment is a (people x shifts) 0/1 matrix in schedule.people order, so rosters from
+    Gurobi, a heuristic or a hand-edited output workbook can all be checked without a license.
+    """
+
+    def __init__(self, schedule, max_hours, sunday_quota, window_limits=None, min_free_weekends=0):
+        self.schedule = schedule
+        self.max_hours = max_hours
+        self.sunday_quota = sunday_quota
+        # Only hard window limits are rules, soft ones are part of the objective
+        self.window_limits = [limit for limit in window_limits or [] if not limit.soft]
+        self.min_free_weekends = min_free_weekends
+        self.people = list(schedule.people)
+
+        shifts = schedule.shifts
+        self.hours = np.array([s.hours for s in shifts], dtype=float)
+        self.required = np.array([s.persons_required for s in shifts], dtype=float)
+        self.is_sunday = np.array([s.day == SUNDAY for s in shifts], dtype=bool)
+        self.availability = availability_matrix(schedule)
+
+        pairs = rest_conflict_pairs(shifts)
+        self.pair_first = np.array([first for first, _, _ in pairs], dtype=int)
+        self.pair_second = np.array([second for _, second, _ in pairs], dtype=int)
+        self.pair_rule = [REST_RULE_NAMES[rule] for _, _, rule in pairs]
+
+        non_sunday_hours = self.availability[:, ~self.is_sunday] @ self.hours[~self.is_sunday]
+        self.sunday_blocked = non_sunday_hours < sunday_quota
+
+        # (shifts x days) one-hot matrix to sum the workload per day
+        days = np.array(day_indices(shifts), dtype=int)
+        self.day_matrix = np.zeros((len(shifts), days.max() + 1 if len(days) else 0), dtype=np.int8)
+        self.day_matrix[np.arange(len(shifts)), days] = 1
+        self.weekends = weekends(shifts)
+
+    def validate(self, assignment, slack=None):
+        """Returns the list of violations, empty if the roster satisfies every rule."""
+        x = np.asarray(assignment)
+        expected_shape = (len(self.people), len(self.schedule.shifts))
+        if x.shape != expected_shape:
+            raise ValueError(f"Assignment has shape {x.shape}, expected {expected_shape}")
+
+        violations = self._check_binary(x)
+        x = (x > 0.5).astype(np.int8)
+        violations += self._check_shift_assignment(x, slack)
+        violations += self._check_availability(x)
+        violations += self._check_rest_rules(x)
+        violations += self._check_sunday_quota(x)
+        violations += self._check_max_one_sunday_shift(x)
+        violations += self._check_max_hours(x)
+        violations += self._check_window_limits(x)
+        violations += self._check_free_weekends(x)
+        return violations
+
+    def _check_binary(self, x):
+        return [Violation("Binary", self.people[p], [int(s)], f"{self.people[p]} has value {x[p, s]} for shift {s}")
+                for p, s in np.argwhere((x != 0) & (x != 1))]
+
+    def _check_shift_assignment(self, x, slack):
+        assigned = x.sum(axis=0)
+        if slack is None:
+            # Without slack only over-coverage can be detected
+            wrong = np.flatnonzero(assigned > self.required)
+            filled = assigned
+        else:
+            slack = np.asarray(slack, dtype=float)
+            wrong = np.flatnonzero((assigned + slack != self.required) | (slack < 0))
+            filled = assigned + slack
+        return [Violation("C2_ShiftAssignment", None, [int(s)],
+                          f"Shift {s} has {filled[s]:g} assigned, {self.required[s]:g} required")
+                for s in wrong]
+
+    def _check_availability(self, x):
+        return [Violation("C3_Availability", self.people[p], [int(s)], f"{self.people[p]} is not available for shift {s}")
+                for p, s in np.argwhere(x.astype(bool) & (self.availability == 0))]
+
+    def _check_rest_rules(self, x):
+        if len(self.pair_first) == 0:
+            return []
+        both = x[:, self.pair_first] & x[:, self.pair_second]
+        return [Violation(self.pair_rule[k], self.people[p], [int(self.pair_first[k]), int(self.pair_second[k])],
+                          f"{self.people[p]} works shifts {self.pair_first[k]} and {self.pair_second[k]}")
+                for p, k in np.argwhere(both)]
+
+    def _check_sunday_quota(self, x):
+        blocked = x.astype(bool) & self.sunday_blocked[:, None] & self.is_sunday[None, :]
+        return [Violation("C6_NoSundayIfQuotaNotMet", self.people[p], [int(s)],
+                          f"{self.people[p]} does not meet the Sunday quota but works shift {s}")
+                for p, s in np.argwhere(blocked)]
+
+    def _check_max_one_sunday_shift(self, x):
+        sunday_shifts = x[:, self.is_sunday].sum(axis=1)
+        sunday_idx = np.flatnonzero(self.is_sunday)
+        return [Violation("C7_OneSundayShift", self.people[p], sunday_idx[x[p, sunday_idx] > 0].tolist(),
+                          f"{self.people[p]} works {sunday_shifts[p]} Sunday shifts")
+                for p in np.flatnonzero(sunday_shifts > 1)]
+
+    def _check_max_hours(self, x):
+        total_hours = x @ self.hours
+        return [Violation("C8_MaxHours", self.people[p], np.flatnonzero(x[p]).tolist(),
+                          f"{self.people[p]} works {total_hours[p]:g} hours, max {self.max_hours}")
+                for p in np.flatnonzero(total_hours > self.max_hours + 1e-9)]
+
+    def _daily_load(self, x):
+        shifts = x @ self.day_matrix
+        return {'shifts': shifts, 'hours': (x * self.hours) @ self.day_matrix, 'days': (shifts > 0).astype(int)}
+
+    def _check_window_limits(self, x):
+        if not self.window_limits:
+            return []
+        load = self._daily_load(x)
+        num_days = self.day_matrix.shape[1]
+        violations = []
+        for limit in self.window_limits:
+            windows = window_starts(num_days, limit.days)
+            for metric, bound in limit.limits():
+                prefix = np.concatenate([np.zeros((len(self.people), 1)), np.cumsum(load[metric], axis=1)], axis=1)
+                for start, end in windows:
+                    total = prefix[:, end] - prefix[:, start]
+                    for p in np.flatnonzero(total > bound + 1e-9):
+                        in_window = self.day_matrix[:, start:end].any(axis=1)
+                        violations.append(Violation(
+                            "C9_WindowLimit", self.people[p], np.flatnonzero(x[p] & in_window).tolist(),
+                            f"{self.people[p]} works {total[p]:g} {metric} in days {start}-{end - 1}, max {bound}"))
+        return violations
+
+    def _check_free_weekends(self, x):
+        if not self.min_free_weekends:
+            return []
+        worked = self._daily_load(x)['days']
+        free = np.array([[not worked[p, days].any() for days in self.weekends] for p in range(len(self.people))],
+                        dtype=bool).reshape(len(self.people), len(self.weekends)).sum(axis=1)
+        required = min(self.min_free_weekends, len(self.weekends))
+        return [Violation("C10_FreeWeekend", self.people[p], [],
+                          f"{self.people[p]} has {free[p]} free weekend(s), min {required}")
+                for p in np.flatnonzero(free < required)]
+
+
+if __name__ == "__main__":
+    import argparse
+    from src.excel_writer import ExcelTool
+
+    parser = argparse.ArgumentParser(description="Validate a roster workbook against the scheduling rules.")
+    parser.add_argument("availability", help="Availability workbook, e.g. Beschikbaarheid.xlsx")
+    parser.add_argument("roster", help="Roster workbook written by ExcelTool.write_schedule")
+    parser.add_argument("--max-hours", type=float, default=100)
+    parser.add_argument("--sunday-quota", type=float, default=20)
+    args = parser.parse_args()
+
+    schedule = ExcelTool.read_availability(args.availability)
+    assignment = ExcelTool.read_assignment(schedule, args.roster)
+    violations = RosterValidator(schedule, args.max_hours, args.sunday_quota).validate(assignment)
+    for violation in violations:
+        print(violation)
+    print(f"{len(violations)} violation(s) found")
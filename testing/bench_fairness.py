@@ -0,0 +1,71 @@
+"""Benchmark of the fairness formulations of LPSolver.
+
+Run from the repository root:
+
+    python testing/bench_fairness.py Beschikbaarheid_Mock_Full.xlsx --time-limit 60
+
+Every formulation solves the same model with the same time limit. The resulting rosters are all
+evaluated with the quadratic fairness term, so the table shows what a faster formulation costs
+in fairness.
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+from src.lp_solver import LPSolver
+from src.readers import read_schedule
+from util.objective import FAIRNESS_FORMULATIONS, SPREAD_WEIGHT, objective_breakdown
+
+
+def run(schedule, fairness, max_hours, sunday_quota, time_limit, spread_weight):
+    start = time.perf_counter()
+    solver = LPSolver(schedule, max_hours, sunday_quota, spread_weight=spread_weight, tuning_profile=None,
+                      fairness=fairness)
+    solver.model.setParam('OutputFlag', 0)
+    solver.model.setParam('TimeLimit', time_limit)
+    solver.setup_variables()
+    solver.set_objective()
+    solver.apply_constraints()
+    solver.solve()
+    result = {'fairness': fairness, 'runtime': time.perf_counter() - start, 'solve_time': solver.model.Runtime,
+              'gap': solver.model.MIPGap if solver.model.SolCount else None, 'breakdown': None}
+    if solver.model.SolCount:
+        assignment, slack = solver.get_assignment()
+        result['breakdown'] = objective_breakdown(schedule, assignment, slack, spread_weight)
+    solver.model.dispose()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the fairness formulations of LPSolver.")
+    parser.add_argument("availability", help="Availability workbook or export")
+    parser.add_argument("--max-hours", type=float, default=100)
+    parser.add_argument("--sunday-quota", type=float, default=20)
+    parser.add_argument("--time-limit", type=float, default=100, help="Seconds per formulation")
+    parser.add_argument("--spread-weight", type=float, default=SPREAD_WEIGHT)
+    parser.add_argument("--formulations", nargs="+", choices=FAIRNESS_FORMULATIONS, default=FAIRNESS_FORMULATIONS)
+    args = parser.parse_args()
+
+    schedule = read_schedule(args.availability)
+    schedule.calculate_availability()
+    schedule.calculate_non_sunday_hours()
+
+    print(f"{'Formulation':<12} {'Solve (s)':>10} {'Gap':>8} {'Regular SSE':>12} {'Bonus SSE':>10} "
+          f"{'Fairness':>10} {'Spread':>8} {'Unfilled':>9}")
+    for fairness in args.formulations:
+        result = run(schedule, fairness, args.max_hours, args.sunday_quota, args.time_limit, args.spread_weight)
+        breakdown = result['breakdown']
+        if breakdown is None:
+            print(f"{fairness:<12} {result['solve_time']:>10.2f} {'no roster within the time limit':>40}")
+            continue
+        print(f"{fairness:<12} {result['solve_time']:>10.2f} {100 * result['gap']:>7.2f}% "
+              f"{breakdown['Regular SSE']:>12.2f} {breakdown['Bonus SSE']:>10.2f} {breakdown['Fairness']:>10.2f} "
+              f"{breakdown['Spread']:>8.1f} {breakdown['Unfilled Positions']:>9}")
+
+
+if __name__ == "__main__":
+    main()
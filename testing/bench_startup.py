@@ -0,0 +1,57 @@
+"""Startup-time benchmark based on python -X importtime.
+
+Run from the repository root:
+
+    python testing/bench_startup.py
+
+Every target is imported in a fresh interpreter. The cumulative import time of the target and the
+heavy dependencies it pulled in are reported.
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+TARGETS = [
+    "util",
+    "src",
+    "src.validator",
+    "src.diagnostics",
+    "src.replacement",
+    "src.readers",
+    "src.flow_bound",
+    "src.solution",
+    "src.excel_writer",
+    "src.lp_solver",
+]
+HEAVY = ["numpy", "pandas", "gurobipy", "openpyxl", "xlwt"]
+
+
+def import_profile(module, repeats=5):
+    """Returns the best cumulative import time in ms and the top-level packages that were imported."""
+    best = None
+    for _ in range(repeats):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                                cwd=ROOT, capture_output=True, text=True, check=True)
+        imported = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative, name = line[len("import time:"):].split("|")
+            imported[name.strip()] = int(cumulative) / 1000
+        total = imported[module]
+        if best is None or total < best[0]:
+            best = (total, [package for package in HEAVY if package in imported])
+    return best
+
+
+def main():
+    print(f"{'Module':<20} {'Import (ms)':>12}  Heavy dependencies")
+    for module in TARGETS:
+        total, heavy = import_profile(module)
+        print(f"{module:<20} {total:>12.1f}  {', '.join(heavy) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Regression harness for retiring roostertool.py.
+
+Run from the repository root:
+
+    python testing/legacy_harness.py Beschikbaarheid_Mock_Full.xlsx --max-hours 100 --sunday-quota 20
+
+roostertool.py is run unchanged in a separate process and a temporary directory holding
+the workbook as Beschikbaarheid.xlsx. Its calc_hour never terminates on "24:00", so end times of
+24:00 are written as 00:00 in that copy, which is the same length in its wrap-around count. The
+compatibility mode (src/legacy.py) then solves the same workbook. Both rosters are evaluated with
+the legacy objective and the differences, objective values and runtimes are reported.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import openpyxl
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+from src.excel_writer import ExcelTool
+from src.legacy import LegacySolver, legacy_objective, read_legacy_availability
+
+LEGACY_RUNNER = """
+import json, time, traceback
+# Like runpy.run_path, but the globals survive an error after the solve (e.g. while writing the roster)
+namespace = {"__name__": "__main__", "__file__": "roostertool.py"}
+start = time.perf_counter()
+error = None
+try:
+    with open("roostertool.py") as f:
+        exec(compile(f.read(), "roostertool.py", "exec"), namespace)
+except Exception:
+    error = traceback.format_exc().strip().splitlines()[-1]
+    if "m" not in namespace or namespace["m"].SolCount == 0:
+        raise
+runtime = time.perf_counter() - start
+poule = "Poule Library"
+people = [p for p in namespace["beschikbaarheid"][poule] if p not in ("NoOne_1", "NoOne_2")]
+shifts = range(len(namespace["shifts"]["hours"][poule]))
+A = namespace["A"]
+with open("legacy_result.json", "w") as f:
+    json.dump({"objective": namespace["m"].ObjVal, "runtime": runtime, "solve_time": namespace["m"].Runtime,
+               "error": error, "people": people,
+               "assignment": [[int(round(A[(p, s)].X)) for s in shifts] for p in people],
+               "slack": [int(round(A[("NoOne_1", s)].X + A[("NoOne_2", s)].X)) for s in shifts]}, f)
+"""
+
+
+def prepare_legacy_dir(workbook, directory, max_hours, sunday_quota):
+    """Copies the workbook and a roostertool.py with the given limits into directory."""
+    book = openpyxl.load_workbook(workbook)
+    for row in book["Hele Team"].iter_rows():
+        for cell in row:
+            if isinstance(cell.value, str) and re.fullmatch(r"\d{2}:\d{2}-24:00", cell.value):
+                cell.value = cell.value[:6] + "00:00"
+    book.save(os.path.join(directory, "Beschikbaarheid.xlsx"))
+
+    with open(os.path.join(ROOT, "roostertool.py")) as f:
+        source = f.read()
+    source = re.sub(r"^max_uren = .*$", f"max_uren = {max_hours}", source, flags=re.M)
+    source = re.sub(r"^zondag_quota = .*$", f"zondag_quota = {sunday_quota}", source, flags=re.M)
+    with open(os.path.join(directory, "roostertool.py"), "w") as f:
+        f.write(source)
+
+
+def run_legacy(workbook, max_hours, sunday_quota, timeout):
+    with tempfile.TemporaryDirectory() as directory:
+        prepare_legacy_dir(workbook, directory, max_hours, sunday_quota)
+        try:
+            subprocess.run([sys.executable, "-c", LEGACY_RUNNER], cwd=directory, check=True, timeout=timeout,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        except subprocess.TimeoutExpired:
+            print(f"roostertool.py did not finish within {timeout} s")
+            return None
+        except subprocess.CalledProcessError as e:
+            print(f"roostertool.py failed:\n{e.stderr.strip().splitlines()[-1]}")
+            return None
+        with open(os.path.join(directory, "legacy_result.json")) as f:
+            return json.load(f)
+
+
+def run_compat(workbook, max_hours, sunday_quota, output):
+    start = time.perf_counter()
+    schedule = read_legacy_availability(workbook)
+    solver = LegacySolver(schedule, max_hours, sunday_quota)
+    solver.model.setParam('OutputFlag', 0)
+    solver.setup_variables()
+    solver.set_objective()
+    solver.apply_constraints()
+    solver.solve()
+    assignment, slack = solver.get_assignment()
+    ExcelTool.write_legacy_schedule(schedule, solver, output)
+    return schedule, {"objective": solver.model.ObjVal, "runtime": time.perf_counter() - start,
+                      "solve_time": solver.model.Runtime, "people": list(schedule.people),
+                      "assignment": assignment, "slack": slack}
+
+
+def compare(schedule, legacy, compat):
+    if legacy["people"] != compat["people"]:
+        print(f"People differ: {legacy['people']} vs {compat['people']}")
+        return
+    if legacy["error"]:
+        print(f"roostertool.py stopped after solving: {legacy['error']}")
+    legacy_assignment = np.array(legacy["assignment"])
+    differences = np.argwhere(legacy_assignment != compat["assignment"])
+
+    print(f"{'':<24} {'roostertool.py':>16} {'compatibility':>16}")
+    print(f"{'Reported objective':<24} {legacy['objective']:>16.6f} {compat['objective']:>16.6f}")
+    print(f"{'Recomputed objective':<24} "
+          f"{legacy_objective(schedule, legacy_assignment, legacy['slack']):>16.6f} "
+          f"{legacy_objective(schedule, compat['assignment'], compat['slack']):>16.6f}")
+    print(f"{'Unfilled positions':<24} {sum(legacy['slack']):>16} {int(compat['slack'].sum()):>16}")
+    print(f"{'Solve time (s)':<24} {legacy['solve_time']:>16.2f} {compat['solve_time']:>16.2f}")
+    print(f"{'Total runtime (s)':<24} {legacy['runtime']:>16.2f} {compat['runtime']:>16.2f}")
+    print(f"{len(differences)} differing assignments")
+    if differences.size and np.isclose(legacy["objective"], compat["objective"]):
+        print("The objectives are equal, so the rosters are alternative optima")
+    for p, s in differences[:20]:
+        print(f"  {legacy['people'][p]} shift {s}: roostertool.py {legacy_assignment[p, s]}, "
+              f"compatibility {compat['assignment'][p, s]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare roostertool.py with the compatibility mode.")
+    parser.add_argument("workbook", help="Availability workbook, e.g. Beschikbaarheid.xlsx")
+    parser.add_argument("--max-hours", type=float, default=100)
+    parser.add_argument("--sunday-quota", type=float, default=20)
+    parser.add_argument("--timeout", type=float, default=600, help="Seconds before roostertool.py is stopped")
+    parser.add_argument("--output", default="Rooster_compat.xls", help="Roster written by the compatibility mode")
+    args = parser.parse_args()
+
+    schedule, compat = run_compat(args.workbook, args.max_hours, args.sunday_quota, args.output)
+    legacy = run_legacy(os.path.abspath(args.workbook), args.max_hours, args.sunday_quota, args.timeout)
+    if legacy is None:
+        print(f"Compatibility mode: objective {compat['objective']:.6f} in {compat['runtime']:.2f} s")
+        return
+    compare(schedule, legacy, compat)
+
+
+if __name__ == "__main__":
+    main()
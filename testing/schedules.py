@@ -0,0 +1,25 @@
+"""Small schedules for tests that solve a model, cut from the mock workbook."""
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import ExcelTool
+from util import Schedule, Person
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+WORKBOOK = os.path.join(ROOT, "Beschikbaarheid_Mock_Full.xlsx")
+
+
+def small_schedule(num_shifts=12, num_people=6, reader=ExcelTool.read_availability):
+    """The first num_shifts shifts and num_people people of the mock workbook as read by reader."""
+    full = reader(WORKBOOK)
+    schedule = Schedule()
+    schedule.shifts = full.shifts[:num_shifts]
+    for person_name in list(full.people)[:num_people]:
+        person = Person(person_name)
+        person.availability = full.people[person_name].availability[:num_shifts]
+        schedule.people[person_name] = person
+    schedule.calculate_availability()
+    schedule.calculate_non_sunday_hours()
+    return schedule
@@ -0,0 +1,53 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(__file__))
+
+import itertools
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+from schedules import small_schedule
+from src import ExcelTool
+from src.lp_solver import LPSolver
+from src.validator import RosterValidator
+
+
+class TestAlternatives(unittest.TestCase):
+    def test_distinct_rosters_within_gap(self):
+        schedule = small_schedule()
+        solver = LPSolver(schedule, 20, 10)
+        solver.model.setParam('OutputFlag', 0)
+        solver.setup_variables()
+        solver.set_objective()
+        solver.apply_constraints()
+        gap, min_distance = 0.01, 4
+        alternatives = solver.solve_alternatives(k=3, min_distance=min_distance, gap=gap)
+
+        self.assertEqual(len(alternatives), 3)
+        best = alternatives[0]['objective']
+        validator = RosterValidator(schedule, 20, 10)
+        for alternative in alternatives:
+            self.assertLessEqual(alternative['objective'], best + gap * abs(best) + 1e-6)
+            self.assertAlmostEqual(alternative['breakdown']['Total'], alternative['objective'],
+                                   delta=1e-6 * abs(best))
+            self.assertEqual(validator.validate(alternative['assignment'], alternative['slack']), [])
+        for first, second in itertools.combinations(alternatives, 2):
+            self.assertGreaterEqual(int(np.sum(first['assignment'] != second['assignment'])), min_distance)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "alternatives.xlsx")
+            ExcelTool.write_alternatives(schedule, solver, path)
+            with pd.ExcelFile(path) as workbook:
+                self.assertEqual(workbook.sheet_names, ["Overview", "Alternative 1", "Alternative 2", "Alternative 3"])
+                overview = pd.read_excel(workbook, "Overview")
+                roster = pd.read_excel(workbook, "Alternative 2")
+        self.assertEqual(overview["Alternative"].tolist(), [1, 2, 3])
+        self.assertEqual(len(roster), len(schedule.shifts))
+
+
+if __name__ == '__main__':
+    unittest.main()
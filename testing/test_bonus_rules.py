@@ -0,0 +1,83 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(__file__))
+
+import datetime
+import unittest
+import numpy as np
+
+from src import ExcelTool
+from util import Shift
+from util import bonus_rules
+from util.bonus_rules import BonusRule, BonusRuleSet, DEFAULT_BONUS_RULES
+from test_validator import generate_schedule
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+WORKBOOK = os.path.join(ROOT, "Beschikbaarheid_Mock_Full.xlsx")
+
+
+class TestBonusRules(unittest.TestCase):
+    def test_default_rules_match_shift(self):
+        for seed in range(50):
+            schedule = generate_schedule(np.random.default_rng(seed))
+            expected = [shift.bonus_hours for shift in schedule.shifts]
+            np.testing.assert_allclose(DEFAULT_BONUS_RULES.compute(schedule.shifts), expected)
+
+    def test_default_rules_match_workbook(self):
+        schedule = ExcelTool.read_availability(WORKBOOK)
+        expected = [shift.bonus_hours for shift in schedule.shifts]
+        np.testing.assert_allclose(DEFAULT_BONUS_RULES.compute(schedule.shifts), expected)
+
+    def test_default_rules_match_padded_days(self):
+        shifts = [Shift("08:00-16:00", 8, 1, "Ochtend", "Zaterdag ", None),
+                  Shift("16:00-24:00", 8, 1, "Avond ", "Zondag\n", None),
+                  Shift("18:00-24:00", 6, 1, " Avond", "Maandag\n", None)]
+        self.assertEqual([shift.bonus_hours for shift in shifts], [3.2, 6.0, 1.6])
+        np.testing.assert_allclose(DEFAULT_BONUS_RULES.compute(shifts), [3.2, 6.0, 1.6])
+
+    def test_cache_is_bounded(self):
+        for seed in range(bonus_rules.CACHE_SIZE + 5):
+            DEFAULT_BONUS_RULES.compute(generate_schedule(np.random.default_rng(1000 + seed)).shifts)
+        self.assertLessEqual(len(bonus_rules._CACHE), bonus_rules.CACHE_SIZE)
+
+    def test_conditions_and_first_match(self):
+        christmas = datetime.date(2025, 12, 25)
+        shifts = [
+            Shift("08:00-16:00", 8, 1, "Ochtend", "Donderdag", christmas),
+            Shift("18:00-24:00", 6, 1, "Avond", "Donderdag", christmas),
+            Shift("18:00-24:00", 6, 1, "Avond", "Vrijdag", datetime.date(2025, 12, 26)),
+            Shift("13:00-18:00", 5, 1, "Middag", "Zaterdag", datetime.date(2025, 12, 27)),
+            Shift("13:00-18:00", 5, 1, "Middag", "Maandag", datetime.date(2026, 1, 19)),
+            Shift("13:00-18:00", 5, 1, "Middag", "Dinsdag", None),
+        ]
+        rules = BonusRuleSet([
+            BonusRule("Feestdag", holidays=True, multiplier=1.0),
+            BonusRule("Zaterdag", days=["Zaterdag"], multiplier=0.4),
+            BonusRule("Laat", types=["Avond"], time_window=("19:00", "24:00"), flat=2.0),
+            BonusRule("Avond", types=["Avond"], flat=1.6),
+            BonusRule("Tentamenweek", date_ranges=[("2026-01-19", "2026-01-30")], flat=0.5),
+        ], holidays=[christmas])
+        np.testing.assert_allclose(rules.compute(shifts), [8.0, 6.0, 1.6, 2.0, 0.5, 0.0])
+
+    def test_apply_updates_schedule(self):
+        schedule = generate_schedule(np.random.default_rng(3))
+        rules = BonusRuleSet([BonusRule("Alles", multiplier=0.5)])
+        rules.apply(schedule)
+        self.assertEqual([shift.bonus_hours for shift in schedule.shifts],
+                         [0.5 * shift.hours for shift in schedule.shifts])
+        for person in schedule.people.values():
+            self.assertAlmostEqual(person.available_bonus_hours, 0.5 * person.available_regular_hours)
+
+    def test_hash_and_round_trip(self):
+        copy = BonusRuleSet.from_dict(DEFAULT_BONUS_RULES.to_dict())
+        self.assertEqual(copy.hash, DEFAULT_BONUS_RULES.hash)
+        copy.rules[0].multiplier = 0.5
+        self.assertNotEqual(copy.hash, DEFAULT_BONUS_RULES.hash)
+        with self.assertRaisesRegex(ValueError, "unknown day"):
+            BonusRule("Typo", days=["Zaterdg"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(__file__))
+
+import itertools
+import unittest
+import numpy as np
+
+from schedules import small_schedule
+from src.column_generation import PatternSolver, _price_pattern
+from src.lp_solver import LPSolver
+from src.validator import RosterValidator
+
+
+def brute_force(weights, spread, available, hours, is_sunday, sunday_allowed, conflicts, max_hours):
+    """Best value over every feasible pattern, charging the spread of all pairs."""
+    best = (0.0, ())
+    for size in range(1, len(weights) + 1):
+        for pattern in itertools.combinations(range(len(weights)), size):
+            shifts = list(pattern)
+            if not available[shifts].all() or hours[shifts].sum() > max_hours:
+                continue
+            if is_sunday[shifts].sum() > (1 if sunday_allowed else 0):
+                continue
+            if any(first in pattern and second in pattern for first, second in conflicts):
+                continue
+            value = weights[shifts].sum() - spread[np.ix_(shifts, shifts)].sum()
+            if value > best[0]:
+                best = (value, pattern)
+    return best
+
+
+class TestPricing(unittest.TestCase):
+    def test_dp_matches_enumeration(self):
+        num_shifts = 10
+        for seed in range(20):
+            rng = np.random.default_rng(seed)
+            weights = rng.normal(1.0, 2.0, num_shifts)
+            spread = np.triu(rng.random((num_shifts, num_shifts)) * (rng.random((num_shifts, num_shifts)) < 0.3), 1)
+            available = rng.random(num_shifts) < 0.8
+            hours = rng.choice([3.0, 4.0, 5.5], num_shifts)
+            is_sunday = rng.random(num_shifts) < 0.2
+            sunday_allowed = bool(seed % 2)
+            conflict_prev = rng.random(num_shifts) < 0.3
+            conflict_prev2 = rng.random(num_shifts) < 0.2
+            conflict_prev[0] = conflict_prev2[:2] = False
+            conflicts = ([(s - 1, s) for s in np.flatnonzero(conflict_prev)]
+                         + [(s - 2, s) for s in np.flatnonzero(conflict_prev2)])
+            max_hours = 16.0
+
+            # A lookback over the whole schedule charges every spread pair, so the DP is exact
+            near_spread = np.zeros((num_shifts, num_shifts))
+            for k in range(1, num_shifts):
+                near_spread[k:, k - 1] = np.diagonal(spread, offset=k)
+
+            value, pattern = _price_pattern(weights, near_spread, available, hours, is_sunday, sunday_allowed,
+                                            conflict_prev, conflict_prev2, max_hours)
+            expected_value, _ = brute_force(weights, spread, available, hours, is_sunday, sunday_allowed, conflicts,
+                                            max_hours)
+            self.assertAlmostEqual(value, expected_value, places=6)
+            shifts = list(pattern)
+            self.assertAlmostEqual(weights[shifts].sum() - spread[np.ix_(shifts, shifts)].sum(), value, places=6)
+
+
+class TestPatternSolver(unittest.TestCase):
+    def test_solve(self):
+        schedule = small_schedule()
+        solver = PatternSolver(schedule, 20, 10, time_limit=30)
+        solver.solve()
+        assignment, slack = solver.get_assignment()
+        self.assertEqual(RosterValidator(schedule, 20, 10).validate(assignment, slack), [])
+        self.assertTrue(solver.proved)
+        self.assertLessEqual(solver.lp_bound, solver.model.ObjVal + 1e-6 * abs(solver.model.ObjVal))
+
+    def test_bound_below_optimum(self):
+        # Heuristic pricing may stop without a proof, the Lagrangian bound still holds
+        for max_hours, sunday_quota in [(20, 10), (30, 10)]:
+            schedule = small_schedule()
+            optimum = LPSolver(schedule, max_hours, sunday_quota)
+            optimum.model.setParam('OutputFlag', 0)
+            optimum.model.setParam('MIPGap', 0)
+            optimum.setup_variables()
+            optimum.set_objective()
+            optimum.apply_constraints()
+            optimum.solve()
+            objective = optimum.model.ObjVal
+            for exact_pricing in (True, False):
+                solver = PatternSolver(schedule, max_hours, sunday_quota, time_limit=30, exact_pricing=exact_pricing)
+                solver.solve()
+                self.assertLessEqual(solver.lp_bound, objective + 1e-6 * abs(objective), exact_pricing)
+                self.assertGreaterEqual(solver.model.ObjVal, objective - 1e-6 * abs(objective), exact_pricing)
+
+
+if __name__ == '__main__':
+    unittest.main()
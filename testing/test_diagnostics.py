@@ -0,0 +1,79 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import numpy as np
+
+from src.diagnostics import ShiftDiagnostics, NOBODY_AVAILABLE, SUNDAY_RULE, REST_RULE, MAX_HOURS, INFEASIBLE, \
+    WINDOW_RULE
+from util import Person, Schedule, Shift
+from util.rules import WindowLimit
+
+
+class TestShiftDiagnostics(unittest.TestCase):
+    def setUp(self):
+        self.schedule = Schedule()
+        self.schedule.shifts = [
+            Shift(time="08:00-13:00", hours=5, persons_required=1, shift_type="Ochtend", day="Zaterdag", date=None),
+            Shift(time="18:00-24:00", hours=6, persons_required=1, shift_type="Avond", day="Zaterdag", date=None),
+            Shift(time="08:00-16:00", hours=8, persons_required=1, shift_type="Ochtend", day="Zondag", date=None),
+            Shift(time="16:00-24:00", hours=8, persons_required=1, shift_type="Avond", day="Zondag", date=None),
+        ]
+        for name, availability in [('A', [1, 1, 1, 0]), ('B', [0, 0, 1, 1])]:
+            person = Person(name)
+            person.availability = availability
+            self.schedule.people[name] = person
+        self.schedule.calculate_availability()
+        self.schedule.calculate_non_sunday_hours()
+
+    def diagnose(self, assignment, max_hours=100, sunday_quota=0, **kwargs):
+        return ShiftDiagnostics(self.schedule, max_hours, sunday_quota, **kwargs).diagnose(np.array(assignment))
+
+    def test_filled_shifts_are_not_reported(self):
+        self.assertEqual(self.diagnose([[1, 0, 0, 0], [0, 0, 1, 1]]).keys(), {1})
+
+    def test_nobody_available(self):
+        self.schedule.people['A'].availability[0] = 0
+        diagnostics = self.diagnose([[0, 0, 0, 0], [0, 0, 0, 0]])
+        self.assertEqual(diagnostics[0]['category'], NOBODY_AVAILABLE)
+        self.assertEqual(diagnostics[0]['blocked'], {})
+
+    def test_rest_rule_names_conflicting_shift(self):
+        diagnostics = self.diagnose([[1, 0, 0, 0], [0, 0, 0, 1]])
+        self.assertEqual(diagnostics[1]['category'], REST_RULE)
+        self.assertIn("A werkt Zaterdag 08:00-13:00", diagnostics[1]['label'])
+
+    def test_mixed_reasons(self):
+        # A is free for shift 2, B already has a Sunday shift
+        diagnostics = self.diagnose([[1, 0, 0, 0], [0, 0, 0, 1]])
+        self.assertEqual(diagnostics[2]['category'], INFEASIBLE)
+        self.assertEqual(diagnostics[2]['blocked']['B'][0], SUNDAY_RULE)
+
+    def test_sunday_quota(self):
+        diagnostics = self.diagnose([[0, 0, 0, 0], [0, 0, 0, 0]], sunday_quota=20)
+        self.assertEqual(diagnostics[2]['category'], SUNDAY_RULE)
+        self.assertEqual(diagnostics[3]['category'], SUNDAY_RULE)
+
+    def test_max_hours(self):
+        diagnostics = self.diagnose([[0, 0, 1, 0], [0, 0, 0, 0]], max_hours=7)
+        self.assertEqual(diagnostics[0]['category'], MAX_HOURS)
+        self.assertEqual(diagnostics[0]['unfilled'], 1)
+
+
+    def test_window_limit(self):
+        # A works Saturday morning, a second shift in two days breaks the hard limit
+        assignment = [[1, 0, 0, 0], [0, 0, 0, 1]]
+        diagnostics = self.diagnose(assignment, window_limits=[WindowLimit(2, max_shifts=1)])
+        self.assertEqual(diagnostics[2]['blocked']['A'], (WINDOW_RULE, "max 1 diensten per 2 dagen"))
+        self.assertEqual(self.diagnose(assignment, min_free_weekends=1)[2]['blocked']['A'][0], WINDOW_RULE)
+
+        # A soft limit or soft free weekend does not keep anyone off a shift
+        diagnostics = self.diagnose(assignment, window_limits=[WindowLimit(2, max_shifts=1, soft=True)],
+                                    min_free_weekends=1, soft_free_weekends=True)
+        self.assertEqual(diagnostics[2]['blocked']['A'][0], INFEASIBLE)
+
+
+if __name__ == '__main__':
+    unittest.main()
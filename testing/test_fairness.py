@@ -0,0 +1,137 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(__file__))
+
+import unittest
+import gurobipy as gp
+import numpy as np
+
+from schedules import small_schedule
+from src.lp_solver import LPSolver
+from src.validator import RosterValidator
+from util import Schedule, Shift, Person
+from util.objective import BONUS_WEIGHT, PWL_SEGMENTS
+
+
+def make_schedule(people=(("Anna", [1, 1, 1]), ("Bram", [1, 1, 0])), calculate=True):
+    schedule = Schedule()
+    schedule.shifts = [Shift("08:00-13:00", 5, 1, "Ochtend", "Maandag", None),
+                       Shift("13:00-17:00", 4, 1, "Middag", "Zaterdag", None),
+                       Shift("17:00-21:00", 4, 1, "Avond", "Zondag", None)]
+    for name, availability in people:
+        person = Person(name)
+        person.availability = availability
+        schedule.people[name] = person
+    if calculate:
+        schedule.calculate_availability()
+    schedule.calculate_non_sunday_hours()
+    return schedule
+
+
+def build(fairness, max_hours=100, schedule=None):
+    solver = LPSolver(schedule or make_schedule(), max_hours, 0, spread_weight=0, tuning_profile=None,
+                      fairness=fairness)
+    solver.model.setParam('OutputFlag', 0)
+    solver.setup_variables()
+    solver.set_objective()
+    solver.model.update()
+    return solver
+
+
+class TestFairnessFormulations(unittest.TestCase):
+    def test_unknown_formulation(self):
+        with self.assertRaisesRegex(ValueError, "Unknown fairness formulation 'cubic'"):
+            LPSolver(make_schedule(), 100, 0, fairness="cubic")
+
+    def test_quadratic_is_the_default(self):
+        solver = build("quadratic")
+        self.assertTrue(solver.model.IsQP)
+        self.assertEqual(solver.pwl_terms, [])
+
+    def test_pwl_breakpoints_cover_the_error_range(self):
+        solver = build("pwl", max_hours=6)
+        self.assertFalse(solver.model.IsQP)
+        self.assertEqual(len(solver.pwl_terms), 2 * len(solver.schedule.people))
+
+        exp_reg, _ = solver.expected["Bram"]
+        var, x, y = solver.pwl_terms[2]  # Bram's regular hours, at most min(9 available, 6 max) hours
+        self.assertAlmostEqual(x[0], exp_reg - 6)
+        self.assertAlmostEqual(x[-1], exp_reg)
+        self.assertEqual((var.LB, var.UB), (x[0], x[-1]))
+        self.assertIn(0.0, x)
+        self.assertEqual(len(x), PWL_SEGMENTS + 2)
+        np.testing.assert_allclose(y, np.square(x))
+
+        _, x, y = solver.pwl_terms[3]
+        np.testing.assert_allclose(y, BONUS_WEIGHT * np.square(x))
+
+    def test_pwl_without_availability(self):
+        # Nobody to give hours to: the error is a constant instead of a degenerate breakpoint range
+        schedule = make_schedule((("Anna", [1, 1, 1]), ("Cees", [0, 0, 0])))
+        solver = build("pwl", schedule=schedule)
+        self.assertEqual(len(solver.pwl_terms), 2)
+        for _, x, _ in solver.pwl_terms:
+            self.assertTrue(np.all(np.diff(x) > 0))
+        solver.apply_constraints()
+        solver.solve()
+        self.assertEqual(solver.model.Status, gp.GRB.OPTIMAL)
+
+    def test_pwl_range_without_calculate_availability(self):
+        solver = build("pwl", max_hours=6, schedule=make_schedule(calculate=False))
+        exp_reg, _ = solver.expected["Bram"]
+        _, x, _ = solver.pwl_terms[2]
+        self.assertAlmostEqual(x[0], exp_reg - 6)
+        self.assertAlmostEqual(x[-1], exp_reg)
+
+    def test_linear_formulations(self):
+        for fairness, extra in [("l1", set()), ("minimax", {"MaxErrReg", "MaxErrBonus"}),
+                                ("hybrid", {"MaxErrReg", "MaxErrBonus"})]:
+            solver = build(fairness)
+            self.assertFalse(solver.model.IsQP, fairness)
+            names = {var.VarName for var in solver.model.getVars()}
+            self.assertIn("AbsErrReg_Anna_Pos", names)
+            self.assertTrue(extra <= names, fairness)
+
+
+def fairness_measures(solver, assignment):
+    hours = np.array([s.hours for s in solver.schedule.shifts])
+    bonus = np.array([s.bonus_hours for s in solver.schedule.shifts])
+    expected = np.array([solver.expected[name] for name in solver.schedule.people])
+    err_reg = np.abs(expected[:, 0] - assignment @ hours)
+    err_bonus = np.abs(expected[:, 1] - assignment @ bonus)
+    return {'quadratic': np.sum(err_reg**2 + BONUS_WEIGHT * err_bonus**2),
+            'l1': np.sum(err_reg + BONUS_WEIGHT * err_bonus),
+            'minimax': err_reg.max() + BONUS_WEIGHT * err_bonus.max()}
+
+
+class TestFairnessSolves(unittest.TestCase):
+    def test_each_formulation_is_best_in_its_own_measure(self):
+        schedule = small_schedule()
+        measures, unfilled = {}, {}
+        for fairness in ["quadratic", "pwl", "l1", "minimax", "hybrid"]:
+            solver = LPSolver(schedule, 20, 10, spread_weight=0, tuning_profile=None, fairness=fairness)
+            solver.model.setParam('OutputFlag', 0)
+            solver.model.setParam('MIPGap', 0)
+            solver.setup_variables()
+            solver.set_objective()
+            solver.apply_constraints()
+            solver.solve()
+            assignment, slack = solver.get_assignment()
+            self.assertEqual(RosterValidator(schedule, 20, 10).validate(assignment, slack), [], fairness)
+            measures[fairness] = fairness_measures(solver, assignment)
+            unfilled[fairness] = int(slack.sum())
+            # The breakdown scores the roster in the formulation it was solved with
+            self.assertAlmostEqual(solver.breakdown(assignment, slack)['Total'], solver.model.ObjVal,
+                                   delta=1e-6 * solver.model.ObjVal, msg=fairness)
+
+        # The slack penalty dominates, so every formulation fills the same number of positions
+        self.assertEqual(len(set(unfilled.values())), 1)
+        for own in ["quadratic", "l1", "minimax"]:
+            for other in measures:
+                self.assertLessEqual(measures[own][own], measures[other][own] + 1e-6, (own, other))
+
+
+if __name__ == '__main__':
+    unittest.main()
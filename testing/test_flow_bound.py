@@ -0,0 +1,97 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(__file__))
+
+import unittest
+import numpy as np
+
+from schedules import small_schedule
+from src import ExcelTool
+from src.lp_solver import LPSolver
+from src.flow_bound import MaxFlow, coverage_bound
+from src.preview import round_relaxation
+from util import Schedule, Shift, Person
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+WORKBOOK = os.path.join(ROOT, "Beschikbaarheid_Mock_Full.xlsx")
+
+
+def make_schedule(availability, required=1):
+    schedule = Schedule()
+    schedule.shifts = [Shift("08:00-13:00", 5, required, "Ochtend", "Zaterdag", None),
+                       Shift("13:00-18:00", 5, required, "Middag", "Zaterdag", None),
+                       Shift("18:00-22:00", 4, required, "Avond", "Zaterdag", None),
+                       Shift("08:00-13:00", 5, required, "Ochtend", "Zondag", None),
+                       Shift("13:00-18:00", 5, required, "Middag", "Zondag", None)]
+    for name, row in availability.items():
+        person = Person(name)
+        person.availability = row
+        schedule.people[name] = person
+    schedule.calculate_availability()
+    schedule.calculate_non_sunday_hours()
+    return schedule
+
+
+class TestMaxFlow(unittest.TestCase):
+    def test_textbook_network(self):
+        network = MaxFlow(6)
+        for u, v, capacity in [(0, 1, 16), (0, 2, 13), (1, 2, 10), (2, 1, 4), (1, 3, 12), (3, 2, 9),
+                               (2, 4, 14), (4, 3, 7), (3, 5, 20), (4, 5, 4)]:
+            network.add_edge(u, v, capacity)
+        self.assertEqual(network.max_flow(0, 5), 23)
+
+
+class TestCoverageBound(unittest.TestCase):
+    def test_rules_limit_one_person(self):
+        schedule = make_schedule({"Anna": [1, 1, 1, 1, 1]})
+        # Ochtend + Middag on Saturday (Avond conflicts with both) and one Sunday shift
+        self.assertEqual(coverage_bound(schedule, 100, 0).max_filled, 3)
+        # Below the Sunday quota only Saturday remains
+        self.assertEqual(coverage_bound(schedule, 100, 100).max_filled, 2)
+        # 9 hours fit the Avond shift and one 5 hour shift
+        bound = coverage_bound(schedule, 9, 0)
+        self.assertEqual(bound.max_filled, 2)
+        self.assertEqual(bound.min_unfilled, 3)
+        self.assertEqual(len(bound.bottlenecks), 3)
+
+    def test_slack_lower_bounds(self):
+        schedule = make_schedule({"Anna": [1, 0, 0, 0, 0], "Bram": [1, 1, 0, 0, 0]}, required=2)
+        bound = coverage_bound(schedule, 100, 0)
+        np.testing.assert_array_equal(bound.slack_lower_bounds, [0, 1, 2, 2, 2])
+        self.assertEqual(bound.max_filled, 3)
+
+    def test_bound_holds_for_valid_rosters(self):
+        schedule = ExcelTool.read_availability(WORKBOOK)
+        schedule.calculate_availability()
+        schedule.calculate_non_sunday_hours()
+        for seed in range(20):
+            rng = np.random.default_rng(seed)
+            max_hours, sunday_quota = rng.integers(5, 60), rng.integers(0, 60)
+            bound = coverage_bound(schedule, max_hours, sunday_quota)
+            fractional = rng.random((len(schedule.people), len(schedule.shifts)))
+            assignment, slack = round_relaxation(schedule, fractional, max_hours, sunday_quota, rng)
+            self.assertGreaterEqual(bound.max_filled, assignment.sum())
+            self.assertTrue(np.all(slack >= bound.slack_lower_bounds))
+
+
+class TestCoverageBoundSolve(unittest.TestCase):
+    def test_same_objective(self):
+        schedule = small_schedule()
+        objectives = []
+        for use_coverage_bound in (False, True):
+            solver = LPSolver(schedule, 20, 10, use_coverage_bound=use_coverage_bound)
+            solver.model.setParam('OutputFlag', 0)
+            solver.model.setParam('MIPGap', 0)
+            solver.setup_variables()
+            solver.set_objective()
+            solver.apply_constraints()
+            solver.solve()
+            objectives.append(solver.model.ObjVal)
+            self.assertEqual(solver.coverage is not None, use_coverage_bound)
+        self.assertAlmostEqual(objectives[0], objectives[1], delta=1e-6 * abs(objectives[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(__file__))
+
+import unittest
+
+from schedules import small_schedule
+from src.lp_solver import LPSolver
+from src.validator import RosterValidator
+
+
+def solve(schedule, lazy_constraints, max_hours, sunday_quota):
+    solver = LPSolver(schedule, max_hours, sunday_quota, lazy_constraints=lazy_constraints, spread_weight=0)
+    solver.model.setParam('OutputFlag', 0)
+    solver.model.setParam('MIPGap', 0)
+    solver.model.setParam('TimeLimit', 60)
+    solver.setup_variables()
+    solver.set_objective()
+    solver.apply_constraints()
+    solver.solve()
+    return solver
+
+
+class TestLazyConstraints(unittest.TestCase):
+    def test_lazy_matches_eager(self):
+        schedule = small_schedule()
+        for max_hours, sunday_quota in [(15, 5), (20, 10), (12, 0)]:
+            eager = solve(schedule, False, max_hours, sunday_quota)
+            lazy = solve(schedule, True, max_hours, sunday_quota)
+            assignment, slack = lazy.get_assignment()
+            self.assertEqual(RosterValidator(schedule, max_hours, sunday_quota).validate(assignment, slack), [])
+            self.assertAlmostEqual(lazy.model.ObjVal, eager.model.ObjVal, delta=1e-6 * abs(eager.model.ObjVal))
+
+            # Rows are counted once however often an incumbent breaks them
+            self.assertEqual(sum(lazy.lazy_added.values()), len(lazy._lazy_keys))
+            self.assertLessEqual(lazy.lazy_added['max_hours'], len(schedule.people))
+            self.assertLessEqual(lazy.lazy_added['sunday'], len(schedule.people))
+
+        # Tight max hours need lazy rows
+        self.assertGreater(lazy.lazy_added['max_hours'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
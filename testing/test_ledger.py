@@ -0,0 +1,113 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(__file__))
+
+import tempfile
+import unittest
+import numpy as np
+
+from schedules import small_schedule
+from src.column_generation import PatternSolver
+from src.ledger import FairnessLedger
+from src.lp_solver import LPSolver
+from util import Schedule, Shift, Person
+from util.objective import expected_hours, objective_breakdown
+
+
+def make_schedule():
+    schedule = Schedule()
+    schedule.shifts = [Shift("08:00-13:00", 5, 1, "Ochtend", "Maandag", None),
+                       Shift("13:00-17:00", 4, 1, "Middag", "Zaterdag", None),
+                       Shift("17:00-21:00", 4, 1, "Avond", "Zondag", None)]
+    for name, availability in [("Anna", [1, 1, 1]), ("Bram", [1, 1, 0])]:
+        person = Person(name)
+        person.availability = availability
+        schedule.people[name] = person
+    schedule.calculate_availability()
+    return schedule
+
+
+class TestFairnessLedger(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.ledger = FairnessLedger(os.path.join(self.tmp.name, "ledger.sqlite"))
+        self.schedule = make_schedule()
+
+    def tearDown(self):
+        self.ledger.close()
+        self.tmp.cleanup()
+
+    def test_carry_over_sums_earlier_periods(self):
+        exp_reg, exp_bonus = expected_hours(self.schedule)
+        # Anna works everything in March, Bram nothing
+        march = np.array([[1, 1, 1], [0, 0, 0]])
+        self.ledger.record("2024-03", self.schedule, march)
+        self.ledger.record("2024-04", self.schedule, march)
+
+        self.assertEqual(self.ledger.periods(), ["2024-03", "2024-04"])
+        self.assertEqual(self.ledger.carry_over(["Anna", "Bram"], "2024-03"), {"Anna": (0, 0), "Bram": (0, 0)})
+        carry_over = self.ledger.carry_over(["Anna", "Bram", "Nieuw"], "2024-04")
+        np.testing.assert_allclose(carry_over["Bram"], (exp_reg[1], exp_bonus[1]))
+        np.testing.assert_allclose(carry_over["Anna"], (exp_reg[0] - 13, exp_bonus[0] - (0.4 * 4 + 0.75 * 4)))
+        self.assertEqual(carry_over["Nieuw"], (0, 0))
+        np.testing.assert_allclose(self.ledger.carry_over(["Bram"], "2024-05")["Bram"],
+                                   (2 * exp_reg[1], 2 * exp_bonus[1]))
+
+    def test_recording_a_period_again_replaces_it(self):
+        self.ledger.record("2024-03", self.schedule, [[1, 1, 1], [0, 0, 0]])
+        self.ledger.record("2024-03", self.schedule, [[1, 0, 1], [0, 1, 0]])
+        history = self.ledger.history("Bram")
+        self.assertEqual(len(history), 1)
+        self.assertEqual(history[0][2], 4)
+
+    def test_breakdown_with_carry_over(self):
+        assignment, slack = np.array([[1, 0, 1], [0, 1, 0]]), np.zeros(3)
+        plain = objective_breakdown(self.schedule, assignment, slack)
+        same = objective_breakdown(self.schedule, assignment, slack, carry_over={"Anna": (0, 0)})
+        self.assertEqual(plain, same)
+
+        exp_reg, _ = expected_hours(self.schedule)
+        owed = objective_breakdown(self.schedule, assignment, slack, carry_over={"Bram": (2.0, 0)})
+        self.assertAlmostEqual(owed['Regular SSE'] - plain['Regular SSE'],
+                               (exp_reg[1] + 2 - 4) ** 2 - (exp_reg[1] - 4) ** 2)
+
+
+class TestCarryOverSolve(unittest.TestCase):
+    def solve(self, carry_over=None):
+        solver = LPSolver(small_schedule(), 20, 10, carry_over=carry_over)
+        solver.model.setParam('OutputFlag', 0)
+        solver.model.setParam('MIPGap', 0)
+        solver.setup_variables()
+        solver.set_objective()
+        solver.apply_constraints()
+        solver.solve()
+        return solver
+
+    def test_carry_over_changes_assignment(self):
+        plain = self.solve()
+        assignment, slack = plain.get_assignment()
+        hours = np.array([s.hours for s in plain.schedule.shifts])
+        # The person with the fewest hours is owed a full shift more
+        p = int(np.argmin(assignment @ hours))
+        carry_over = {list(plain.schedule.people)[p]: (8.0, 0.0)}
+
+        owed = self.solve(carry_over)
+        owed_assignment, owed_slack = owed.get_assignment()
+        self.assertFalse(np.array_equal(owed_assignment, assignment))
+        self.assertGreater(owed_assignment[p] @ hours, assignment[p] @ hours)
+        self.assertAlmostEqual(objective_breakdown(owed.schedule, owed_assignment, owed_slack,
+                                                   carry_over=carry_over)['Total'], owed.model.ObjVal, places=4)
+
+        # The pattern master offsets its deviation rows by the same carry-over
+        patterns = PatternSolver(small_schedule(), 20, 10, time_limit=30, carry_over=carry_over)
+        patterns.solve()
+        pattern_assignment, pattern_slack = patterns.get_assignment()
+        self.assertAlmostEqual(objective_breakdown(patterns.schedule, pattern_assignment, pattern_slack,
+                                                   carry_over=carry_over)['Total'], patterns.model.ObjVal, places=4)
+        self.assertGreaterEqual(patterns.model.ObjVal, owed.model.ObjVal - 1e-6 * owed.model.ObjVal)
+
+
+if __name__ == '__main__':
+    unittest.main()
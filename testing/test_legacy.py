@@ -0,0 +1,82 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import tempfile
+import unittest
+import numpy as np
+
+from src import ExcelTool
+from src.legacy import NO_ONE_PENALTIES, legacy_hours, legacy_objective, legacy_shares, read_legacy_availability
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+WORKBOOK = os.path.join(ROOT, "Beschikbaarheid_Mock_Full.xlsx")
+
+
+def calc_hour(hours):
+    """roostertool.calc_hour, which counts one minute at a time."""
+    hour_start, min_start = int(hours[0:2]), int(hours[3:5])
+    hour_finish, min_finish = int(hours[6:8]), int(hours[9:11])
+    minutes = 0
+    while True:
+        min_start += 1
+        minutes += 1
+        if min_start == 60:
+            hour_start += 1
+            min_start = 0
+            if hour_start == 24:
+                hour_start = 0
+        if min_start == min_finish and hour_start == hour_finish:
+            return minutes / 60
+
+
+class TestLegacy(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.schedule = read_legacy_availability(WORKBOOK)
+
+    def test_hours_match_calc_hour(self):
+        rng = np.random.default_rng(0)
+        for _ in range(200):
+            start, end = rng.integers(24, size=2), rng.integers(0, 60, size=2)
+            time_str = f"{start[0]:02d}:{end[0]:02d}-{start[1]:02d}:{end[1]:02d}"
+            self.assertAlmostEqual(legacy_hours(time_str), calc_hour(time_str), msg=time_str)
+        self.assertEqual(legacy_hours("18:00-24:00"), calc_hour("18:00-00:00"))
+        self.assertEqual(legacy_hours("-"), 0)
+
+    def test_reads_like_excel_tool(self):
+        expected = ExcelTool.read_availability(WORKBOOK)
+        self.assertEqual(list(self.schedule.people), list(expected.people))
+        for name, person in expected.people.items():
+            self.assertEqual(self.schedule.people[name].availability, person.availability)
+        self.assertEqual([(s.time, s.hours, s.persons_required) for s in self.schedule.shifts],
+                         [(s.time, s.hours, s.persons_required) for s in expected.shifts])
+
+    def test_objective(self):
+        num_people, num_shifts = len(self.schedule.people), len(self.schedule.shifts)
+        slack = np.array([s.persons_required for s in self.schedule.shifts], dtype=int)
+        # Nobody assigned: every first position costs NoOne_1, every second NoOne_2
+        expected = (np.sum(legacy_shares(self.schedule) ** 2)
+                    + NO_ONE_PENALTIES[0] * np.sum(slack >= 1) + NO_ONE_PENALTIES[1] * np.sum(slack == 2))
+        self.assertAlmostEqual(legacy_objective(self.schedule, np.zeros((num_people, num_shifts)), slack), expected)
+        # The NoOne dummies take part of the available hours
+        self.assertLess(legacy_shares(self.schedule).sum(), 1)
+
+    def test_write_legacy_schedule(self):
+        class Roster:
+            def get_assignment(self):
+                assignment = np.zeros((len(schedule.people), len(schedule.shifts)), dtype=np.int8)
+                assignment[0, 0] = 1
+                slack = np.array([s.persons_required for s in schedule.shifts], dtype=int) - assignment.sum(axis=0)
+                return assignment, slack
+
+        schedule = self.schedule
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "Rooster_van_Poule Library.xls")
+            ExcelTool.write_legacy_schedule(schedule, Roster(), filename)
+            self.assertGreater(os.path.getsize(filename), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
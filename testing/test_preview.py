@@ -0,0 +1,96 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(__file__))
+
+import unittest
+import numpy as np
+
+from schedules import small_schedule
+from src import ExcelTool
+from src.preview import PreviewSolver, RosterLimits, improve_roster, round_relaxation
+from src.validator import RosterValidator
+from util.objective import availability_matrix, objective_breakdown
+from util.rules import WindowLimit
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+WORKBOOK = os.path.join(ROOT, "Beschikbaarheid_Mock_Full.xlsx")
+
+
+class TestPreviewRounding(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.schedule = ExcelTool.read_availability(WORKBOOK)
+        cls.schedule.calculate_availability()
+        cls.schedule.calculate_non_sunday_hours()
+        # Spreading every shift evenly over the available people is a feasible fractional assignment
+        availability = availability_matrix(cls.schedule).astype(float)
+        cls.fractional = availability / np.maximum(availability.sum(axis=0), 1)
+
+    def test_rounded_rosters_satisfy_the_rules(self):
+        for max_hours, sunday_quota in [(100, 20), (20, 10), (12, 40)]:
+            validator = RosterValidator(self.schedule, max_hours, sunday_quota)
+            rng = np.random.default_rng(max_hours)
+            for _ in range(5):
+                assignment, slack = round_relaxation(self.schedule, self.fractional, max_hours, sunday_quota, rng)
+                self.assertEqual(validator.validate(assignment, slack), [])
+                improved = improve_roster(self.schedule, assignment, max_hours, sunday_quota)
+                self.assertEqual(validator.validate(improved, slack), [])
+                self.assertLessEqual(objective_breakdown(self.schedule, improved, slack)['Total'],
+                                     objective_breakdown(self.schedule, assignment, slack)['Total'] + 1e-9)
+
+    def test_rounding_follows_the_relaxation(self):
+        # A 0/1 relaxation that is already a valid roster is kept as it is
+        rng = np.random.default_rng(0)
+        assignment, slack = round_relaxation(self.schedule, self.fractional, 100, 20, rng)
+        again, again_slack = round_relaxation(self.schedule, assignment.astype(float), 100, 20, rng, fill_weight=0)
+        np.testing.assert_array_equal(again, assignment)
+        np.testing.assert_array_equal(again_slack, slack)
+
+    def test_rounding_keeps_window_limits(self):
+        window_limits = [WindowLimit(7, max_shifts=3), WindowLimit(3, max_hours=12, soft=True)]
+        limits = RosterLimits(self.schedule, window_limits, min_free_weekends=2)
+        # Soft limits are kept as hard ones while rounding
+        validator = RosterValidator(self.schedule, 100, 20, [WindowLimit(7, max_shifts=3), WindowLimit(3, max_hours=12)],
+                                    min_free_weekends=2)
+        rng = np.random.default_rng(1)
+        for _ in range(3):
+            assignment, slack = round_relaxation(self.schedule, self.fractional, 100, 20, rng, limits=limits)
+            self.assertEqual(validator.validate(assignment, slack), [])
+            improved = improve_roster(self.schedule, assignment, 100, 20, limits=limits)
+            self.assertEqual(validator.validate(improved, slack), [])
+
+
+def preview(schedule, max_hours, sunday_quota, **kwargs):
+    solver = PreviewSolver(schedule, max_hours, sunday_quota, **kwargs)
+    solver.model.setParam('OutputFlag', 0)
+    solver.setup_variables()
+    solver.set_objective()
+    solver.apply_constraints()
+    solver.solve()
+    return solver
+
+
+class TestPreviewSolver(unittest.TestCase):
+    def test_solve(self):
+        schedule = small_schedule(18, 5)
+        window_limits = [WindowLimit(3, max_shifts=2)]
+        solver = preview(schedule, 20, 10, window_limits=window_limits, min_free_weekends=1)
+        self.assertLessEqual(solver.bound, solver.objective + 1e-6)
+        assignment, slack = solver.get_assignment()
+        self.assertEqual(solver.violations, [])
+        self.assertEqual(RosterValidator(schedule, 20, 10, window_limits, 1).validate(assignment, slack), [])
+        self.assertAlmostEqual(objective_breakdown(schedule, assignment, slack)['Total'], solver.objective)
+
+    def test_bound_uses_quadratic_fairness(self):
+        schedule = small_schedule(18, 5)
+        quadratic = preview(schedule, 20, 10)
+        for fairness in ["l1", "pwl"]:
+            other = preview(schedule, 20, 10, fairness=fairness)
+            self.assertAlmostEqual(other.bound, quadratic.bound, delta=1e-6 * max(1.0, abs(quadratic.bound)))
+            self.assertLessEqual(other.bound, other.objective + 1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(__file__))
+
+import tempfile
+import unittest
+
+from schedules import small_schedule
+from src.racing import SolverRace
+from src.validator import RosterValidator
+from util.objective import objective_breakdown
+
+
+class TestSolverRace(unittest.TestCase):
+    def test_two_configs(self):
+        schedule = small_schedule()
+        with tempfile.TemporaryDirectory() as tmp:
+            log_file = os.path.join(tmp, "race_log.csv")
+            result = SolverRace(schedule, 20, 10, configs=[{'Seed': 0}, {'Seed': 1, 'MIPFocus': 1}], num_workers=2,
+                                total_threads=2, time_limit=30, log_file=log_file).run()
+            self.assertTrue(os.path.exists(log_file))
+
+        self.assertEqual([run['worker'] for run in result.runs], [0, 1])
+        self.assertTrue(all(run['error'] is None for run in result.runs))
+        assignment, slack = result.get_assignment()
+        self.assertEqual(RosterValidator(schedule, 20, 10).validate(assignment, slack), [])
+
+        # The winner is the worker whose incumbent was returned
+        winner = [run for run in result.runs if run['config'] == result.config]
+        self.assertEqual(len(winner), 1)
+        self.assertAlmostEqual(winner[0]['objective'], result.objective, delta=1e-6 * abs(result.objective))
+        self.assertAlmostEqual(objective_breakdown(schedule, assignment, slack)['Total'], result.objective,
+                               delta=1e-6 * abs(result.objective))
+        self.assertLessEqual(result.bound, result.objective + 1e-6 * abs(result.objective))
+
+    def test_solver_options(self):
+        schedule = small_schedule()
+        with tempfile.TemporaryDirectory() as tmp:
+            result = SolverRace(schedule, 15, 5, configs=[{'Seed': 0}, {'Seed': 1}], num_workers=2, total_threads=2,
+                                time_limit=30, log_file=os.path.join(tmp, "race_log.csv"),
+                                solver_options={'lazy_constraints': True, 'spread_weight': 0}).run()
+        assignment, slack = result.get_assignment()
+        self.assertEqual(RosterValidator(schedule, 15, 5).validate(assignment, slack), [])
+        self.assertAlmostEqual(objective_breakdown(schedule, assignment, slack, 0)['Total'], result.objective,
+                               delta=1e-6 * abs(result.objective))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import tempfile
+import unittest
+import pandas as pd
+
+from src import ExcelTool
+from src.readers import CsvReader, read_schedule
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+WORKBOOK = os.path.join(ROOT, "Beschikbaarheid_Mock_Full.xlsx")
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+def export_rows():
+    """The "Hele Team" sheet as plain string rows, the way the form system exports it."""
+    frame = pd.read_excel(WORKBOOK, header=1, sheet_name="Hele Team").iloc[:-5]
+    frame["Datum"] = frame["Datum"].map(lambda d: d.isoformat())
+    return frame.fillna("").astype(str)
+
+
+class TestReaders(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.expected = ExcelTool.read_availability(WORKBOOK)
+        cls.rows = export_rows()
+        cls.tmp = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def assertSameSchedule(self, schedule):
+        self.assertEqual(list(schedule.people), list(self.expected.people))
+        for name, person in self.expected.people.items():
+            self.assertEqual(schedule.people[name].availability, person.availability)
+        self.assertEqual(len(schedule.shifts), len(self.expected.shifts))
+        # The workbook has stray newlines in some day names, the readers strip them
+        for shift, expected in zip(schedule.shifts, self.expected.shifts):
+            self.assertEqual((shift.time, shift.hours, shift.bonus_hours, shift.persons_required, shift.shift_type, shift.day),
+                             (expected.time, expected.hours, expected.bonus_hours, expected.persons_required,
+                              expected.shift_type, expected.day.strip()))
+
+    def test_csv_matches_excel(self):
+        self.rows.to_csv(self.path("availability.csv"), index=False)
+        # A small chunk size spreads the matrix over several chunks
+        self.assertSameSchedule(CsvReader(chunk_size=7).read(self.path("availability.csv")))
+
+    def test_json_lines_matches_excel(self):
+        with open(self.path("availability.jsonl"), "w") as f:
+            for row in self.rows.to_dict(orient="records"):
+                f.write(json.dumps(row) + "\n")
+        self.assertSameSchedule(read_schedule(self.path("availability.jsonl")))
+
+    @unittest.skipUnless(pyarrow, "pyarrow is not installed")
+    def test_parquet_matches_excel(self):
+        self.rows.to_parquet(self.path("availability.parquet"), index=False)
+        self.assertSameSchedule(read_schedule(self.path("availability.parquet"), chunk_size=10))
+
+    def test_invalid_rows_report_line(self):
+        rows = self.rows.copy()
+        rows.loc[3, "Poule Library"] = "8:00-13:00"
+        rows.to_csv(self.path("bad_time.csv"), index=False)
+        with self.assertRaisesRegex(ValueError, r"bad_time.csv:5: invalid shift time"):
+            read_schedule(self.path("bad_time.csv"))
+
+        rows = self.rows.copy()
+        rows.loc[0, rows.columns[-1]] = "misschien"
+        rows.to_csv(self.path("bad_availability.csv"), index=False)
+        with self.assertRaisesRegex(ValueError, r"bad_availability.csv:2: invalid availability"):
+            read_schedule(self.path("bad_availability.csv"))
+
+        self.rows.drop(columns=["Type"]).to_csv(self.path("no_type.csv"), index=False)
+        with self.assertRaisesRegex(ValueError, r"missing column\(s\) \['Type'\]"):
+            read_schedule(self.path("no_type.csv"))
+
+    def test_rows_with_missing_values(self):
+        person = self.rows.columns[-1]
+        records = self.rows.to_dict(orient="records")
+        del records[2][person]
+        with open(self.path("missing_person.jsonl"), "w") as f:
+            for row in records:
+                f.write(json.dumps(row) + "\n")
+        with self.assertRaisesRegex(ValueError, rf"missing_person.jsonl:3: missing column\(s\) \[{person!r}\]"):
+            read_schedule(self.path("missing_person.jsonl"))
+
+        # A short CSV row would otherwise read as unavailable, a long one would drop a value
+        self.rows.to_csv(self.path("short.csv"), index=False)
+        with open(self.path("short.csv")) as f:
+            lines = f.read().splitlines()
+        lines[4] = lines[4].rsplit(",", 1)[0]
+        with open(self.path("short.csv"), "w") as f:
+            f.write("\n".join(lines) + "\n")
+        with self.assertRaisesRegex(ValueError, rf"short.csv:5: no value for column\(s\) \[{person!r}\]"):
+            read_schedule(self.path("short.csv"))
+
+        lines[4] += ",j,j"
+        with open(self.path("long.csv"), "w") as f:
+            f.write("\n".join(lines) + "\n")
+        with self.assertRaisesRegex(ValueError, r"long.csv:5: 1 value\(s\) more than the header has"):
+            read_schedule(self.path("long.csv"))
+
+    def test_json_array_is_not_json_lines(self):
+        with open(self.path("availability.json"), "w") as f:
+            json.dump(self.rows.to_dict(orient="records"), f)
+        with self.assertRaisesRegex(ValueError, "Unsupported availability file"):
+            read_schedule(self.path("availability.json"))
+        os.replace(self.path("availability.json"), self.path("array.jsonl"))
+        with self.assertRaisesRegex(ValueError, "a JSON array, expected JSON lines"):
+            read_schedule(self.path("array.jsonl"))
+
+
+if __name__ == '__main__':
+    unittest.main()
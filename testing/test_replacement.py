@@ -0,0 +1,126 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(__file__))
+
+import unittest
+import time
+import numpy as np
+
+from src.replacement import ReplacementFinder
+from src.validator import RosterValidator
+from test_validator import generate_schedule
+from util.rules import WindowLimit
+
+
+def greedy_roster(schedule, validator):
+    assignment = np.zeros((len(schedule.people), len(schedule.shifts)), dtype=int)
+    for p, s in zip(*np.nonzero(validator.availability)):
+        assignment[p, s] = 1
+        if validator.validate(assignment):
+            assignment[p, s] = 0
+    return assignment
+
+
+def replaced_roster(schedule, assignment, p, s, replacement):
+    roster = assignment.copy()
+    roster[p, s] = 0
+    for person, shift_idx, gained in replacement.moves:
+        roster[list(schedule.people).index(person), shift_idx] = int(gained)
+    return roster
+
+
+class TestReplacementFinder(unittest.TestCase):
+    def test_replacements_keep_roster_valid(self):
+        checked = chains = 0
+        for seed in range(40):
+            rng = np.random.default_rng(seed)
+            schedule = generate_schedule(rng)
+            validator = RosterValidator(schedule, max_hours=30, sunday_quota=10)
+            # A tighter cap for the initial roster leaves room for substitutes
+            assignment = greedy_roster(schedule, RosterValidator(schedule, max_hours=20, sunday_quota=10))
+            assigned = np.argwhere(assignment)
+            if len(assigned) == 0:
+                continue
+
+            p, s = assigned[rng.integers(len(assigned))]
+            dropout = list(schedule.people)[p]
+            finder = ReplacementFinder(schedule, assignment, max_hours=30, sunday_quota=10)
+            replacements = finder.find(dropout, int(s), limit=50)
+
+            deltas = [r.fairness_delta for r in replacements]
+            self.assertEqual(deltas, sorted(deltas))
+            for replacement in replacements:
+                roster = replaced_roster(schedule, assignment, p, s, replacement)
+                self.assertEqual(validator.validate(roster), [], f"Seed {seed}: {replacement}")
+                self.assertEqual(roster[:, s].sum(), assignment[:, s].sum())
+                checked += 1
+                chains += len(replacement.moves) > 1
+        self.assertGreater(checked, 0)
+        self.assertGreater(chains, 0)
+
+    def test_replacements_keep_window_limits(self):
+        window_limits = [WindowLimit(3, max_shifts=2), WindowLimit(7, max_hours=16, soft=True)]
+        checked = unlimited_violations = 0
+        for seed in range(40):
+            rng = np.random.default_rng(seed)
+            schedule = generate_schedule(rng)
+            # Soft limits are kept as hard ones, so the validator gets them as hard limits
+            validator = RosterValidator(schedule, max_hours=30, sunday_quota=10,
+                                        window_limits=[WindowLimit(3, max_shifts=2), WindowLimit(7, max_hours=16)],
+                                        min_free_weekends=1)
+            assignment = greedy_roster(schedule, validator)
+            assigned = np.argwhere(assignment)
+            if len(assigned) == 0:
+                continue
+
+            p, s = assigned[rng.integers(len(assigned))]
+            dropout = list(schedule.people)[p]
+            finder = ReplacementFinder(schedule, assignment, max_hours=30, sunday_quota=10,
+                                       window_limits=window_limits, min_free_weekends=1)
+            for replacement in finder.find(dropout, int(s), limit=50):
+                roster = replaced_roster(schedule, assignment, p, s, replacement)
+                self.assertEqual(validator.validate(roster), [], f"Seed {seed}: {replacement}")
+                checked += 1
+            # Without the limits the finder proposes moves that break them
+            for replacement in ReplacementFinder(schedule, assignment, 30, 10).find(dropout, int(s), limit=50):
+                unlimited_violations += bool(validator.validate(replaced_roster(schedule, assignment, p, s, replacement)))
+        self.assertGreater(checked, 0)
+        self.assertGreater(unlimited_violations, 0)
+
+    def test_apply_updates_roster(self):
+        rng = np.random.default_rng(7)
+        schedule = generate_schedule(rng)
+        validator = RosterValidator(schedule, max_hours=40, sunday_quota=0)
+        assignment = greedy_roster(schedule, RosterValidator(schedule, max_hours=20, sunday_quota=0))
+        finder = ReplacementFinder(schedule, assignment, max_hours=40, sunday_quota=0)
+
+        for p, s in np.argwhere(assignment):
+            replacements = finder.find(list(schedule.people)[p], int(s))
+            if replacements:
+                finder.apply(list(schedule.people)[p], int(s), replacements[0])
+                roster = finder.get_assignment()
+                self.assertEqual(roster[p, s], 0)
+                self.assertEqual(validator.validate(roster), [])
+                return
+        self.fail("No replacement found")
+
+    def test_query_is_fast(self):
+        rng = np.random.default_rng(1)
+        schedule = generate_schedule(rng)
+        while len(schedule.shifts) < 50 or len(schedule.people) < 6:
+            schedule = generate_schedule(rng)
+        validator = RosterValidator(schedule, max_hours=60, sunday_quota=10)
+        assignment = greedy_roster(schedule, validator)
+        finder = ReplacementFinder(schedule, assignment, max_hours=60, sunday_quota=10)
+
+        start = time.perf_counter()
+        for p, s in np.argwhere(assignment):
+            finder.find(list(schedule.people)[p], int(s))
+        per_query = (time.perf_counter() - start) / max(1, assignment.sum())
+        self.assertLess(per_query, 0.1)
+
+
+if __name__ == '__main__':
+    unittest.main()
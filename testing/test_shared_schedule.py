@@ -0,0 +1,106 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(__file__))
+
+import datetime
+import multiprocessing as mp
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+import gurobipy as gp
+import pandas as pd
+
+from schedules import small_schedule
+from src import ExcelTool
+from src.lp_solver import LPSolver
+from src.shared_schedule import SharedSchedule, attached_schedule, solve_scenarios
+from src.validator import RosterValidator
+from util.bonus_rules import BonusRule, BonusRuleSet
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+WORKBOOK = os.path.join(ROOT, "Beschikbaarheid_Mock_Full.xlsx")
+
+
+class TestSharedSchedule(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.schedule = ExcelTool.read_availability(WORKBOOK)
+        cls.schedule.calculate_availability()
+        cls.schedule.calculate_non_sunday_hours()
+
+    def assertSameSchedule(self, schedule, expected):
+        # Every attribute of every shift and person, dates with their type
+        self.assertEqual(list(schedule.people), list(expected.people))
+        for name, person in expected.people.items():
+            self.assertEqual(vars(schedule.people[name]), vars(person))
+        self.assertEqual(len(schedule.shifts), len(expected.shifts))
+        for shift, other in zip(expected.shifts, schedule.shifts):
+            self.assertEqual(vars(other), vars(shift))
+            self.assertIs(type(other.date), type(shift.date))
+
+    def test_round_trip(self):
+        with SharedSchedule.create(self.schedule) as shared:
+            self.assertEqual(shared.arrays['availability'].shape,
+                             (len(self.schedule.people), len(self.schedule.shifts)))
+            self.assertFalse(shared.arrays['hours'].flags.writeable)
+            attached = SharedSchedule.attach(shared.name)
+            self.addCleanup(attached.close)
+            self.assertSameSchedule(attached.to_schedule(), self.schedule)
+
+    def test_date_types_are_kept(self):
+        schedule = ExcelTool.read_availability(WORKBOOK)
+        dates = [None, datetime.date(2024, 3, 4), datetime.datetime(2024, 3, 5, 8, 30), "2024-03-06"]
+        for shift, date in zip(schedule.shifts, dates):
+            shift.date = date
+        with SharedSchedule.create(schedule) as shared:
+            attached = SharedSchedule.attach(shared.name)
+            self.addCleanup(attached.close)
+            rebuilt = attached.to_schedule()
+        self.assertIsInstance(schedule.shifts[len(dates)].date, pd.Timestamp)
+        for shift, other in zip(schedule.shifts, rebuilt.shifts):
+            self.assertEqual(other.date, shift.date)
+            self.assertIs(type(other.date), type(shift.date))
+
+    def test_custom_bonus_hours_are_kept(self):
+        schedule = ExcelTool.read_availability(WORKBOOK)
+        BonusRuleSet([BonusRule("Alles", multiplier=2.0)]).apply(schedule)
+        with SharedSchedule.create(schedule) as shared:
+            attached = SharedSchedule.attach(shared.name)
+            self.addCleanup(attached.close)
+            rebuilt = attached.to_schedule()
+        self.assertEqual([s.bonus_hours for s in rebuilt.shifts], [2.0 * s.hours for s in schedule.shifts])
+
+    def test_attach_in_worker_process(self):
+        with SharedSchedule.create(self.schedule) as shared:
+            with ProcessPoolExecutor(2, mp_context=mp.get_context("spawn")) as executor:
+                schedules = list(executor.map(attached_schedule, [shared.name] * 2))
+        for schedule in schedules:
+            self.assertSameSchedule(schedule, self.schedule)
+
+
+class TestSolveScenarios(unittest.TestCase):
+    def test_matches_direct_solves(self):
+        schedule = small_schedule()
+        scenarios = [{'max_hours': 20, 'sunday_quota': 10}, {'max_hours': 30, 'sunday_quota': 10, 'spread_weight': 0}]
+        results = solve_scenarios(schedule, scenarios, workers=2, time_limit=30)
+        self.assertEqual([result['scenario'] for result in results], scenarios)
+
+        for scenario, result in zip(scenarios, results):
+            solver = LPSolver(small_schedule(), **scenario)
+            solver.model.setParam('OutputFlag', 0)
+            solver.model.setParam('TimeLimit', 30)
+            solver.setup_variables()
+            solver.set_objective()
+            solver.apply_constraints()
+            solver.solve()
+            self.assertEqual(result['status'], gp.GRB.OPTIMAL, scenario)
+            # Both stop within the default relative MIPGap of the optimum
+            self.assertAlmostEqual(result['objective'], solver.model.ObjVal, delta=2e-4 * solver.model.ObjVal)
+            self.assertEqual(RosterValidator(schedule, scenario['max_hours'], scenario['sunday_quota'])
+                             .validate(result['assignment'], result['slack']), [], scenario)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(__file__))
+
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+from schedules import small_schedule
+from src import ExcelTool
+from src.column_generation import PatternSolver
+from src.legacy import LegacySolver, read_legacy_availability
+from src.lp_solver import LPSolver
+from src.preview import PreviewSolver, round_relaxation
+from src.racing import SolverRace
+from src.solution import Solution
+from util.bonus_rules import BonusRule, BonusRuleSet
+from util.objective import availability_matrix
+from util.rules import WindowLimit
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+WORKBOOK = os.path.join(ROOT, "Beschikbaarheid_Mock_Full.xlsx")
+
+
+def read_schedule():
+    schedule = ExcelTool.read_availability(WORKBOOK)
+    schedule.calculate_availability()
+    schedule.calculate_non_sunday_hours()
+    return schedule
+
+
+def make_roster(schedule, seed):
+    rng = np.random.default_rng(seed)
+    fractional = availability_matrix(schedule) * rng.random((len(schedule.people), len(schedule.shifts)))
+    return round_relaxation(schedule, fractional, 40, 20, rng)
+
+
+class TestSolution(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.schedule = read_schedule()
+        cls.tmp = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_round_trip(self):
+        assignment, slack = make_roster(self.schedule, 0)
+        solution = Solution.from_assignment(self.schedule, assignment, slack,
+                                            {'max_hours': 40, 'sunday_quota': 20, 'spread_weight': 10,
+                                             'carry_over': {'P1': (2.0, 0.5)}})
+        solution.save(self.path("solution.npz"))
+        loaded = Solution.load(self.path("solution.npz"))
+
+        np.testing.assert_array_equal(loaded.assignment, assignment)
+        np.testing.assert_array_equal(loaded.slack, slack)
+        self.assertEqual((loaded.max_hours, loaded.sunday_quota), (40, 20))
+        self.assertEqual(loaded.breakdown, solution.breakdown)
+        self.assertEqual(loaded.metadata['params']['carry_over'], {'P1': [2.0, 0.5]})
+
+    def test_render_without_solver(self):
+        schedule = read_schedule()
+        BonusRuleSet([BonusRule("Alles", multiplier=1.0)]).apply(schedule)
+        assignment, slack = make_roster(schedule, 1)
+        Solution.from_assignment(schedule, assignment, slack, {'max_hours': 40, 'sunday_quota': 20}).save(
+            self.path("render.npz"))
+
+        # A freshly read schedule gets the stored bonus hours back
+        solution = Solution.load(self.path("render.npz"))
+        fresh = solution.attach(read_schedule())
+        self.assertEqual([s.bonus_hours for s in fresh.shifts], [s.hours for s in schedule.shifts])
+
+        ExcelTool.write_schedule(fresh, solution, self.path("roster.xlsx"))
+        ExcelTool.write_csv(fresh, solution, self.path("roster.csv"))
+        ExcelTool.write_metrics(fresh, solution, self.path("metrics.xlsx"))
+        np.testing.assert_array_equal(ExcelTool.read_assignment(fresh, self.path("roster.xlsx")), assignment)
+        roster = pd.read_csv(self.path("roster.csv"))
+        self.assertEqual(roster["Unfilled"].tolist(), slack.tolist())
+        metrics = pd.read_excel(self.path("metrics.xlsx")).set_index("Metric")["Value"]
+        self.assertAlmostEqual(metrics["Regular Hours Fairness (SSE)"], solution.breakdown['Regular SSE'])
+
+    def test_attach_rejects_other_schedule(self):
+        assignment, slack = make_roster(self.schedule, 2)
+        solution = Solution.from_assignment(self.schedule, assignment, slack)
+        other = read_schedule()
+        other.shifts[0].persons_required += 1
+        with self.assertRaisesRegex(ValueError, "differs"):
+            solution.attach(other)
+
+    def test_diff(self):
+        first = Solution.from_assignment(self.schedule, *make_roster(self.schedule, 3))
+        second = Solution.from_assignment(self.schedule, *make_roster(self.schedule, 4))
+        diff = first.diff(second)
+        self.assertEqual(len(diff['changed']), int(np.sum(first.assignment != second.assignment)))
+        self.assertAlmostEqual(diff['breakdown']['Total'], second.breakdown['Total'] - first.breakdown['Total'])
+        self.assertEqual(first.diff(first)['changed'], [])
+
+
+def solve(solver):
+    solver.model.setParam('OutputFlag', 0)
+    solver.setup_variables()
+    solver.set_objective()
+    solver.apply_constraints()
+    solver.solve()
+    return solver
+
+
+class TestFromSolver(unittest.TestCase):
+    def check(self, schedule, solver, name, objective, same_objective=True):
+        solution = Solution.from_solver(schedule, solver)
+        assignment, slack = solver.get_assignment()
+        np.testing.assert_array_equal(solution.assignment, assignment)
+        np.testing.assert_array_equal(solution.slack, slack)
+        self.assertEqual(solution.metadata['params']['solver'], name)
+        self.assertEqual((solution.max_hours, solution.sunday_quota), (20, 10))
+        self.assertAlmostEqual(solution.objective, objective)
+        if same_objective:
+            # The stored breakdown scores the roster in the objective the solver reported
+            self.assertAlmostEqual(solution.breakdown['Total'], objective, delta=1e-6 * abs(objective))
+        return solution
+
+    def test_lp_solver(self):
+        schedule = small_schedule()
+        solver = solve(LPSolver(schedule, 20, 10))
+        solution = self.check(schedule, solver, "LPSolver", solver.model.ObjVal)
+        self.assertEqual(solution.metadata['params']['fairness'], "quadratic")
+
+    def test_lp_solver_with_other_fairness_and_soft_windows(self):
+        schedule = small_schedule()
+        solver = solve(LPSolver(schedule, 20, 10, fairness="hybrid",
+                                window_limits=[WindowLimit(2, max_shifts=1, soft=True)]))
+        solution = self.check(schedule, solver, "LPSolver", solver.model.ObjVal)
+        self.assertGreater(solution.breakdown['Window'], 0)
+        self.assertEqual(solution.window_limits[0].days, 2)
+
+    def test_legacy_solver(self):
+        schedule = small_schedule(reader=read_legacy_availability)
+        solver = solve(LegacySolver(schedule, 20, 10))
+        # The legacy objective has its own terms, only the reported value is kept
+        self.check(schedule, solver, "LegacySolver", solver.model.ObjVal, same_objective=False)
+
+    def test_pattern_solver(self):
+        schedule = small_schedule()
+        solver = PatternSolver(schedule, 20, 10, time_limit=30)
+        solver.solve()
+        self.check(schedule, solver, "PatternSolver", solver.model.ObjVal)
+
+    def test_preview_solver(self):
+        schedule = small_schedule()
+        solver = solve(PreviewSolver(schedule, 20, 10))
+        solution = self.check(schedule, solver, "PreviewSolver", solver.objective)
+        self.assertEqual(solution.metadata['params']['spread_weight'], solver.evaluation_weight)
+
+    def test_race_result(self):
+        schedule = small_schedule()
+        carry_over = {list(schedule.people)[0]: (3.0, 0.0)}
+        with tempfile.TemporaryDirectory() as tmp:
+            result = SolverRace(schedule, 20, 10, configs=[{'Seed': 0}, {'Seed': 1}], num_workers=2,
+                                total_threads=2, time_limit=30, log_file=os.path.join(tmp, "race_log.csv"),
+                                solver_options={'spread_weight': 4, 'carry_over': carry_over}).run()
+        # The breakdown is scored with the spread weight and carry-over the workers solved with
+        solution = self.check(schedule, result, "RaceResult", result.objective)
+        self.assertEqual(solution.metadata['params']['config'], result.config)
+        self.assertEqual(solution.metadata['params']['spread_weight'], 4)
+        self.assertEqual(solution.metadata['params']['carry_over'], {name: list(owed) for name, owed in carry_over.items()})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import subprocess
+import unittest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def loaded_modules(statement):
+    code = f"import sys\n{statement}\nprint(' '.join(sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+
+class TestStartup(unittest.TestCase):
+    def test_packages_load_nothing_heavy(self):
+        modules = loaded_modules("import src, util")
+        self.assertNotIn("gurobipy", modules)
+        self.assertNotIn("pandas", modules)
+        self.assertNotIn("numpy", modules)
+
+    def test_validator_path_skips_gurobipy_and_pandas(self):
+        modules = loaded_modules("from src.validator import RosterValidator\n"
+                                 "from src.diagnostics import ShiftDiagnostics\n"
+                                 "from src.replacement import ReplacementFinder")
+        self.assertNotIn("gurobipy", modules)
+        self.assertNotIn("pandas", modules)
+
+    def test_reader_path_skips_gurobipy(self):
+        modules = loaded_modules("from src import ExcelTool")
+        self.assertIn("pandas", modules)
+        self.assertNotIn("gurobipy", modules)
+
+    def test_streaming_readers_skip_pandas(self):
+        modules = loaded_modules("from src.readers import read_schedule")
+        self.assertNotIn("pandas", modules)
+        self.assertNotIn("openpyxl", modules)
+        self.assertNotIn("gurobipy", modules)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import tempfile
+import unittest
+
+from src.tuning import PROFILE_VERSION, describe_profile, load_profile, read_prm, save_profile, time_to_target
+
+
+class TestTuning(unittest.TestCase):
+    def test_time_to_target(self):
+        trajectory = [(0.5, 120.0), (2.0, 101.0), (7.5, 100.0)]
+        self.assertEqual(time_to_target(trajectory, 101.0, 10), 2.0)
+        self.assertEqual(time_to_target(trajectory, 100.1, 10), 7.5)
+        # Missing the target costs twice the time limit
+        self.assertEqual(time_to_target(trajectory, 99.0, 10), 20)
+        self.assertEqual(time_to_target([], 99.0, 10), 20)
+
+    def test_profile_round_trip(self):
+        winner = {'params': {'MIPFocus': 1, 'Heuristics': 0.3}, 'time_to_target': 4.0}
+        default = {'params': {}, 'time_to_target': 12.0}
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "profile.json")
+            save_profile(path, winner, default, ["a.mps", "b.mps"], "grid", 60, 1e-3)
+            profile = load_profile(path)
+            self.assertEqual(profile['version'], PROFILE_VERSION)
+            self.assertEqual(profile['params'], winner['params'])
+            self.assertIn("12.0s -> 4.0s (3.0x)", describe_profile(profile))
+
+            # Reserved parameters are never applied, other versions are ignored
+            profile['params']['TimeLimit'] = 5
+            with open(path, "w") as f:
+                json.dump(profile, f)
+            self.assertNotIn('TimeLimit', load_profile(path)['params'])
+            profile['version'] = PROFILE_VERSION + 1
+            with open(path, "w") as f:
+                json.dump(profile, f)
+            self.assertIsNone(load_profile(path))
+
+        self.assertIsNone(load_profile(None))
+        self.assertIsNone(load_profile("missing_profile.json"))
+
+    def test_read_prm(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "tune.prm")
+            with open(path, "w") as f:
+                f.write("# Parameter settings\n\nMIPFocus  2\nHeuristics  0.25\nTimeLimit  30\nMIPGap  1e-05\n")
+            self.assertEqual(read_prm(path), {'MIPFocus': 2, 'Heuristics': 0.25, 'MIPGap': 1e-05})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,185 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import datetime
+import tempfile
+import numpy as np
+
+from src.excel_writer import ExcelTool
+from src.validator import RosterValidator
+from util import Person, Schedule, Shift
+from util.rules import WindowLimit
+
+DAYS = ["Maandag", "Dinsdag", "Woensdag", "Donderdag", "Vrijdag", "Zaterdag", "Zondag"]
+
+
+def generate_schedule(rng):
+    """Random schedule with the weekday (Ochtend/Middag/Avond) and weekend (Ochtend/Avond) layout."""
+    schedule = Schedule()
+    start_day = rng.integers(7)
+    start_date = datetime.date(2024, 1, 1)
+    for day_offset in range(rng.integers(3, 22)):
+        day = DAYS[(start_day + day_offset) % 7]
+        date = start_date + datetime.timedelta(days=day_offset)
+        if day in ["Zaterdag", "Zondag"]:
+            layout = [("08:00-16:00", 8, "Ochtend"), ("16:00-24:00", 8, "Avond")]
+        else:
+            layout = [("08:00-13:00", 5, "Ochtend"), ("13:00-18:00", 5, "Middag"), ("18:00-24:00", 6, "Avond")]
+        for time, hours, shift_type in layout:
+            schedule.shifts.append(Shift(time, hours, int(rng.integers(1, 3)), shift_type, day, date))
+
+    for person_idx in range(rng.integers(1, 9)):
+        person = Person(f"P{person_idx + 1}")
+        person.availability = (rng.random(len(schedule.shifts)) < rng.uniform(0.1, 0.9)).astype(int).tolist()
+        schedule.people[person.name] = person
+    schedule.calculate_availability()
+    schedule.calculate_non_sunday_hours()
+    return schedule
+
+
+def reference_violations(schedule, assignment, max_hours, sunday_quota):
+    """Loop-based restatement of LPSolver.apply_constraints (without slack)."""
+    found = set()
+    people = list(schedule.people.items())
+    for p, (name, person) in enumerate(people):
+        prev_shift, prev_prev_shift = None, None
+        prev_type, prev_prev_type = None, None
+        for shift_idx, shift in enumerate(schedule.shifts):
+            if assignment[p][shift_idx] and not person.availability[shift_idx]:
+                found.add(("C3_Availability", name, (shift_idx,)))
+            if prev_type == "Avond" and shift.shift_type == "Ochtend":
+                if assignment[p][prev_shift] and assignment[p][shift_idx]:
+                    found.add(("C4_NoNightToMorning", name, (prev_shift, shift_idx)))
+            if shift.shift_type == "Avond":
+                if prev_type in ["Middag", "Ochtend"] and assignment[p][prev_shift] and assignment[p][shift_idx]:
+                    found.add(("C5.1_NoAfternoonToEvening", name, (prev_shift, shift_idx)))
+                if prev_prev_type == "Ochtend" and assignment[p][prev_prev_shift] and assignment[p][shift_idx]:
+                    found.add(("C5.2_NoMorningToEvening", name, (prev_prev_shift, shift_idx)))
+            if shift.day == "Zondag" and person.non_sunday_hours < sunday_quota and assignment[p][shift_idx]:
+                found.add(("C6_NoSundayIfQuotaNotMet", name, (shift_idx,)))
+            prev_prev_shift, prev_prev_type = prev_shift, prev_type
+            prev_shift, prev_type = shift_idx, shift.shift_type
+
+        sundays = [i for i, s in enumerate(schedule.shifts) if s.day == "Zondag" and assignment[p][i]]
+        if len(sundays) > 1:
+            found.add(("C7_OneSundayShift", name, tuple(sundays)))
+        worked = [i for i in range(len(schedule.shifts)) if assignment[p][i]]
+        if sum(schedule.shifts[i].hours for i in worked) > max_hours:
+            found.add(("C8_MaxHours", name, tuple(worked)))
+
+    for shift_idx, shift in enumerate(schedule.shifts):
+        if sum(assignment[p][shift_idx] for p in range(len(people))) > shift.persons_required:
+            found.add(("C2_ShiftAssignment", None, (shift_idx,)))
+    return found
+
+
+def reference_window_violations(schedule, assignment, limits, min_free_weekends):
+    """Counts every window and weekend directly from the calendar days."""
+    days = []
+    for shift_idx, shift in enumerate(schedule.shifts):
+        if not days or days[-1][0] != shift.date:
+            days.append((shift.date, shift.day, []))
+        days[-1][2].append(shift_idx)
+
+    found = set()
+    for p, name in enumerate(schedule.people):
+        for limit in limits:
+            for start in range(max(1, len(days) - limit.days + 1)):
+                window = [i for _, _, shifts in days[start:start + limit.days] for i in shifts]
+                load = {'shifts': sum(assignment[p][i] for i in window),
+                        'hours': sum(assignment[p][i] * schedule.shifts[i].hours for i in window),
+                        'days': sum(any(assignment[p][i] for i in shifts) for _, _, shifts in days[start:start + limit.days])}
+                for metric, bound in limit.limits():
+                    if load[metric] > bound:
+                        found.add(("C9_WindowLimit", name, tuple(i for i in window if assignment[p][i])))
+
+        free = num_weekends = 0
+        for day_idx, (date, day, shifts) in enumerate(days):
+            weekend = [shifts]
+            if day == "Zaterdag":
+                if day_idx + 1 < len(days):
+                    weekend.append(days[day_idx + 1][2])
+            elif day != "Zondag" or (day_idx > 0 and days[day_idx - 1][1] == "Zaterdag"):
+                continue
+            free += not any(assignment[p][i] for shifts in weekend for i in shifts)
+            num_weekends += 1
+        if free < min(min_free_weekends, num_weekends):
+            found.add(("C10_FreeWeekend", name, ()))
+    return found
+
+
+class TestRosterValidator(unittest.TestCase):
+    def test_matches_reference_on_random_rosters(self):
+        for seed in range(200):
+            rng = np.random.default_rng(seed)
+            schedule = generate_schedule(rng)
+            max_hours = int(rng.integers(5, 60))
+            sunday_quota = int(rng.integers(0, 40))
+            assignment = (rng.random((len(schedule.people), len(schedule.shifts))) < rng.uniform(0, 0.6)).astype(int)
+
+            violations = RosterValidator(schedule, max_hours, sunday_quota).validate(assignment)
+            found = {(v.rule, v.person, tuple(v.shifts)) for v in violations}
+            self.assertEqual(found, reference_violations(schedule, assignment, max_hours, sunday_quota),
+                             f"Mismatch for seed {seed}")
+
+    def test_window_limits_match_reference(self):
+        for seed in range(100):
+            rng = np.random.default_rng(seed)
+            schedule = generate_schedule(rng)
+            limits = [WindowLimit(int(rng.integers(2, 8)), max_shifts=int(rng.integers(1, 6))),
+                      WindowLimit(7, max_hours=float(rng.integers(8, 30)), max_days=int(rng.integers(1, 5))),
+                      WindowLimit(3, max_shifts=0, soft=True)]
+            min_free_weekends = int(rng.integers(0, 3))
+            assignment = (rng.random((len(schedule.people), len(schedule.shifts))) < rng.uniform(0, 0.6)).astype(int)
+
+            validator = RosterValidator(schedule, 1000, 0, window_limits=limits, min_free_weekends=min_free_weekends)
+            found = {(v.rule, v.person, tuple(v.shifts)) for v in validator.validate(assignment)
+                     if v.rule.startswith(("C9", "C10"))}
+            self.assertEqual(found, reference_window_violations(schedule, assignment, limits[:2], min_free_weekends),
+                             f"Mismatch for seed {seed}")
+
+    def test_greedy_roster_is_valid(self):
+        for seed in range(50):
+            rng = np.random.default_rng(seed)
+            schedule = generate_schedule(rng)
+            validator = RosterValidator(schedule, max_hours=40, sunday_quota=10)
+
+            # Add assignments one at a time and keep those that stay valid
+            assignment = np.zeros((len(schedule.people), len(schedule.shifts)), dtype=int)
+            for p, s in zip(*np.nonzero(validator.availability)):
+                assignment[p, s] = 1
+                if validator.validate(assignment):
+                    assignment[p, s] = 0
+
+            slack = np.array([s.persons_required for s in schedule.shifts]) - assignment.sum(axis=0)
+            self.assertEqual(validator.validate(assignment, slack), [])
+            self.assertEqual(reference_violations(schedule, assignment, 40, 10), set())
+
+    def test_slack_mismatch_and_non_binary_values(self):
+        schedule = generate_schedule(np.random.default_rng(0))
+        validator = RosterValidator(schedule, max_hours=100, sunday_quota=0)
+        assignment = np.zeros((len(schedule.people), len(schedule.shifts)))
+        assignment[0, 0] = 0.5
+
+        rules = [v.rule for v in validator.validate(assignment, slack=np.zeros(len(schedule.shifts)))]
+        self.assertIn("Binary", rules)
+        self.assertEqual(rules.count("C2_ShiftAssignment"), len(schedule.shifts))
+        with self.assertRaises(ValueError):
+            validator.validate(assignment[:, 1:])
+
+    def test_read_assignment_from_workbook(self):
+        rng = np.random.default_rng(3)
+        schedule = generate_schedule(rng)
+        assignment = (rng.random((len(schedule.people), len(schedule.shifts))) < 0.3).astype(np.int8)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "roster.xlsx")
+            ExcelTool._roster_frame(schedule, assignment).to_excel(filename, sheet_name="Shifts", index=False)
+            np.testing.assert_array_equal(ExcelTool.read_assignment(schedule, filename), assignment)
+
+
+if __name__ == '__main__':
+    unittest.main()
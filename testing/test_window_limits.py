@@ -0,0 +1,63 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(__file__))
+
+import unittest
+import numpy as np
+
+from schedules import small_schedule
+from src.lp_solver import LPSolver
+from src.validator import RosterValidator
+from util.objective import WINDOW_PENALTY, objective_breakdown
+from util.rules import WindowLimit, day_indices, window_starts
+
+# Monday to Sunday morning, so the schedule has one weekend
+NUM_SHIFTS, NUM_PEOPLE = 19, 4
+
+
+def solve(schedule, **kwargs):
+    solver = LPSolver(schedule, 40, 0, **kwargs)
+    solver.model.setParam('OutputFlag', 0)
+    solver.model.setParam('MIPGap', 0)
+    solver.setup_variables()
+    solver.set_objective()
+    solver.apply_constraints()
+    solver.solve()
+    return solver
+
+
+class TestWindowLimitSolve(unittest.TestCase):
+    def test_hard_limits_hold(self):
+        schedule = small_schedule(NUM_SHIFTS, NUM_PEOPLE)
+        window_limits = [WindowLimit(3, max_shifts=2), WindowLimit(7, max_days=4)]
+        solver = solve(schedule, window_limits=window_limits, min_free_weekends=1)
+        assignment, slack = solver.get_assignment()
+        self.assertEqual(RosterValidator(schedule, 40, 0, window_limits, min_free_weekends=1)
+                         .validate(assignment, slack), [])
+        # Without the limits the same roster breaks them
+        plain, plain_slack = solve(small_schedule(NUM_SHIFTS, NUM_PEOPLE)).get_assignment()
+        self.assertNotEqual(RosterValidator(schedule, 40, 0, window_limits, min_free_weekends=1)
+                            .validate(plain, plain_slack), [])
+
+    def test_soft_limit_is_paid_in_objective(self):
+        schedule = small_schedule(NUM_SHIFTS, NUM_PEOPLE)
+        solver = solve(schedule, window_limits=[WindowLimit(3, max_shifts=1, soft=True)])
+        assignment, slack = solver.get_assignment()
+
+        days = np.array(day_indices(schedule.shifts))
+        shifts_per_day = np.stack([assignment[:, days == day].sum(axis=1) for day in range(days.max() + 1)], axis=1)
+        excess = sum(np.maximum(shifts_per_day[:, start:end].sum(axis=1) - 1, 0).sum()
+                     for start, end in window_starts(days.max() + 1, 3))
+        self.assertGreater(excess, 0)
+        breakdown = solver.breakdown(assignment, slack)
+        self.assertAlmostEqual(breakdown['Window'], WINDOW_PENALTY * excess)
+        self.assertAlmostEqual(breakdown['Total'], solver.model.ObjVal, delta=1e-6 * solver.model.ObjVal)
+        # Without the limits the breakdown leaves the penalty out
+        self.assertAlmostEqual(objective_breakdown(schedule, assignment, slack)['Total'],
+                               solver.model.ObjVal - WINDOW_PENALTY * excess, delta=1e-6 * solver.model.ObjVal)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,6 +7,7 @@ import pandas as pd
 import unittest
 from src import LPSolver
 from src import ExcelTool
+from src.validator import RosterValidator
 
 class TestSchedule(unittest.TestCase):
     @classmethod
@@ -37,5 +38,12 @@ class TestSchedule(unittest.TestCase):
         for person_name, hours in total_hours.items():
             self.assertLessEqual(hours, self.solver.max_hours, f"{person_name} exceeds max hours limit!")
 
+    def test_all_rules(self):
+        """Verify the solved roster against every rule with the standalone validator."""
+        assignment, slack = self.solver.get_assignment()
+        validator = RosterValidator(self.schedule, self.solver.max_hours, self.solver.sunday_quota)
+        violations = validator.validate(assignment, slack)
+        self.assertEqual(violations, [], "\n".join(map(str, violations)))
+
 if __name__ == "__main__":
     unittest.main()
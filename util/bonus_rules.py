@@ -0,0 +1,150 @@
+import datetime
+import hashlib
+import json
+from collections import OrderedDict
+
+import numpy as np
+
+from .objective import DAYS_ORDER
+
+# Compiled bonus arrays per (rule-set hash, shifts) pair, the least recently used are dropped
+CACHE_SIZE = 32
+_CACHE = OrderedDict()
+
+
+def _minutes(time_str):
+    hours, minutes = map(int, time_str.split(":"))
+    return hours * 60 + minutes
+
+
+def _to_day(value):
+    """Converts a date, datetime, pandas Timestamp or ISO string to numpy datetime64[D]."""
+    if value is None or value == "" or value != value:  # value != value catches NaN and NaT
+        return np.datetime64("NaT", "D")
+    if isinstance(value, str):
+        value = datetime.date.fromisoformat(value[:10])
+    elif isinstance(value, datetime.datetime):
+        value = value.date()
+    return np.datetime64(value, "D")
+
+
+class BonusRule:
+    """A single row of the bonus table.
+
+    A shift matches when it matches every condition that is set: one of the days, one of the
+    shift types, a date inside one of the (start, end) date ranges (inclusive), a date in the
+    rule set's holiday list, and a start time inside the (start, end) time-of-day window. A matching
+    shift gets multiplier * hours + flat bonus hours.
+    """
+
+    def __init__(self, name, days=None, types=None, date_ranges=None, holidays=False, time_window=None,
+                 multiplier=0.0, flat=0.0):
+        unknown = [day for day in days or [] if day not in DAYS_ORDER]
+        if unknown:
+            raise ValueError(f"Bonus rule {name!r} has unknown day(s) {unknown}, expected one of {DAYS_ORDER}")
+        self.name = name
+        self.days = days
+        self.types = types
+        self.date_ranges = date_ranges
+        self.holidays = holidays
+        self.time_window = time_window
+        self.multiplier = multiplier
+        self.flat = flat
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'days': self.days,
+            'types': self.types,
+            'date_ranges': [[str(start), str(end)] for start, end in self.date_ranges] if self.date_ranges else None,
+            'holidays': self.holidays,
+            'time_window': list(self.time_window) if self.time_window else None,
+            'multiplier': self.multiplier,
+            'flat': self.flat,
+        }
+
+    def __repr__(self):
+        return f"BonusRule({self.name}, multiplier={self.multiplier}, flat={self.flat})"
+
+
+class BonusRuleSet:
+    """Ordered bonus table, the first matching rule determines the bonus of a shift."""
+
+    def __init__(self, rules, holidays=None):
+        self.rules = list(rules)
+        self.holidays = [str(day) for day in holidays or []]
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls([BonusRule(**rule) for rule in data['rules']], data.get('holidays'))
+
+    @classmethod
+    def from_json(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def to_dict(self):
+        return {'rules': [rule.to_dict() for rule in self.rules], 'holidays': self.holidays}
+
+    @property
+    def hash(self):
+        return hashlib.sha1(json.dumps(self.to_dict(), sort_keys=True).encode()).hexdigest()
+
+    def compute(self, shifts):
+        """Returns the bonus hours of all shifts as a numpy array."""
+        key = (self.hash, tuple((str(s.day), s.shift_type, s.time, s.hours, str(s.date)) for s in shifts))
+        if key in _CACHE:
+            _CACHE.move_to_end(key)
+        else:
+            _CACHE[key] = self._evaluate(shifts)
+            while len(_CACHE) > CACHE_SIZE:
+                _CACHE.popitem(last=False)
+        return _CACHE[key].copy()
+
+    def apply(self, schedule):
+        """Sets bonus_hours on every shift and refreshes the available hours of every person."""
+        bonus = self.compute(schedule.shifts)
+        for shift, bonus_hours in zip(schedule.shifts, bonus):
+            shift.bonus_hours = float(bonus_hours)
+        schedule.calculate_availability()
+        return bonus
+
+    def _evaluate(self, shifts):
+        hours = np.array([s.hours for s in shifts], dtype=float)
+        days = np.array([str(s.day).strip() for s in shifts])
+        types = np.array([str(s.shift_type).strip() for s in shifts])
+        dates = np.array([_to_day(s.date) for s in shifts], dtype="datetime64[D]")
+        starts = np.array([_minutes(str(s.time).split("-")[0]) for s in shifts])
+        holidays = np.array([_to_day(day) for day in self.holidays], dtype="datetime64[D]")
+        is_holiday = np.isin(dates, holidays)
+
+        bonus = np.zeros(len(shifts))
+        matched = np.zeros(len(shifts), dtype=bool)
+        for rule in self.rules:
+            mask = ~matched
+            if rule.days is not None:
+                mask &= np.isin(days, rule.days)
+            if rule.types is not None:
+                mask &= np.isin(types, rule.types)
+            if rule.date_ranges:
+                in_range = np.zeros(len(shifts), dtype=bool)
+                for start, end in rule.date_ranges:
+                    in_range |= (dates >= _to_day(start)) & (dates <= _to_day(end))
+                mask &= in_range
+            if rule.holidays:
+                mask &= is_holiday
+            if rule.time_window:
+                start, end = map(_minutes, rule.time_window)
+                mask &= (starts >= start) & (starts < end)
+
+            bonus[mask] = rule.multiplier * hours[mask] + rule.flat
+            matched |= mask
+        return bonus
+
+
+# Reproduces Shift._calculate_bonus
+DEFAULT_BONUS_RULES = BonusRuleSet([
+    BonusRule("Zaterdag", days=["Zaterdag"], multiplier=0.4),
+    BonusRule("Zondag", days=["Zondag"], multiplier=0.75),
+    BonusRule("Avond", types=["Avond"], flat=0.4 * 4),
+])
@@ -10,11 +10,14 @@ class Shift:
         self.bonus_hours = self._calculate_bonus()  # New attribute
 
     def _calculate_bonus(self):
-        if self.day == "Zaterdag":
+        # Default rates, util.bonus_rules.BonusRuleSet.apply overrides them for a whole schedule
+        # Day and type are stripped like BonusRuleSet does, some workbooks have stray whitespace
+        day, shift_type = str(self.day).strip(), str(self.shift_type).strip()
+        if day == "Zaterdag":
             return 0.4 * self.hours
-        elif self.day == "Zondag":
+        elif day == "Zondag":
             return 0.75 * self.hours
-        elif self.shift_type == "Avond":
+        elif shift_type == "Avond":
             return 0.4 * 4
         else:
             return 0.0
@@ -0,0 +1,148 @@
+import numpy as np
+from util.rules import day_indices, weekends, window_starts
+
+DAYS_ORDER = ["Maandag", "Dinsdag", "Woensdag", "Donderdag",
+              "Vrijdag", "Zaterdag", "Zondag"]
+
+# Weights used by LPSolver.set_objective
+SPREAD_WEIGHT = 10
+BONUS_WEIGHT = 0.3
+SLACK_PENALTY = 100000
+WINDOW_PENALTY = 1000  # Per unit over a soft window limit or per missing free weekend
+# Fairness terms LPSolver can build, see LPSolver._build_hour_distribution_terms
+FAIRNESS_FORMULATIONS = ["quadratic", "pwl", "l1", "minimax", "hybrid"]
+PWL_SEGMENTS = 8  # Segments of the piecewise-linear approximation of err^2
+HYBRID_MINIMAX_WEIGHT = 5  # Weight of the largest deviation next to the sum of deviations
+SPREAD_PARAMS = {
+    'max_gap': 3,
+    'coeff': 0.1,
+    'weights': {0: 0, 1: 3, 2: 2, 3: 1}
+}
+
+
+def availability_matrix(schedule):
+    """Returns the (people x shifts) availability matrix in schedule.people order."""
+    return np.array([person.availability for person in schedule.people.values()],
+                    dtype=np.int8).reshape(len(schedule.people), len(schedule.shifts))
+
+
+def expected_hours(schedule):
+    """Expected regular and bonus hours per person, as used in the fairness term."""
+    available = np.array([p.available_regular_hours for p in schedule.people.values()], dtype=float)
+    total_available = available.sum()
+    total_regular = sum(s.hours * s.persons_required for s in schedule.shifts)
+    total_bonus = sum(s.bonus_hours * s.persons_required for s in schedule.shifts)
+    if total_available > 0:
+        share = available / total_available
+    else:
+        share = np.zeros_like(available)
+    return share * total_regular, share * total_bonus
+
+
+def spread_matrix(schedule):
+    """Upper triangular (shifts x shifts) matrix with the pairwise spread penalty coefficients."""
+    days = [DAYS_ORDER.index(str(s.day).strip().title()) for s in schedule.shifts]
+    days = np.array(days)
+    diff = np.abs(days[:, None] - days[None, :])
+    gap = np.minimum(diff, 7 - diff)
+
+    weights = np.zeros(SPREAD_PARAMS['max_gap'] + 1)
+    for day_gap, weight in SPREAD_PARAMS['weights'].items():
+        weights[day_gap] = weight
+    coeff = np.where(gap <= SPREAD_PARAMS['max_gap'],
+                     SPREAD_PARAMS['coeff'] * weights[np.minimum(gap, SPREAD_PARAMS['max_gap'])], 0.0)
+    return np.triu(coeff, k=1)
+
+
+def pwl_breakpoints(expected, most):
+    """Breakpoints of the PWL approximation of err^2 for an error between expected - most and expected."""
+    low, high = expected - most, expected
+    return np.union1d(np.linspace(low, high, PWL_SEGMENTS + 1), [0.0] if low < 0 < high else [])
+
+
+def _fairness(fairness, err_reg, err_bonus, pwl_ranges):
+    # The fairness term of LPSolver, pwl_ranges holds (expected, most) per error for the pwl breakpoints
+    if fairness == "quadratic":
+        return float(np.sum(err_reg ** 2 + BONUS_WEIGHT * err_bonus ** 2))
+    if fairness == "pwl":
+        total = 0.0
+        for errors, ranges, weight in [(err_reg, pwl_ranges[0], 1.0), (err_bonus, pwl_ranges[1], BONUS_WEIGHT)]:
+            for err, (expected, most) in zip(errors, ranges):
+                # Nobody to give hours to leaves the error fixed, the solver adds it as a constant
+                x = pwl_breakpoints(expected, most) if most > 0 else None
+                total += weight * (err ** 2 if x is None else np.interp(err, x, x ** 2))
+        return float(total)
+    if fairness not in FAIRNESS_FORMULATIONS:
+        raise ValueError(f"Unknown fairness formulation {fairness!r}, expected one of {FAIRNESS_FORMULATIONS}")
+
+    l1 = np.sum(np.abs(err_reg) + BONUS_WEIGHT * np.abs(err_bonus))
+    minimax = np.abs(err_reg).max(initial=0) + BONUS_WEIGHT * np.abs(err_bonus).max(initial=0)
+    return float({'l1': l1, 'minimax': minimax, 'hybrid': l1 + HYBRID_MINIMAX_WEIGHT * minimax}[fairness])
+
+
+def window_excess(schedule, assignment, window_limits=None, min_free_weekends=0, soft_free_weekends=False):
+    """Units over the soft window limits plus missing free weekends if those are soft, as LPSolver penalises them."""
+    shifts = schedule.shifts
+    soft = [limit for limit in window_limits or [] if limit.soft]
+    if not shifts or not (soft or (soft_free_weekends and min_free_weekends)):
+        return 0.0
+    days = np.array(day_indices(shifts))
+    num_days = days[-1] + 1
+    day_matrix = np.zeros((len(shifts), num_days))
+    day_matrix[np.arange(len(shifts)), days] = 1
+    hours = np.array([s.hours for s in shifts], dtype=float)
+    load = {'shifts': assignment @ day_matrix, 'hours': (assignment * hours) @ day_matrix}
+    load['days'] = (load['shifts'] > 0).astype(float)
+
+    excess = 0.0
+    for limit in soft:
+        for metric, bound in limit.limits():
+            for start, end in window_starts(num_days, limit.days):
+                excess += np.maximum(load[metric][:, start:end].sum(axis=1) - bound, 0).sum()
+    if soft_free_weekends and min_free_weekends:
+        groups = weekends(shifts)
+        free = sum((load['shifts'][:, group] == 0).all(axis=1) for group in groups)
+        excess += np.maximum(min(min_free_weekends, len(groups)) - free, 0).sum()
+    return float(excess)
+
+
+def objective_breakdown(schedule, assignment, slack, spread_weight=SPREAD_WEIGHT, carry_over=None,
+                        fairness="quadratic", window_limits=None, min_free_weekends=0, soft_free_weekends=False,
+                        max_hours=None):
+    """Evaluates the LPSolver objective terms for a (people x shifts) assignment matrix.
+
+    carry_over maps a person to the regular and bonus hours owed from earlier periods. Fairness
+    is scored in the formulation the solver used (max_hours bounds the pwl breakpoints), and
+    Window holds the penalty of the soft window limits and soft free weekends. Regular and
+    Bonus SSE are always the squared errors, so rosters of different formulations compare.
+    """
+    assignment = np.asarray(assignment, dtype=float)
+    slack = np.asarray(slack, dtype=float)
+    hours = np.array([s.hours for s in schedule.shifts], dtype=float)
+    bonus = np.array([s.bonus_hours for s in schedule.shifts], dtype=float)
+    exp_reg, exp_bonus = expected_hours(schedule)
+    if carry_over:
+        owed = np.array([carry_over.get(name, (0, 0)) for name in schedule.people], dtype=float)
+        exp_reg, exp_bonus = exp_reg + owed[:, 0], exp_bonus + owed[:, 1]
+
+    err_reg = exp_reg - assignment @ hours
+    err_bonus = exp_bonus - assignment @ bonus
+    spread = np.einsum('ps,st,pt->', assignment, spread_matrix(schedule), assignment)
+    pwl_ranges = None
+    if fairness == "pwl":
+        available = availability_matrix(schedule)
+        most_reg = np.minimum(available @ hours, max_hours if max_hours is not None else np.inf)
+        pwl_ranges = (list(zip(exp_reg, most_reg)), list(zip(exp_bonus, available @ bonus)))
+
+    breakdown = {
+        'Regular SSE': float(np.sum(err_reg ** 2)),
+        'Bonus SSE': float(np.sum(err_bonus ** 2)),
+        'Fairness': _fairness(fairness, err_reg, err_bonus, pwl_ranges),
+        'Spread': float(spread_weight * spread),
+        'Window': WINDOW_PENALTY * window_excess(schedule, assignment, window_limits, min_free_weekends,
+                                                 soft_free_weekends),
+        'Slack': float(SLACK_PENALTY * slack.sum()),
+        'Unfilled Positions': int(round(slack.sum())),
+    }
+    breakdown['Total'] = breakdown['Fairness'] + breakdown['Spread'] + breakdown['Window'] + breakdown['Slack']
+    return breakdown
@@ -0,0 +1,161 @@
+import numpy as np
+
+SUNDAY = "Zondag"
+
+
+def rest_conflict_pairs(shifts):
+    """Returns (earlier_idx, later_idx, rule) for every shift pair one person may not both work.
+
+    Mirrors the C4 / C5.1 / C5.2 constraints of LPSolver, which are defined on the order of
+    the shifts in the schedule.
+    """
+    pairs = []
+    prev_shift, prev_prev_shift = None, None
+    prev_type, prev_prev_type = None, None
+    for shift_idx, shift in enumerate(shifts):
+        if prev_type == "Avond" and shift.shift_type == "Ochtend":
+            pairs.append((prev_shift, shift_idx, "C4"))
+        if shift.shift_type == "Avond":
+            if prev_type in ["Middag", "Ochtend"]:
+                pairs.append((prev_shift, shift_idx, "C5.1"))
+            if prev_prev_type == "Ochtend":
+                pairs.append((prev_prev_shift, shift_idx, "C5.2"))
+        prev_prev_shift, prev_prev_type = prev_shift, prev_type
+        prev_shift, prev_type = shift_idx, shift.shift_type
+    return pairs
+
+
+def rest_conflicts_by_shift(shifts):
+    """Maps every shift index to the list of (other_idx, rule) it conflicts with."""
+    conflicts = {shift_idx: [] for shift_idx in range(len(shifts))}
+    for first, second, rule in rest_conflict_pairs(shifts):
+        conflicts[first].append((second, rule))
+        conflicts[second].append((first, rule))
+    return conflicts
+
+
+def sunday_blocked(person, sunday_quota):
+    """True if the person does not meet the non-Sunday quota and may not work on Sunday."""
+    return person.non_sunday_hours < sunday_quota
+
+
+def day_indices(shifts):
+    """Calendar day number of every shift, a new day starts whenever the day name changes."""
+    indices = []
+    day_idx, prev_day = -1, None
+    for shift in shifts:
+        # Some workbooks have stray whitespace in the day names
+        day = str(shift.day).strip()
+        if day != prev_day:
+            day_idx += 1
+            prev_day = day
+        indices.append(day_idx)
+    return indices
+
+
+class WindowLimit:
+    """At most max_shifts shifts, max_hours hours and/or max_days working days in any `days` consecutive days.
+
+    Days are counted with day_indices. A soft limit may be exceeded at a penalty per unit.
+    """
+
+    def __init__(self, days, max_shifts=None, max_hours=None, max_days=None, soft=False):
+        if max_shifts is None and max_hours is None and max_days is None:
+            raise ValueError("WindowLimit needs max_shifts, max_hours or max_days")
+        self.days = days
+        self.max_shifts = max_shifts
+        self.max_hours = max_hours
+        self.max_days = max_days
+        self.soft = soft
+
+    def limits(self):
+        """Returns (metric, limit) for every bound that is set, metric is 'shifts', 'hours' or 'days'."""
+        return [(metric, limit) for metric, limit in
+                [('shifts', self.max_shifts), ('hours', self.max_hours), ('days', self.max_days)]
+                if limit is not None]
+
+    def __repr__(self):
+        bounds = ", ".join(f"max_{metric}={limit}" for metric, limit in self.limits())
+        return f"WindowLimit(days={self.days}, {bounds}{', soft' if self.soft else ''})"
+
+
+def window_starts(num_days, window):
+    """(start, end) day ranges of every window, a horizon shorter than the window is one window."""
+    return [(start, min(start + window, num_days)) for start in range(max(1, num_days - window + 1))]
+
+
+def weekends(shifts):
+    """Lists the day indices of every weekend, a Saturday and the Sunday after it (or either alone)."""
+    groups = []
+    prev_idx, prev_day = None, None
+    for day_idx, shift in zip(day_indices(shifts), shifts):
+        if day_idx == prev_idx:
+            continue
+        if shift.day == SUNDAY and prev_day == "Zaterdag" and prev_idx == day_idx - 1:
+            groups[-1].append(day_idx)
+        elif shift.day in ["Zaterdag", SUNDAY]:
+            groups.append([day_idx])
+        prev_idx, prev_day = day_idx, shift.day
+    return groups
+
+
+# Units of the WindowLimit metrics in the explanations of RosterLimits.blocking
+METRIC_UNITS = {'shifts': "diensten", 'hours': "uur", 'days': "werkdagen"}
+
+
+class RosterLimits:
+    """Window limits and free weekends as a check on giving one more shift to each person.
+
+    Soft limits are kept as hard ones, so a roster built with these checks pays no window or
+    free-weekend penalty. Both rules only get tighter when a shift is added, so checking every
+    addition is enough to keep a whole roster within them.
+    """
+
+    def __init__(self, schedule, window_limits=None, min_free_weekends=0):
+        shifts = schedule.shifts
+        self.hours = np.array([s.hours for s in shifts], dtype=float)
+        self.days = np.array(day_indices(shifts), dtype=int)
+        num_days = self.days.max() + 1 if len(shifts) else 0
+        self.day_matrix = np.zeros((len(shifts), num_days), dtype=np.int8)
+        self.day_matrix[np.arange(len(shifts)), self.days] = 1
+        self.windows = [(limit.days, metric, bound, window_starts(num_days, limit.days))
+                        for limit in window_limits or [] for metric, bound in limit.limits()]
+        self.weekends = weekends(shifts)
+        self.min_free = min(min_free_weekends, len(self.weekends))
+        self.active = bool(self.windows or self.min_free)
+
+    def allowed(self, assignment, s):
+        """Boolean per person: can take shift s on top of assignment without breaking a limit."""
+        allowed = np.ones(assignment.shape[0], dtype=bool)
+        for _, ok in self._checks(assignment, s):
+            allowed &= ok
+        return allowed
+
+    def blocking(self, assignment, s):
+        """Per person the first limit that shift s on top of assignment breaks, None if there is none."""
+        reasons = [None] * assignment.shape[0]
+        for reason, ok in self._checks(assignment, s):
+            for p in np.flatnonzero(~ok):
+                if reasons[p] is None:
+                    reasons[p] = reason
+        return reasons
+
+    def _checks(self, assignment, s):
+        # Yields (explanation, allowed per person) for every window around shift s and the free weekends
+        if not self.active:
+            return
+        day = self.days[s]
+        shifts = assignment @ self.day_matrix
+        shifts[:, day] += 1
+        worked = shifts > 0
+        load = {'shifts': shifts, 'hours': (assignment * self.hours) @ self.day_matrix, 'days': worked}
+        load['hours'][:, day] += self.hours[s]
+
+        for days, metric, bound, windows in self.windows:
+            for start, end in windows:
+                if start <= day < end:
+                    yield (f"max {bound:g} {METRIC_UNITS[metric]} per {days} dagen",
+                           load[metric][:, start:end].sum(axis=1) <= bound + 1e-9)
+        if self.min_free:
+            free = sum(~worked[:, days].any(axis=1) for days in self.weekends)
+            yield f"minder dan {self.min_free} vrije weekenden", free >= self.min_free